@@ -1,16 +1,82 @@
 import sqlite3
 import os
+import re
+import json
+from contextlib import contextmanager
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import heapq
+import recurrence
+import sync
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'app_data.db')
 
+class _CommandConnection:
+    """The connection every manager on a file shares while an undoable
+    command is open. Methods commit and close as usual; both are deferred to
+    the end of the command, so it applies (and is journaled) as a whole."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
 class DatabaseManager:
+    # Tables whose changes undo/redo reverse and replay, and the columns among
+    # them that are running totals (restored by adding the difference back,
+    # so changes made outside the command in between are kept)
+    JOURNALED_TABLES = ('habits', 'habit_logs', 'tasks', 'task_logs', 'task_penalties',
+                        'rewards', 'reward_logs', 'points_balance', 'weekly_bonus_log',
+                        'domain_events', 'events', 'event_exceptions', 'reflections')
+    COUNTER_COLUMNS = {'points_balance': ('balance',)}
+    # The journal keeps at most this many commands, this much delta text and
+    # this much history
+    JOURNAL_MAX_ENTRIES = 100
+    JOURNAL_MAX_BYTES = 1_000_000
+    JOURNAL_MAX_AGE_DAYS = 7
+
+    # Open undoable command per database file, shared like the caches below
+    active_commands: Dict[str, _CommandConnection] = {}
+    table_columns: Dict[str, Dict[str, List[str]]] = {}
+
+    # Expanded recurring-event occurrences per database file, shared by every
+    # manager on that file so a write through any of them invalidates it
+    recurrence_caches: Dict[str, Dict[tuple, Any]] = {}
+
+    # Full-text search sources: kind -> (table, rowid tag, columns whose update
+    # re-indexes the row, title, body, day, condition), the SQL expressions
+    # written over {row}. An index entry's rowid is the source id * 8 + tag,
+    # so triggers replace or drop it with a rowid lookup.
+    SEARCH_SOURCES = {
+        'task': ('tasks', 1, 'name, deadline', '{row}.name', "''",
+                 "COALESCE({row}.deadline, '')", '1'),
+        'postpone': ('task_logs', 2, 'reason', '(SELECT name FROM tasks WHERE id = {row}.task_id)',
+                     '{row}.reason', '{row}.date', "{row}.reason IS NOT NULL AND {row}.reason != ''"),
+        'reflection': ('reflections', 3, 'completed, difficult, win', "'Reflection'",
+                       "COALESCE({row}.completed, '') || ' · ' || COALESCE({row}.difficult, '') "
+                       "|| ' · ' || COALESCE({row}.win, '')", '{row}.date', '1'),
+        'habit': ('habits', 4, 'name', '{row}.name', "''", '{row}.created_at', '1'),
+        'event': ('events', 5, 'date, title, description', '{row}.title',
+                  "COALESCE({row}.description, '')", '{row}.date', '1'),
+    }
+
     def __init__(self, db_path=DB_PATH):
         self.db_path = db_path
+        self.recurrence_cache = self.recurrence_caches.setdefault(db_path, {})  # (year, month) -> occurrences
         self.init_db()
 
     def get_connection(self):
+        command = self.active_commands.get(self.db_path)
+        if command is not None:
+            return command
         return sqlite3.connect(self.db_path)
 
     def init_db(self):
@@ -36,6 +102,8 @@ class DatabaseManager:
                 FOREIGN KEY (habit_id) REFERENCES habits (id)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_habit_logs_habit_date ON habit_logs (habit_id, date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_habit_logs_date ON habit_logs (date)')
 
         # Tasks Table (extended with is_top3 and duration)
         cursor.execute('''
@@ -58,6 +126,24 @@ class DatabaseManager:
         except:
             pass  # Column already exists
         
+        # The overdue sweep reads open tasks of one priority by deadline
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tasks_open_priority_deadline
+            ON tasks (priority, deadline) WHERE is_completed = 0
+        ''')
+        
+        # Missed-deadline penalties already applied, one per (task, deadline),
+        # so a postponed task can be penalized again for its new deadline
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS task_penalties (
+                task_id INTEGER NOT NULL,
+                deadline TEXT NOT NULL,
+                penalty INTEGER NOT NULL,
+                applied_at TEXT NOT NULL,
+                PRIMARY KEY (task_id, deadline)
+            )
+        ''')
+        
         # Task Logs (for tracking actions like postpone)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS task_logs (
@@ -69,6 +155,8 @@ class DatabaseManager:
                 FOREIGN KEY (task_id) REFERENCES tasks (id)
             )
         ''')
+        # History pages read one action newest first by (date, id)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_logs_action_date ON task_logs (action, date, id)')
 
         # Rewards Table
         cursor.execute('''
@@ -88,6 +176,7 @@ class DatabaseManager:
                 FOREIGN KEY (reward_id) REFERENCES rewards (id)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reward_logs_date ON reward_logs (date, id)')
 
         # Settings Table (key-value)
         cursor.execute('''
@@ -129,17 +218,150 @@ class DatabaseManager:
                 completed INTEGER DEFAULT 0,
                 linked_task_id INTEGER,
                 linked_habit_id INTEGER,
-                session_type TEXT DEFAULT 'focus'
+                session_type TEXT DEFAULT 'focus',
+                task_name TEXT DEFAULT ''
             )
         ''')
+        try:
+            cursor.execute("ALTER TABLE focus_sessions ADD COLUMN task_name TEXT DEFAULT ''")
+        except:
+            pass  # Column already exists
+        # Loading upcoming time blocks reads (mode, end_time) ranges
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_focus_sessions_mode_end ON focus_sessions (mode, end_time)')
+        # Session history (completed sessions only, newest first)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_focus_sessions_completed_start
+            ON focus_sessions (start_time, id) WHERE completed = 1
+        ''')
+        
+        # Calendar Events Table (times stored as 24h HH:MM, '' when unset)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                start_time TEXT NOT NULL DEFAULT '',
+                title TEXT NOT NULL,
+                description TEXT DEFAULT '',
+                recur_freq TEXT,
+                recur_interval INTEGER DEFAULT 1,
+                recur_until TEXT
+            )
+        ''')
+        # Recurrence columns (for databases created before recurring events)
+        for column in ('recur_freq TEXT', 'recur_interval INTEGER DEFAULT 1', 'recur_until TEXT'):
+            try:
+                cursor.execute(f'ALTER TABLE events ADD COLUMN {column}')
+            except:
+                pass  # Column already exists
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_date_time ON events (date, start_time)')
+        # A series is one row (date = first occurrence); this keeps the scan for
+        # series overlapping a window off the one-off events
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_recurring ON events (date) WHERE recur_freq IS NOT NULL')
+        
+        # Skipped occurrences of recurring events
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS event_exceptions (
+                event_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                PRIMARY KEY (event_id, date),
+                FOREIGN KEY (event_id) REFERENCES events (id)
+            )
+        ''')
+        
+        # Focus rollups: completed focus seconds per day, and per weekday x hour
+        # (Monday = 0), kept current as sessions end so analytics never scan focus_sessions
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS focus_daily (
+                date TEXT PRIMARY KEY,
+                seconds INTEGER NOT NULL DEFAULT 0,
+                sessions INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS focus_weekday_hour (
+                weekday INTEGER NOT NULL,
+                hour INTEGER NOT NULL,
+                seconds INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (weekday, hour)
+            )
+        ''')
+        
+        # Weekly consistency bonus, evaluated at most once per ISO week
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS weekly_bonus_log (
+                iso_week TEXT PRIMARY KEY,
+                week_start TEXT NOT NULL,
+                done INTEGER NOT NULL,
+                possible INTEGER NOT NULL,
+                bonus INTEGER NOT NULL,
+                evaluated_at TEXT NOT NULL
+            )
+        ''')
+        
+        # Undo journal: one row per command with the row-level deltas it made,
+        # [table, rowid, before, after] (changed columns only for updates)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS undo_journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                deltas TEXT NOT NULL,
+                undone INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Domain events: every points-relevant action with the points it earned
+        # under the rules in force (see rules_engine)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS domain_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                day TEXT NOT NULL,
+                payload TEXT NOT NULL DEFAULT '{}',
+                points INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        # Rule evaluation looks up earlier events by subject+day and by kind+day
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domain_events_subject ON domain_events (kind, subject, day)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domain_events_day ON domain_events (kind, day)')
+        
+        # Full-text search over tasks, postpone reasons, reflections, habits
+        # and events, kept in sync by triggers on the source tables
+        try:
+            search_is_new = self.init_search_index(cursor)
+        except sqlite3.OperationalError:
+            search_is_new = False  # SQLite built without FTS5: search stays unavailable
+        
+        # Row-level change capture for merging with other devices (see sync)
+        sync.install(cursor)
         
         # Initialize default focus settings
         cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', ('clock_visible', 'true'))
         cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', ('sound_enabled', 'false'))
         cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', ('focus_mode', 'pomodoro'))
+        # Time blocks that ended before this were logged by versions that never
+        # completed them, so they are left as they are rather than credited now
+        cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)',
+                       ('timeblocks_completed_since', datetime.now().isoformat()))
+        # Likewise no earlier version penalized missed deadlines; only ones
+        # from this day on are charged
+        cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)',
+                       ('overdue_penalties_since', datetime.now().date().isoformat()))
+        # ...nor paid weekly bonuses, so the backfill starts from this week
+        cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)',
+                       ('weekly_bonus_since', datetime.now().date().isoformat()))
         
         conn.commit()
         conn.close()
+        
+        # One-time build of the rollups from sessions logged before they existed
+        if self.get_setting('focus_rollups_built') != 'true':
+            self.rebuild_focus_rollups()
+        # Likewise for the search index
+        if search_is_new:
+            self.rebuild_search_index()
 
     # =====================
     # HABIT METHODS
@@ -251,6 +473,53 @@ class DatabaseManager:
             points.append(status)  # 0, 1, or 2
         return points
 
+    def get_habit_summaries(self, today: str = None) -> List[Dict]:
+        """Card data for every habit in one query, oldest habit first:
+        {id, name, today_status, week (last 7 statuses, oldest first), streak}.
+        The streak counts consecutive 'Done' days ending today: numbering a
+        habit's Done logs newest first, a log continues the streak exactly
+        while its age in days equals its position."""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        week_start = (datetime.strptime(today, "%Y-%m-%d").date() - timedelta(days=6)).strftime("%Y-%m-%d")
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            WITH done AS (
+                SELECT habit_id,
+                       CAST(julianday(:today) - julianday(date) AS INTEGER) AS age,
+                       ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY date DESC) - 1 AS position
+                FROM habit_logs
+                WHERE status = 2 AND date <= :today
+            ),
+            streaks AS (
+                SELECT habit_id, COUNT(*) AS streak
+                FROM done WHERE age = position
+                GROUP BY habit_id
+            )
+            SELECT h.id, h.name, COALESCE(s.streak, 0),
+                   CAST(julianday(l.date) - julianday(:week_start) AS INTEGER), l.status
+            FROM habits h
+            LEFT JOIN streaks s ON s.habit_id = h.id
+            LEFT JOIN habit_logs l
+                   ON l.habit_id = h.id AND l.date >= :week_start AND l.date <= :today
+            ORDER BY h.id
+        ''', {'today': today, 'week_start': week_start})
+        rows = cursor.fetchall()
+        conn.close()
+
+        summaries = {}
+        for habit_id, name, streak, offset, status in rows:
+            summary = summaries.get(habit_id)
+            if summary is None:
+                summary = summaries[habit_id] = {
+                    'id': habit_id, 'name': name, 'streak': streak, 'week': [0] * 7,
+                }
+            if offset is not None:
+                summary['week'][offset] = status or 0
+        for summary in summaries.values():
+            summary['today_status'] = summary['week'][-1]
+        return list(summaries.values())
+
     def get_month_habit_logs(self, habit_id: int, year: int, month: int) -> Dict[str, int]:
         """Get all habit logs for a specific habit in a given month.
         Returns dict mapping date strings to status values."""
@@ -275,13 +544,23 @@ class DatabaseManager:
 
     def get_all_habits_month_data(self, year: int, month: int) -> List[Dict[str, Any]]:
         """Get all habits with their monthly logs for efficient matrix rendering.
-        Returns list of dicts with habit info and log data."""
-        habits = self.get_habits()
-        result = []
+        Returns list of dicts with habit info and log data.
+        Uses one range query over the month instead of one query per habit."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
         
-        for habit in habits:
-            habit_id, name, created_at = habit
-            logs = self.get_month_habit_logs(habit_id, year, month)
+        start_date = f"{year:04d}-{month:02d}-01"
+        if month == 12:
+            end_date = f"{year + 1:04d}-01-01"
+        else:
+            end_date = f"{year:04d}-{month + 1:02d}-01"
+        
+        cursor.execute('SELECT id, name, created_at FROM habits ORDER BY id')
+        result = []
+        logs_by_habit = {}
+        for habit_id, name, created_at in cursor.fetchall():
+            logs = {}
+            logs_by_habit[habit_id] = logs
             result.append({
                 'id': habit_id,
                 'name': name,
@@ -289,6 +568,16 @@ class DatabaseManager:
                 'logs': logs  # Dict mapping date -> status
             })
         
+        cursor.execute('''
+            SELECT habit_id, date, status FROM habit_logs 
+            WHERE date >= ? AND date < ?
+        ''', (start_date, end_date))
+        for habit_id, date_str, status in cursor.fetchall():
+            logs = logs_by_habit.get(habit_id)
+            if logs is not None:
+                logs[date_str] = status
+        
+        conn.close()
         return result
 
     def get_month_summary(self, year: int, month: int) -> Dict[str, Any]:
@@ -431,10 +720,30 @@ class DatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM task_logs WHERE task_id = ?', (task_id,))
+        cursor.execute('DELETE FROM task_penalties WHERE task_id = ?', (task_id,))
         cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
         conn.commit()
         conn.close()
 
+    def get_unpenalized_overdue_tasks(self, cursor, since: str, before: str,
+                                      priority: int = 3) -> List[tuple]:
+        """(id, deadline) of open tasks of a priority whose deadline is in
+        [since, before) (YYYY-MM-DD) and hasn't been penalized yet."""
+        cursor.execute('''
+            SELECT t.id, t.deadline FROM tasks t
+            WHERE t.is_completed = 0 AND t.priority = ? AND t.deadline >= ? AND t.deadline < ?
+              AND NOT EXISTS (SELECT 1 FROM task_penalties p
+                              WHERE p.task_id = t.id AND p.deadline = t.deadline)
+            ORDER BY t.deadline
+        ''', (priority, since, before))
+        return cursor.fetchall()
+
+    def mark_task_penalized(self, cursor, task_id: int, deadline: str, penalty: int):
+        cursor.execute('''
+            INSERT OR IGNORE INTO task_penalties (task_id, deadline, penalty, applied_at)
+            VALUES (?, ?, ?, ?)
+        ''', (task_id, deadline, penalty, datetime.now().isoformat()))
+
     # =====================
     # REWARDS METHODS
     # =====================
@@ -455,31 +764,17 @@ class DatabaseManager:
         conn.close()
         return rows
 
-    def claim_reward(self, reward_id: int) -> bool:
-        """Claim a reward if balance is sufficient. Returns True if successful."""
+    def get_reward_cost(self, reward_id: int) -> Optional[int]:
         conn = self.get_connection()
         cursor = conn.cursor()
-        
         cursor.execute('SELECT points_cost FROM rewards WHERE id = ?', (reward_id,))
         row = cursor.fetchone()
-        if not row:
-            conn.close()
-            return False
-        
-        cost = row[0]
-        cursor.execute('SELECT balance FROM points_balance WHERE id = 1')
-        balance = cursor.fetchone()[0]
-        
-        if balance >= cost:
-            cursor.execute('UPDATE points_balance SET balance = balance - ? WHERE id = 1', (cost,))
-            today = datetime.now().strftime("%Y-%m-%d")
-            cursor.execute('INSERT INTO reward_logs (reward_id, date) VALUES (?, ?)', (reward_id, today))
-            conn.commit()
-            conn.close()
-            return True
-        
         conn.close()
-        return False
+        return row[0] if row else None
+
+    def log_reward_claim(self, cursor, reward_id: int):
+        today = datetime.now().strftime("%Y-%m-%d")
+        cursor.execute('INSERT INTO reward_logs (reward_id, date) VALUES (?, ?)', (reward_id, today))
 
     def delete_reward(self, reward_id: int):
         conn = self.get_connection()
@@ -513,6 +808,156 @@ class DatabaseManager:
         conn.commit()
         conn.close()
 
+    def get_weekly_consistency(self, first_monday: str, last_monday: str) -> List[tuple]:
+        """(week_start, done, possible) for every week from first_monday to
+        last_monday, in one query. `done` counts Done logs in the week;
+        `possible` counts habit-days, from each habit's creation date on."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            WITH RECURSIVE weeks(week_start) AS (
+                SELECT date(?)
+                UNION ALL
+                SELECT date(week_start, '+7 days') FROM weeks WHERE week_start < date(?)
+            ),
+            done AS (
+                SELECT date(date, '-' || ((CAST(strftime('%w', date) AS INTEGER) + 6) % 7) || ' days') AS week_start,
+                       COUNT(*) AS done
+                FROM habit_logs
+                WHERE status = 2 AND date >= ? AND date <= date(?, '+6 days')
+                GROUP BY 1
+            )
+            SELECT w.week_start, COALESCE(d.done, 0),
+                   (SELECT COALESCE(SUM(MIN(7, julianday(date(w.week_start, '+6 days'))
+                                            - julianday(MAX(h.created_at, w.week_start)) + 1)), 0)
+                    FROM habits h WHERE h.created_at <= date(w.week_start, '+6 days'))
+            FROM weeks w LEFT JOIN done d ON d.week_start = w.week_start
+            ORDER BY w.week_start
+        ''', (first_monday, last_monday, first_monday, last_monday))
+        rows = [(week_start, done, int(possible)) for week_start, done, possible in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def get_last_bonus_week(self, before: str) -> Optional[str]:
+        """week_start of the latest evaluated week starting before `before`."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT MAX(week_start) FROM weekly_bonus_log WHERE week_start < ?', (before,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def get_first_habit_date(self) -> Optional[str]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT MIN(created_at) FROM habits')
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def record_weekly_bonuses(self, weeks: List[tuple]) -> int:
+        """Record evaluated weeks (iso_week, week_start, done, possible, bonus)
+        and pay out bonuses for weeks not recorded before, in one transaction.
+        Returns the points actually added."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+        awarded = 0
+        for iso_week, week_start, done, possible, bonus in weeks:
+            cursor.execute('''
+                INSERT OR IGNORE INTO weekly_bonus_log (iso_week, week_start, done, possible, bonus, evaluated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (iso_week, week_start, done, possible, bonus, now))
+            if cursor.rowcount:
+                awarded += bonus
+        if awarded:
+            cursor.execute('UPDATE points_balance SET balance = balance + ? WHERE id = 1', (awarded,))
+        conn.commit()
+        conn.close()
+        return awarded
+
+    # =====================
+    # DOMAIN EVENT METHODS
+    # =====================
+    # The cursor-level methods below run inside the caller's transaction so
+    # an event is evaluated, stored and credited atomically.
+    def get_event_award(self, cursor, kind: str, subject: str, day: str) -> int:
+        cursor.execute('''
+            SELECT COALESCE(SUM(points), 0) FROM domain_events
+            WHERE kind = ? AND subject = ? AND day = ?
+        ''', (kind, subject, day))
+        return cursor.fetchone()[0]
+
+    def count_event_subjects(self, cursor, kind: str, day: str, exclude_subject: str) -> int:
+        """Distinct other subjects with an event of this kind on a day."""
+        cursor.execute('''
+            SELECT COUNT(DISTINCT subject) FROM domain_events
+            WHERE kind = ? AND day = ? AND subject != ?
+        ''', (kind, day, exclude_subject))
+        return cursor.fetchone()[0]
+
+    def get_event_history(self, cursor, kind: str, subject: str,
+                          first_day: str, last_day: str) -> Dict[str, Dict[str, Any]]:
+        """Payload of the latest event per day for one subject in a date range."""
+        cursor.execute('''
+            SELECT day, payload FROM domain_events
+            WHERE kind = ? AND subject = ? AND day BETWEEN ? AND ?
+            ORDER BY id
+        ''', (kind, subject, first_day, last_day))
+        return {day: json.loads(payload) for day, payload in cursor.fetchall()}
+
+    def insert_domain_event(self, cursor, kind: str, subject: str, day: str, payload: Dict[str, Any],
+                            points: int, require_funds: bool = False, replaces: bool = False) -> Optional[int]:
+        """Store an event and apply its points to the balance. With
+        require_funds, a deduction larger than the balance is refused (None).
+        With replaces, an existing event for the same (kind, subject, day)
+        takes the new payload and the points change instead, so each such
+        key stays one row (and merges with other devices as one)."""
+        if require_funds and points < 0:
+            cursor.execute('SELECT balance FROM points_balance WHERE id = 1')
+            if cursor.fetchone()[0] < -points:
+                return None
+        existing = None
+        if replaces:
+            cursor.execute('''
+                SELECT MAX(id) FROM domain_events WHERE kind = ? AND subject = ? AND day = ?
+            ''', (kind, subject, day))
+            existing = cursor.fetchone()[0]
+        if existing is not None:
+            cursor.execute('''
+                UPDATE domain_events SET payload = ?, points = points + ?, created_at = ? WHERE id = ?
+            ''', (json.dumps(payload), points, datetime.now().isoformat(), existing))
+            event_id = existing
+        else:
+            cursor.execute('''
+                INSERT INTO domain_events (kind, subject, day, payload, points, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (kind, subject, day, json.dumps(payload), points, datetime.now().isoformat()))
+            event_id = cursor.lastrowid
+        if points:
+            cursor.execute('UPDATE points_balance SET balance = MAX(0, balance + ?) WHERE id = 1', (points,))
+        return event_id
+
+    def get_domain_events(self) -> List[tuple]:
+        """(id, kind, subject, day, payload, points) for the whole history, in order."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, kind, subject, day, payload, points FROM domain_events ORDER BY id')
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def rewrite_event_points(self, changes: List[tuple], delta: int):
+        """Store re-evaluated (points, id) pairs and shift the balance by the
+        net difference, in one transaction."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('UPDATE domain_events SET points = ? WHERE id = ?', changes)
+        if delta:
+            cursor.execute('UPDATE points_balance SET balance = MAX(0, balance + ?) WHERE id = 1', (delta,))
+        conn.commit()
+        conn.close()
+
     # =====================
     # SETTINGS METHODS
     # =====================
@@ -544,9 +989,12 @@ class DatabaseManager:
         today = datetime.now().strftime("%Y-%m-%d")
         conn = self.get_connection()
         cursor = conn.cursor()
+        # An upsert keeps the row id, so the search triggers see an update
         cursor.execute('''
-            INSERT OR REPLACE INTO reflections (date, completed, difficult, win)
+            INSERT INTO reflections (date, completed, difficult, win)
             VALUES (?, ?, ?, ?)
+            ON CONFLICT (date) DO UPDATE SET
+                completed = excluded.completed, difficult = excluded.difficult, win = excluded.win
         ''', (today, completed, difficult, win))
         conn.commit()
         conn.close()
@@ -562,9 +1010,734 @@ class DatabaseManager:
             return {'completed': row[0], 'difficult': row[1], 'win': row[2]}
         return None
 
+    # =====================
+    # HISTORY METHODS
+    # =====================
+    # Every history is read newest first in pages. A page starts strictly after
+    # the key of the last row already shown (keyset pagination), so with an
+    # index on the key each page is one index seek plus `limit` rows, however
+    # deep into the history it is. Reflections are keyed by their unique date.
+    HISTORY_KEYS = {
+        'completed': ('date', 'id'),
+        'postponed': ('date', 'id'),
+        'rewards': ('date', 'id'),
+        'focus': ('start', 'id'),
+        'reflections': ('date',),
+    }
+
+    def _history_page(self, query: str, key: tuple, after: Optional[tuple], limit: int,
+                      params: tuple = ()) -> List[tuple]:
+        """Run `query` (a SELECT ending in its WHERE clause) for the page
+        after `after`, ordered by the `key` columns descending."""
+        if after is not None:
+            query += f" AND ({', '.join(key)}) < ({', '.join('?' * len(key))})"
+            params += tuple(after)
+        query += f" ORDER BY {', '.join(column + ' DESC' for column in key)} LIMIT ?"
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params + (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def get_task_log_page(self, action: str, after: Optional[tuple] = None,
+                          limit: int = 50) -> List[Dict[str, Any]]:
+        """Task log entries of one action ('completed' or 'postponed')."""
+        rows = self._history_page('''
+            SELECT l.id, l.date, l.task_id, t.name, t.points, l.reason
+            FROM task_logs l LEFT JOIN tasks t ON t.id = l.task_id
+            WHERE l.action = ?
+        ''', ('l.date', 'l.id'), after, limit, (action,))
+        return [{'id': log_id, 'date': date, 'task_id': task_id, 'name': name or '',
+                 'points': points or 0, 'reason': reason or ''}
+                for log_id, date, task_id, name, points, reason in rows]
+
+    def get_reward_log_page(self, after: Optional[tuple] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Reward claims; `name` is None once the reward has been deleted."""
+        rows = self._history_page('''
+            SELECT l.id, l.date, l.reward_id, r.name, r.points_cost
+            FROM reward_logs l LEFT JOIN rewards r ON r.id = l.reward_id
+            WHERE 1
+        ''', ('l.date', 'l.id'), after, limit)
+        return [{'id': log_id, 'date': date, 'reward_id': reward_id, 'name': name, 'cost': cost or 0}
+                for log_id, date, reward_id, name, cost in rows]
+
+    def get_focus_session_page(self, after: Optional[tuple] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Completed focus sessions and time blocks; `start` is ISO date-time."""
+        rows = self._history_page('''
+            SELECT id, start_time, end_time, duration_minutes, mode, session_type, task_name
+            FROM focus_sessions
+            WHERE completed = 1
+        ''', ('start_time', 'id'), after, limit)
+        return [{'id': session_id, 'start': start, 'end': end, 'minutes': minutes or 0,
+                 'mode': mode, 'type': session_type, 'task_name': task_name or ''}
+                for session_id, start, end, minutes, mode, session_type, task_name in rows]
+
+    def get_reflection_page(self, after: Optional[tuple] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._history_page('''
+            SELECT date, completed, difficult, win FROM reflections WHERE 1
+        ''', ('date',), after, limit)
+        return [{'date': date, 'completed': completed or '', 'difficult': difficult or '', 'win': win or ''}
+                for date, completed, difficult, win in rows]
+
+    def iter_history(self, kind: str, page_size: int = 50):
+        """Lazily yield a whole history (a HISTORY_KEYS kind) newest first,
+        fetching a page at a time as the consumer advances."""
+        fetch = {
+            'completed': lambda after: self.get_task_log_page('completed', after, page_size),
+            'postponed': lambda after: self.get_task_log_page('postponed', after, page_size),
+            'rewards': lambda after: self.get_reward_log_page(after, page_size),
+            'focus': lambda after: self.get_focus_session_page(after, page_size),
+            'reflections': lambda after: self.get_reflection_page(after, page_size),
+        }[kind]
+        key = self.HISTORY_KEYS[kind]
+        after = None
+        while True:
+            page = fetch(after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = tuple(page[-1][column] for column in key)
+
+    # =====================
+    # SEARCH METHODS
+    # =====================
+    def init_search_index(self, cursor) -> bool:
+        """Create the index and its triggers if missing. Returns True when
+        the index was just created (and so still needs filling)."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+        if cursor.fetchone() is None:
+            # Titles weigh more than bodies; prefix indexes serve search-as-you-type
+            cursor.execute('''
+                CREATE VIRTUAL TABLE search_index USING fts5(
+                    title, body, kind UNINDEXED, ref_id UNINDEXED, day UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+                )
+            ''')
+            cursor.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+            created = True
+        else:
+            created = False
+        for kind, (table, tag, columns, title, body, day, condition) in self.SEARCH_SOURCES.items():
+            entry = (f"INSERT INTO search_index (rowid, title, body, kind, ref_id, day) "
+                     f"SELECT NEW.id * 8 + {tag}, {title}, {body}, '{kind}', NEW.id, {day} "
+                     f"WHERE {condition};").format(row='NEW')
+            drop = f"DELETE FROM search_index WHERE rowid = OLD.id * 8 + {tag};"
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS search_{kind}_insert AFTER INSERT ON {table}
+                BEGIN {entry} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS search_{kind}_update AFTER UPDATE OF {columns} ON {table}
+                BEGIN {drop} {entry} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS search_{kind}_delete AFTER DELETE ON {table}
+                BEGIN {drop} END
+            ''')
+        return created
+
+    def rebuild_search_index(self):
+        """Re-index every source row from scratch."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM search_index')
+        for kind, (table, tag, _, title, body, day, condition) in self.SEARCH_SOURCES.items():
+            cursor.execute((f"INSERT INTO search_index (rowid, title, body, kind, ref_id, day) "
+                            f"SELECT r.id * 8 + {tag}, {title}, {body}, '{kind}', r.id, {day} "
+                            f"FROM {table} r WHERE {condition}").format(row='r'))
+        cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _search_expression(text: str) -> Optional[str]:
+        """FTS5 query matching every word of `text`, the last one as a prefix
+        (so results follow typing). Operators and punctuation are ignored."""
+        words = re.findall(r'\w+', text)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, text: str, kinds: Optional[List[str]] = None, limit: int = 50,
+               mark: tuple = ('<b>', '</b>')) -> List[Dict[str, Any]]:
+        """Best matches first: [{kind, id, day, title, snippet}], with matched
+        words wrapped in `mark` (title highlighted in full, body as a snippet)."""
+        expression = self._search_expression(text)
+        if expression is None:
+            return []
+        start, end = mark
+        sql = '''
+            SELECT kind, ref_id, day,
+                   highlight(search_index, 0, ?, ?),
+                   snippet(search_index, 1, ?, ?, '…', 16)
+            FROM search_index
+            WHERE search_index MATCH ?
+        '''
+        params = [start, end, start, end, expression]
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # No search index (SQLite without FTS5)
+        conn.close()
+        return [{'kind': kind, 'id': ref_id, 'day': day, 'title': title, 'snippet': snippet}
+                for kind, ref_id, day, title, snippet in rows]
+
+    # =====================
+    # UNDO METHODS
+    # =====================
+    def get_table_columns(self, cursor) -> Dict[str, List[str]]:
+        columns = self.table_columns.get(self.db_path)
+        if columns is None:
+            columns = {}
+            for table in self.JOURNALED_TABLES:
+                cursor.execute(f'PRAGMA table_info({table})')
+                columns[table] = [row[1] for row in cursor.fetchall()]
+            self.table_columns[self.db_path] = columns
+        return columns
+
+    @contextmanager
+    def command(self, label: str):
+        """Run the enclosed writes as one undoable command, e.g.
+
+            with db.command("Delete habit"):
+                db.delete_habit(habit_id)
+
+        Writes through any manager on this file join the command. TEMP
+        triggers, which exist only on the command's connection, capture each
+        changed row's before/after image; the compacted images become one
+        journal entry. Nested commands fold into the outer one."""
+        if self.db_path in self.active_commands:
+            yield
+            return
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TEMP TABLE undo_capture (
+                seq INTEGER PRIMARY KEY, tbl TEXT, row_id INTEGER, before TEXT, after TEXT
+            )
+        ''')
+        for table, columns in self.get_table_columns(cursor).items():
+            image = {row: 'json_object(' + ', '.join(f"'{c}', {row}.{c}" for c in columns) + ')'
+                     for row in ('OLD', 'NEW')}
+            capture = 'INSERT INTO undo_capture (tbl, row_id, before, after) VALUES'
+            cursor.execute(f'''CREATE TEMP TRIGGER undo_{table}_insert AFTER INSERT ON main.{table}
+                BEGIN {capture} ('{table}', NEW.rowid, NULL, {image['NEW']}); END''')
+            cursor.execute(f'''CREATE TEMP TRIGGER undo_{table}_update AFTER UPDATE ON main.{table}
+                BEGIN {capture} ('{table}', NEW.rowid, {image['OLD']}, {image['NEW']}); END''')
+            cursor.execute(f'''CREATE TEMP TRIGGER undo_{table}_delete AFTER DELETE ON main.{table}
+                BEGIN {capture} ('{table}', OLD.rowid, {image['OLD']}, NULL); END''')
+
+        self.active_commands[self.db_path] = _CommandConnection(conn)
+        try:
+            yield
+            self.record_command(cursor, label)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            del self.active_commands[self.db_path]
+            conn.close()
+
+    def record_command(self, cursor, label: str):
+        """Compact the captured images into one journal entry: a row changed
+        several times keeps its first before and last after image, updates
+        keep only the columns that changed, and no-op changes are dropped."""
+        cursor.execute('SELECT tbl, row_id, before, after FROM undo_capture ORDER BY seq')
+        images = {}  # (table, rowid) -> [before, after], in first-change order
+        for table, row_id, before, after in cursor.fetchall():
+            key = (table, row_id)
+            if key in images:
+                images[key][1] = after
+            else:
+                images[key] = [before, after]
+
+        deltas = []
+        for (table, row_id), (before, after) in images.items():
+            before = json.loads(before) if before else None
+            after = json.loads(after) if after else None
+            if before is not None and after is not None:
+                changed = [c for c in after if before.get(c) != after[c]]
+                before = {c: before[c] for c in changed}
+                after = {c: after[c] for c in changed}
+                if not changed:
+                    continue
+            elif before is None and after is None:
+                continue  # Created and deleted within the command
+            deltas.append([table, row_id, before, after])
+        if not deltas:
+            return
+
+        now = datetime.now()
+        cursor.execute('DELETE FROM undo_journal WHERE undone = 1')  # A new command ends the redo chain
+        cursor.execute('INSERT INTO undo_journal (label, created_at, deltas) VALUES (?, ?, ?)',
+                       (label, now.isoformat(timespec='seconds'), json.dumps(deltas, separators=(',', ':'))))
+        self.prune_journal(cursor, now)
+
+    def prune_journal(self, cursor, now: datetime):
+        cutoff = (now - timedelta(days=self.JOURNAL_MAX_AGE_DAYS)).isoformat(timespec='seconds')
+        cursor.execute('DELETE FROM undo_journal WHERE created_at < ?', (cutoff,))
+        cursor.execute('''
+            DELETE FROM undo_journal WHERE id IN (
+                SELECT id FROM (
+                    SELECT id,
+                           ROW_NUMBER() OVER (ORDER BY id DESC) AS newer,
+                           SUM(length(deltas)) OVER (ORDER BY id DESC) AS bytes
+                    FROM undo_journal
+                ) WHERE newer > ? OR bytes > ?
+            )
+        ''', (self.JOURNAL_MAX_ENTRIES, self.JOURNAL_MAX_BYTES))
+
+    def apply_deltas(self, cursor, deltas: List[list], forward: bool) -> int:
+        """Replay (forward) or reverse a command's deltas, touching only the
+        rows they name. Returns the net change to the points balance."""
+        columns = self.get_table_columns(cursor)
+        balance_change = 0
+        for table, row_id, before, after in (deltas if forward else reversed(deltas)):
+            if table not in columns:
+                continue
+            source, target = (before, after) if forward else (after, before)
+            if target is None:
+                cursor.execute(f'DELETE FROM {table} WHERE rowid = ?', (row_id,))
+            elif source is None:
+                names = list(target)
+                cursor.execute(f"INSERT OR REPLACE INTO {table} (rowid, {', '.join(names)}) "
+                               f"VALUES (?, {', '.join('?' * len(names))})",
+                               [row_id] + [target[name] for name in names])
+            else:
+                counters = self.COUNTER_COLUMNS.get(table, ())
+                assignments, params = [], []
+                for name, value in target.items():
+                    if name in counters:
+                        difference = value - source[name]
+                        assignments.append(f'{name} = MAX(0, {name} + ?)')
+                        params.append(difference)
+                        if table == 'points_balance':
+                            balance_change += difference
+                    else:
+                        assignments.append(f'{name} = ?')
+                        params.append(value)
+                cursor.execute(f"UPDATE {table} SET {', '.join(assignments)} WHERE rowid = ?",
+                               params + [row_id])
+        return balance_change
+
+    def step_journal(self, undo: bool) -> Optional[Dict[str, Any]]:
+        """Undo the latest command, or redo the latest undone one.
+        Returns {label, points, tables} or None if there is nothing to do."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        if undo:
+            cursor.execute('SELECT id, label, deltas FROM undo_journal WHERE undone = 0 ORDER BY id DESC LIMIT 1')
+        else:
+            cursor.execute('SELECT id, label, deltas FROM undo_journal WHERE undone = 1 ORDER BY id LIMIT 1')
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        entry_id, label, deltas = row
+        deltas = json.loads(deltas)
+        points = self.apply_deltas(cursor, deltas, forward=not undo)
+        cursor.execute('UPDATE undo_journal SET undone = ? WHERE id = ?', (1 if undo else 0, entry_id))
+        conn.commit()
+        conn.close()
+        tables = sorted({delta[0] for delta in deltas})
+        if 'events' in tables or 'event_exceptions' in tables:
+            self.recurrence_cache.clear()
+        return {'label': label, 'points': points, 'tables': tables}
+
+    def undo(self) -> Optional[Dict[str, Any]]:
+        return self.step_journal(undo=True)
+
+    def redo(self) -> Optional[Dict[str, Any]]:
+        return self.step_journal(undo=False)
+
+    # =====================
+    # CALENDAR EVENT METHODS
+    # =====================
+    EVENT_COLUMNS = 'id, date, start_time, title, description, recur_freq, recur_interval, recur_until'
+
+    @staticmethod
+    def _event_from_row(row) -> Dict[str, Any]:
+        event_id, date, start_time, title, description, freq, interval, until = row
+        return {'id': event_id, 'date': date, 'time': start_time,
+                'title': title, 'description': description or '',
+                'recur_freq': freq, 'recur_interval': interval or 1, 'recur_until': until}
+
+    @staticmethod
+    def _occurrence(series: Dict[str, Any], date: str) -> Dict[str, Any]:
+        """Copy of a series dict placed on one of its occurrence dates."""
+        occurrence = dict(series)
+        occurrence['series_date'] = series['date']
+        occurrence['date'] = date
+        return occurrence
+
+    @staticmethod
+    def parse_event_time(time_str: str) -> str:
+        """Normalize a legacy 12-hour time string ("09:30 AM") to 24h "HH:MM".
+        Returns '' if the string cannot be parsed."""
+        if not time_str:
+            return ''
+        time_str = time_str.strip().upper()
+        for fmt, value in (("%I:%M %p", time_str), ("%I:%M%p", time_str.replace(" ", "")), ("%H:%M", time_str)):
+            try:
+                return datetime.strptime(value, fmt).strftime("%H:%M")
+            except ValueError:
+                continue
+        return ''
+
+    def add_event(self, date: str, start_time: str, title: str, description: str = '',
+                  recur_freq: Optional[str] = None, recur_interval: int = 1,
+                  recur_until: Optional[str] = None) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO events (date, start_time, title, description, recur_freq, recur_interval, recur_until)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (date, start_time, title, description, recur_freq, recur_interval, recur_until))
+        conn.commit()
+        event_id = cursor.lastrowid
+        conn.close()
+        if recur_freq:
+            self.recurrence_cache.clear()
+        return event_id
+
+    def update_event(self, event_id: int, date: str, start_time: str, title: str, description: str = '',
+                     recur_freq: Optional[str] = None, recur_interval: int = 1,
+                     recur_until: Optional[str] = None):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE events SET date = ?, start_time = ?, title = ?, description = ?,
+                              recur_freq = ?, recur_interval = ?, recur_until = ?
+            WHERE id = ?
+        ''', (date, start_time, title, description, recur_freq, recur_interval, recur_until, event_id))
+        if not recur_freq:
+            cursor.execute('DELETE FROM event_exceptions WHERE event_id = ?', (event_id,))
+        conn.commit()
+        conn.close()
+        self.recurrence_cache.clear()
+
+    def delete_event(self, event_id: int):
+        """Delete an event, or a recurring event's whole series."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM event_exceptions WHERE event_id = ?', (event_id,))
+        cursor.execute('DELETE FROM events WHERE id = ?', (event_id,))
+        conn.commit()
+        conn.close()
+        self.recurrence_cache.clear()
+
+    def skip_event_occurrence(self, event_id: int, date: str):
+        """Remove a single occurrence of a recurring event."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('INSERT OR IGNORE INTO event_exceptions (event_id, date) VALUES (?, ?)', (event_id, date))
+        conn.commit()
+        conn.close()
+        self.recurrence_cache.clear()
+
+    def get_event(self, event_id: int) -> Optional[Dict[str, Any]]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT {self.EVENT_COLUMNS} FROM events WHERE id = ?', (event_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._event_from_row(row) if row else None
+
+    def _get_month_occurrences(self, year: int, month: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Occurrences of every recurring series in a month, grouped by date.
+        Expanded on first use and cached until an event changes."""
+        key = (year, month)
+        if key in self.recurrence_cache:
+            return self.recurrence_cache[key]
+        
+        month_start, month_end = recurrence.month_bounds(year, month)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {self.EVENT_COLUMNS} FROM events
+            WHERE recur_freq IS NOT NULL AND date <= ?
+              AND (recur_until IS NULL OR recur_until >= ?)
+        ''', (month_end, month_start))
+        series_rows = cursor.fetchall()
+        cursor.execute('SELECT event_id, date FROM event_exceptions WHERE date >= ? AND date <= ?',
+                       (month_start, month_end))
+        skipped = set(cursor.fetchall())
+        conn.close()
+        
+        by_date = {}
+        for row in series_rows:
+            series = self._event_from_row(row)
+            for day in recurrence.occurrences(series['date'], series['recur_freq'], series['recur_interval'],
+                                              series['recur_until'], month_start, month_end):
+                date_str = day.isoformat()
+                if (series['id'], date_str) not in skipped:
+                    by_date.setdefault(date_str, []).append(self._occurrence(series, date_str))
+        
+        self.recurrence_cache[key] = by_date
+        return by_date
+
+    def get_events_in_range(self, start_date: str, end_date: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Get events between two dates (inclusive), grouped by date and
+        ordered by start time. Recurring events are expanded per month."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {self.EVENT_COLUMNS} FROM events
+            WHERE date >= ? AND date <= ? AND recur_freq IS NULL
+            ORDER BY date, start_time, id
+        ''', (start_date, end_date))
+        events = {}
+        for row in cursor.fetchall():
+            event = self._event_from_row(row)
+            events.setdefault(event['date'], []).append(event)
+        conn.close()
+        
+        merged_dates = set()
+        for year, month in recurrence.months_between(start_date, end_date):
+            for date_str, occurrences in self._get_month_occurrences(year, month).items():
+                if start_date <= date_str <= end_date:
+                    events.setdefault(date_str, []).extend(occurrences)
+                    merged_dates.add(date_str)
+        for date_str in merged_dates:
+            events[date_str].sort(key=lambda e: (e['time'], e['id']))
+        return events
+
+    def get_upcoming_events(self, from_date: str, after: Optional[tuple] = None,
+                            limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the next page of one-off events on or after from_date, in time order.
+        `after` is the (date, start_time, id) of the last event already shown;
+        the page is read straight off the (date, start_time) index."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if after is None:
+            cursor.execute(f'''
+                SELECT {self.EVENT_COLUMNS} FROM events
+                WHERE date >= ? AND recur_freq IS NULL
+                ORDER BY date, start_time, id LIMIT ?
+            ''', (from_date, limit))
+        else:
+            cursor.execute(f'''
+                SELECT {self.EVENT_COLUMNS} FROM events
+                WHERE date >= ? AND recur_freq IS NULL AND (date, start_time, id) > (?, ?, ?)
+                ORDER BY date, start_time, id LIMIT ?
+            ''', (from_date, *after, limit))
+        events = [self._event_from_row(row) for row in cursor.fetchall()]
+        conn.close()
+        return events
+
+    def iter_upcoming_events(self, from_date: str, page_size: int = 20):
+        """Lazily yield every event on or after from_date in (date, time) order.
+        One-off events are paged off the index; each recurring series is an
+        unbounded occurrence stream, and all of them are merged on demand."""
+        def one_offs():
+            after = None
+            while True:
+                page = self.get_upcoming_events(from_date, after, page_size)
+                yield from page
+                if len(page) < page_size:
+                    return
+                last = page[-1]
+                after = (last['date'], last['time'], last['id'])
+        
+        def series_stream(series, skipped):
+            for day in recurrence.occurrences(series['date'], series['recur_freq'], series['recur_interval'],
+                                              series['recur_until'], from_date):
+                date_str = day.isoformat()
+                if date_str not in skipped:
+                    yield self._occurrence(series, date_str)
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {self.EVENT_COLUMNS} FROM events
+            WHERE recur_freq IS NOT NULL AND (recur_until IS NULL OR recur_until >= ?)
+        ''', (from_date,))
+        series_rows = cursor.fetchall()
+        cursor.execute('SELECT event_id, date FROM event_exceptions WHERE date >= ?', (from_date,))
+        skipped = {}
+        for event_id, date in cursor.fetchall():
+            skipped.setdefault(event_id, set()).add(date)
+        conn.close()
+        
+        streams = [one_offs()]
+        for row in series_rows:
+            series = self._event_from_row(row)
+            streams.append(series_stream(series, skipped.get(series['id'], set())))
+        return heapq.merge(*streams, key=lambda e: (e['date'], e['time'], e['id']))
+
+    def import_events_json(self, path: str) -> int:
+        """One-time import of the legacy events.json file.
+        Returns the number of events imported (0 if already imported)."""
+        if self.get_setting('events_json_imported') == 'true' or not os.path.exists(path):
+            return 0
+        
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        
+        rows = []
+        for date_str, events in (data.items() if isinstance(data, dict) else []):
+            try:
+                datetime.strptime(date_str, "%Y-%m-%d")
+            except (ValueError, TypeError):
+                continue  # Skip corrupted date keys
+            if not isinstance(events, list):
+                continue
+            for event in events:
+                if isinstance(event, dict) and event.get('title'):
+                    rows.append((date_str, self.parse_event_time(event.get('time', '')),
+                                 event['title'], event.get('description', '')))
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO events (date, start_time, title, description) VALUES (?, ?, ?, ?)
+        ''', rows)
+        cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', ('events_json_imported', 'true'))
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    # =====================
+    # FOCUS ANALYTICS
+    # =====================
+    @staticmethod
+    def _split_by_hour(start: datetime, end: datetime):
+        """Yield (hour_start, seconds) for each clock hour a span touches."""
+        current = start
+        while current < end:
+            next_hour = current.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            chunk_end = min(next_hour, end)
+            yield current, round((chunk_end - current).total_seconds())
+            current = chunk_end
+
+    def apply_focus_rollup(self, cursor, start: datetime, end: datetime):
+        """Add one completed focus span to the rollups, inside the caller's
+        transaction (the same one that closes the session row)."""
+        new_session = 1  # The session counts towards the day it started on
+        for hour_start, seconds in self._split_by_hour(start, end):
+            day = hour_start.strftime("%Y-%m-%d")
+            cursor.execute('''
+                INSERT INTO focus_daily (date, seconds, sessions) VALUES (?, ?, ?)
+                ON CONFLICT(date) DO UPDATE SET seconds = seconds + excluded.seconds,
+                                                sessions = sessions + excluded.sessions
+            ''', (day, seconds, new_session))
+            new_session = 0
+            cursor.execute('''
+                INSERT INTO focus_weekday_hour (weekday, hour, seconds) VALUES (?, ?, ?)
+                ON CONFLICT(weekday, hour) DO UPDATE SET seconds = seconds + excluded.seconds
+            ''', (hour_start.weekday(), hour_start.hour, seconds))
+
+    def rebuild_focus_rollups(self):
+        """Recompute the rollups from every completed focus session (one scan)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM focus_daily')
+        cursor.execute('DELETE FROM focus_weekday_hour')
+        cursor.execute('''
+            SELECT start_time, end_time FROM focus_sessions
+            WHERE completed = 1 AND session_type = 'focus' AND end_time IS NOT NULL
+        ''')
+        for start_time, end_time in cursor.fetchall():
+            try:
+                self.apply_focus_rollup(cursor, datetime.fromisoformat(start_time), datetime.fromisoformat(end_time))
+            except ValueError:
+                continue  # Skip malformed timestamps
+        cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', ('focus_rollups_built', 'true'))
+        conn.commit()
+        conn.close()
+
+    def get_focus_daily(self, start_date: str, end_date: str) -> Dict[str, int]:
+        """Completed focus minutes per date (inclusive range); days without focus are omitted."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT date, seconds FROM focus_daily WHERE date >= ? AND date <= ?
+        ''', (start_date, end_date))
+        minutes = {date: seconds // 60 for date, seconds in cursor.fetchall()}
+        conn.close()
+        return minutes
+
+    def get_focus_by_hour(self) -> List[int]:
+        """All-time completed focus minutes for each hour of the day (0-23)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT hour, SUM(seconds) FROM focus_weekday_hour GROUP BY hour')
+        minutes = [0] * 24
+        for hour, seconds in cursor.fetchall():
+            minutes[hour] = seconds // 60
+        conn.close()
+        return minutes
+
+    def get_focus_by_weekday(self) -> List[int]:
+        """All-time completed focus minutes for each weekday (Mon-Sun)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT weekday, SUM(seconds) FROM focus_weekday_hour GROUP BY weekday')
+        minutes = [0] * 7
+        for weekday, seconds in cursor.fetchall():
+            minutes[weekday] = seconds // 60
+        conn.close()
+        return minutes
+
     # =====================
     # DASHBOARD HELPERS
     # =====================
+    def get_task_counts(self) -> Dict[str, int]:
+        """Open tasks, and open tasks starred as Top 3."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(is_top3 = 1), 0) FROM tasks WHERE is_completed = 0')
+        pending, top3_pending = cursor.fetchone()
+        conn.close()
+        return {'pending_tasks': pending, 'top3_pending': top3_pending}
+
+    def get_dashboard_stats(self, today: str) -> Dict[str, Any]:
+        """Stat-card values plus summed habit points for each of the 7 days
+        ending `today` (oldest first), in one query."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            WITH RECURSIVE days(day) AS (
+                SELECT date(?, '-6 days')
+                UNION ALL
+                SELECT date(day, '+1 day') FROM days WHERE day < ?
+            )
+            SELECT d.day, COALESCE(SUM(l.status), 0), COALESCE(SUM(l.status = 2), 0),
+                   (SELECT COUNT(*) FROM habits),
+                   (SELECT COUNT(*) FROM tasks WHERE is_completed = 0),
+                   (SELECT COUNT(*) FROM tasks WHERE is_completed = 0 AND is_top3 = 1),
+                   (SELECT balance FROM points_balance WHERE id = 1)
+            FROM days d LEFT JOIN habit_logs l ON l.date = d.day
+            GROUP BY d.day
+            ORDER BY d.day
+        ''', (today, today))
+        rows = cursor.fetchall()
+        conn.close()
+        _, _, habits_done, total_habits, pending, top3_pending, balance = rows[-1]
+        return {
+            'week_points': [row[1] for row in rows],
+            'habits_done': habits_done,
+            'total_habits': total_habits,
+            'pending_tasks': pending,
+            'top3_pending': top3_pending,
+            'points_balance': balance or 0,
+        }
+
     def get_todays_stats(self) -> Dict[str, Any]:
         today = datetime.now().strftime("%Y-%m-%d")
         conn = self.get_connection()
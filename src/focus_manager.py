@@ -3,10 +3,13 @@ Focus Manager - Business logic for Pomodoro and Time Block focus sessions.
 Provides a calm, minimal focus tracking experience.
 """
 
+import json
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from database import DatabaseManager
+from interval_index import IntervalIndex
+from points_manager import PointsManager
 
 
 class FocusMode(Enum):
@@ -30,8 +33,12 @@ class FocusManager:
     LONG_BREAK_DURATION = 15
     SESSIONS_BEFORE_LONG_BREAK = 4
     
+    # Settings key of the session journal (see _save_journal)
+    JOURNAL_KEY = 'focus_journal'
+    
     def __init__(self, db: DatabaseManager = None):
         self.db = db or DatabaseManager()
+        self.points = PointsManager(self.db)
         
         # Current state
         self.mode = FocusMode.POMODORO
@@ -45,16 +52,18 @@ class FocusManager:
         self.is_running: bool = False
         self.paused_remaining: Optional[int] = None  # For pause functionality
         
-        # Time Block state
-        self.timeblock_start: Optional[datetime] = None
-        self.timeblock_end: Optional[datetime] = None
-        self.timeblock_task_name: str = ""
+        # Time Block state: every current and future block, indexed by time
+        self.blocks = IntervalIndex()
         
         # Current session ID (for database)
         self.current_session_id: Optional[int] = None
         
         # Load settings
         self._load_settings()
+        
+        # Pick up a session interrupted by a crash or close
+        self.recover_session()
+        self._load_timeblocks()
     
     def _load_settings(self):
         """Load focus settings from database."""
@@ -86,6 +95,7 @@ class FocusManager:
         
         # Log session start
         self.current_session_id = self._log_session_start('pomodoro', 'focus')
+        self._save_journal()
         
         return True
     
@@ -109,6 +119,7 @@ class FocusManager:
         
         # Log break start
         self.current_session_id = self._log_session_start('pomodoro', self.phase.value)
+        self._save_journal()
         
         return True
     
@@ -130,6 +141,7 @@ class FocusManager:
                 self._log_session_end(self.current_session_id, completed=False)
         
         self._reset_state()
+        self._save_journal()
         return result
     
     def tick(self) -> Dict[str, Any]:
@@ -155,20 +167,23 @@ class FocusManager:
         completed_phase = self.phase
         
         # Log completion
+        points = 0
         if self.current_session_id:
-            self._log_session_end(self.current_session_id, completed=True)
+            points = self._log_session_end(self.current_session_id, completed=True)
         
         if completed_phase == PomodoroPhase.FOCUS:
             self.session_count += 1
         
         self._reset_state()
+        self._save_journal()
         
         return {
             'completed': True,
             'phase': completed_phase.value,
             'session_count': self.session_count,
             'remaining_seconds': 0,
-            'is_running': False
+            'is_running': False,
+            'points': points
         }
     
     def _reset_state(self):
@@ -211,13 +226,11 @@ class FocusManager:
         if self._has_overlapping_session(start, end):
             return {'success': False, 'error': 'Time block overlaps with existing session'}
         
-        self.timeblock_start = start
-        self.timeblock_end = end
-        self.timeblock_task_name = task_name
-        
         # Log to database
         duration = int((end - start).total_seconds() / 60)
         session_id = self._log_timeblock(start, end, duration, task_name)
+        if session_id:
+            self.blocks.add(start, end, session_id, self._block(session_id, start, end, task_name))
         
         return {
             'success': True,
@@ -227,46 +240,80 @@ class FocusManager:
             'duration_minutes': duration
         }
     
-    def clear_timeblock(self):
-        """Clear the scheduled time block."""
-        self.timeblock_start = None
-        self.timeblock_end = None
-        self.timeblock_task_name = ""
+    def clear_timeblock(self, block_id: Optional[int] = None):
+        """Cancel a scheduled block (by default the current or next one)."""
+        if block_id is None:
+            block = self.current_or_next_block()
+            if not block:
+                return
+            block_id = block['id']
+        if self.blocks.remove(block_id):
+            self._delete_timeblock(block_id)
+    
+    def current_or_next_block(self, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        now = now or datetime.now()
+        return self.blocks.at(now) or self.blocks.next_after(now)
+    
+    def next_block_transition(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """When the block state next changes: the end of the block in
+        progress, else the start of the next one."""
+        now = now or datetime.now()
+        current = self.blocks.at(now)
+        if current:
+            return current['end']
+        upcoming = self.blocks.next_after(now)
+        return upcoming['start'] if upcoming else None
+    
+    def process_block_transitions(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Complete every block that has ended by `now` and drop it from the
+        index. Returns the ended blocks, the points they earned and the block
+        now in progress."""
+        now = now or datetime.now()
+        ended = [b for b in self.blocks.overlapping(datetime.min, now) if b['end'] <= now]
+        points = 0
+        for block in ended:
+            points += self._complete_timeblock(block)
+            self.blocks.remove(block['id'])
+        return {'ended': ended, 'points': points, 'current': self.blocks.at(now)}
+    
+    def get_blocks_between(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Blocks intersecting [start, end), in start order (planner view)."""
+        return self.blocks.overlapping(start, end)
     
     def get_timeblock_status(self) -> Dict[str, Any]:
-        """Get current time block status."""
-        if not self.timeblock_start:
-            return {'active': False}
-        
+        """Status of the block in progress, or else the next scheduled one."""
         now = datetime.now()
+        block = self.current_or_next_block(now)
+        if not block:
+            return {'active': False}
         
-        if now < self.timeblock_start:
+        if now < block['start']:
             status = 'scheduled'
-            remaining = (self.timeblock_start - now).total_seconds()
-        elif now < self.timeblock_end:
+            remaining = (block['start'] - now).total_seconds()
+        elif now < block['end']:
             status = 'in_progress'
-            remaining = (self.timeblock_end - now).total_seconds()
+            remaining = (block['end'] - now).total_seconds()
         else:
             status = 'completed'
             remaining = 0
         
         return {
             'active': True,
+            'id': block['id'],
             'status': status,
-            'start': self.timeblock_start.isoformat(),
-            'end': self.timeblock_end.isoformat(),
-            'task_name': self.timeblock_task_name,
+            'start': block['start'].isoformat(),
+            'end': block['end'].isoformat(),
+            'task_name': block['task_name'],
             'remaining_seconds': int(remaining)
         }
     
     def _has_overlapping_session(self, start: datetime, end: datetime) -> bool:
-        """Check if there's an overlapping time block."""
-        # For now, just check against current timeblock
-        if self.timeblock_start and self.timeblock_end:
-            # Check overlap: sessions overlap if one starts before the other ends
-            if start < self.timeblock_end and end > self.timeblock_start:
-                return True
-        return False
+        """Check if [start, end) overlaps any scheduled time block."""
+        return self.blocks.overlaps(start, end)
+    
+    @staticmethod
+    def _block(block_id: int, start: datetime, end: datetime, task_name: str) -> Dict[str, Any]:
+        return {'id': block_id, 'start': start, 'end': end, 'task_name': task_name or ''}
     
     # =====================
     # DATABASE METHODS
@@ -292,8 +339,9 @@ class FocusManager:
             print(f"Error logging session start: {e}")
             return 0
     
-    def _log_session_end(self, session_id: int, completed: bool):
-        """Log session end to database."""
+    def _log_session_end(self, session_id: int, completed: bool) -> int:
+        """Log session end to database. Returns points earned."""
+        points = 0
         try:
             conn = self.db.get_connection()
             cursor = conn.cursor()
@@ -301,7 +349,7 @@ class FocusManager:
             end_time = datetime.now()
             
             # Get start time to calculate duration
-            cursor.execute('SELECT start_time FROM focus_sessions WHERE id = ?', (session_id,))
+            cursor.execute('SELECT start_time, session_type FROM focus_sessions WHERE id = ?', (session_id,))
             row = cursor.fetchone()
             
             if row:
@@ -313,11 +361,104 @@ class FocusManager:
                     SET end_time = ?, duration_minutes = ?, completed = ?
                     WHERE id = ?
                 ''', (end_time.isoformat(), duration, 1 if completed else 0, session_id))
+                if completed and row[1] == 'focus':
+                    self.db.apply_focus_rollup(cursor, start_time, end_time)
+                    points = self.points.award_focus_points(session_id, duration,
+                                                            start_time.date().isoformat(), cursor)
             
             conn.commit()
             conn.close()
         except Exception as e:
             print(f"Error logging session end: {e}")
+        return points
+    
+    def _save_journal(self):
+        """Persist the running session so it survives a crash or close.
+        Written only on transitions (start, stop, completion), never per tick."""
+        journal = {'session_count': self.session_count}
+        if self.is_running and self.current_session_id:
+            journal.update({
+                'session_id': self.current_session_id,
+                'phase': self.phase.value,
+                'start': self.start_time.isoformat(),
+                'end': self.end_time.isoformat()
+            })
+        try:
+            self.db.set_setting(self.JOURNAL_KEY, json.dumps(journal))
+        except Exception as e:
+            print(f"Error saving focus journal: {e}")
+    
+    def recover_session(self) -> Dict[str, Any]:
+        """Restore or close out the journaled session, then close every other
+        open pomodoro row, all in one transaction.
+        
+        A session whose end time has not passed resumes with the correct
+        remaining time; one that ran out while the app was closed is logged
+        as completed at its scheduled end, exactly as tick() would have.
+        """
+        result = {'restored': False, 'completed': False, 'orphans_closed': 0}
+        try:
+            journal = json.loads(self.db.get_setting(self.JOURNAL_KEY, '') or '{}')
+        except ValueError:
+            journal = {}
+        self.session_count = int(journal.get('session_count', 0))
+        
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            
+            keep_open = None
+            session_id = journal.get('session_id')
+            if session_id:
+                cursor.execute('SELECT start_time FROM focus_sessions WHERE id = ? AND end_time IS NULL',
+                               (session_id,))
+                row = cursor.fetchone()
+                if row:
+                    phase = PomodoroPhase(journal['phase'])
+                    end = datetime.fromisoformat(journal['end'])
+                    now = datetime.now()
+                    if end > now:
+                        self.mode = FocusMode.POMODORO
+                        self.phase = phase
+                        self.start_time = datetime.fromisoformat(journal['start'])
+                        self.end_time = end
+                        self.remaining_seconds = max(1, int((end - now).total_seconds()))
+                        self.is_running = True
+                        self.current_session_id = session_id
+                        keep_open = session_id
+                        result['restored'] = True
+                    else:
+                        duration = int((end - datetime.fromisoformat(row[0])).total_seconds() / 60)
+                        cursor.execute('''
+                            UPDATE focus_sessions SET end_time = ?, duration_minutes = ?, completed = 1
+                            WHERE id = ?
+                        ''', (end.isoformat(), duration, session_id))
+                        if phase == PomodoroPhase.FOCUS:
+                            start = datetime.fromisoformat(row[0])
+                            self.session_count += 1
+                            self.db.apply_focus_rollup(cursor, start, end)
+                            self.points.award_focus_points(session_id, duration, start.date().isoformat(), cursor)
+                        result['completed'] = True
+            
+            # Orphans: pomodoro rows that were never closed (no journal, or older crashes)
+            cursor.execute('''
+                UPDATE focus_sessions SET end_time = start_time, duration_minutes = 0, completed = 0
+                WHERE end_time IS NULL AND id IS NOT ?
+            ''', (keep_open,))
+            result['orphans_closed'] = cursor.rowcount
+            
+            journal_state = {'session_count': self.session_count}
+            if keep_open:
+                journal_state = journal
+                journal_state['session_count'] = self.session_count
+            cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                           (self.JOURNAL_KEY, json.dumps(journal_state)))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Error recovering focus session: {e}")
+        
+        return result
     
     def _log_timeblock(self, start: datetime, end: datetime, duration: int, task_name: str) -> int:
         """Log time block to database."""
@@ -326,9 +467,9 @@ class FocusManager:
             cursor = conn.cursor()
             
             cursor.execute('''
-                INSERT INTO focus_sessions (mode, start_time, end_time, duration_minutes, session_type)
-                VALUES (?, ?, ?, ?, ?)
-            ''', ('timeblock', start.isoformat(), end.isoformat(), duration, 'focus'))
+                INSERT INTO focus_sessions (mode, start_time, end_time, duration_minutes, session_type, task_name)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', ('timeblock', start.isoformat(), end.isoformat(), duration, 'focus', task_name))
             
             session_id = cursor.lastrowid
             conn.commit()
@@ -339,6 +480,60 @@ class FocusManager:
             print(f"Error logging timeblock: {e}")
             return 0
     
+    def _load_timeblocks(self):
+        """Index every block that has not ended yet, so schedules survive
+        restarts, plus blocks that ended uncompleted while the app was closed,
+        so the next process_block_transitions() completes them."""
+        since = self.db.get_setting('timeblocks_completed_since', datetime.now().isoformat())
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, start_time, end_time, task_name FROM focus_sessions
+                WHERE mode = 'timeblock' AND end_time > ? AND (completed = 0 OR end_time > ?)
+            ''', (since, datetime.now().isoformat()))
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"Error loading timeblocks: {e}")
+            rows = []
+        
+        intervals = []
+        for block_id, start_time, end_time, task_name in rows:
+            start, end = datetime.fromisoformat(start_time), datetime.fromisoformat(end_time)
+            intervals.append((start, end, block_id, self._block(block_id, start, end, task_name)))
+        self.blocks = IntervalIndex(intervals)
+    
+    def _complete_timeblock(self, block: Dict[str, Any]) -> int:
+        """Mark a finished block completed and credit it to the focus rollups
+        and the points balance. Returns points earned."""
+        points = 0
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE focus_sessions SET completed = 1 WHERE id = ? AND completed = 0",
+                           (block['id'],))
+            if cursor.rowcount:
+                self.db.apply_focus_rollup(cursor, block['start'], block['end'])
+                minutes = int((block['end'] - block['start']).total_seconds() / 60)
+                points = self.points.award_focus_points(block['id'], minutes,
+                                                        block['start'].date().isoformat(), cursor)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Error completing timeblock: {e}")
+        return points
+    
+    def _delete_timeblock(self, session_id: int):
+        try:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM focus_sessions WHERE id = ? AND mode = 'timeblock'", (session_id,))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Error deleting timeblock: {e}")
+    
     # =====================
     # UTILITY METHODS
     # =====================
@@ -0,0 +1,96 @@
+"""
+Interval Index - Sorted interval store for scheduled time blocks.
+Intervals are half-open [start, end) and kept sorted by start, alongside a
+running maximum of end times, so overlap, point and "next" queries are
+binary searches.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, List, Optional, Tuple
+
+
+class IntervalIndex:
+    """
+    Static-array interval index: O(log n) queries, O(n) inserts/removals
+    (a list shift), which is the right trade for a planner's few hundred
+    blocks that are read on every tick but written by hand.
+    """
+
+    def __init__(self, intervals=()):
+        # Parallel arrays sorted by (start, key)
+        self.starts: List[Any] = []
+        self.ends: List[Any] = []
+        self.keys: List[Any] = []
+        self.values: List[Any] = []
+        self.max_end: List[Any] = []  # max(ends[0..i]), non-decreasing
+        for start, end, key, value in sorted(intervals, key=lambda i: (i[0], i[2])):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.keys.append(key)
+            self.values.append(value)
+        self._rebuild_max_end(0)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def _rebuild_max_end(self, first: int):
+        del self.max_end[first:]
+        running = self.max_end[first - 1] if first > 0 else None
+        for end in self.ends[first:]:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+    def add(self, start, end, key, value=None):
+        if not start < end:
+            raise ValueError("Interval must have start < end")
+        pos = bisect_right(self.starts, start)
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+        self.keys.insert(pos, key)
+        self.values.insert(pos, value)
+        self._rebuild_max_end(pos)
+
+    def remove(self, key) -> bool:
+        try:
+            pos = self.keys.index(key)
+        except ValueError:
+            return False
+        for array in (self.starts, self.ends, self.keys, self.values):
+            del array[pos]
+        self._rebuild_max_end(pos)
+        return True
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Values of every interval intersecting [start, end)."""
+        stop = bisect_left(self.starts, end)  # Candidates start before `end`
+        first = bisect_right(self.max_end, start, 0, stop)  # Nothing earlier ends after `start`
+        return [self.values[i] for i in range(first, stop) if self.ends[i] > start]
+
+    def overlaps(self, start, end) -> bool:
+        stop = bisect_left(self.starts, end)
+        return stop > 0 and self.max_end[stop - 1] > start
+
+    def at(self, point) -> Optional[Any]:
+        """Value of an interval containing `point` (the latest-starting one)."""
+        stop = bisect_right(self.starts, point)
+        if stop == 0 or self.max_end[stop - 1] <= point:
+            return None
+        for i in range(stop - 1, -1, -1):
+            if self.ends[i] > point:
+                return self.values[i]
+        return None
+
+    def next_after(self, point) -> Optional[Any]:
+        """Value of the first interval starting strictly after `point`."""
+        pos = bisect_right(self.starts, point)
+        return self.values[pos] if pos < len(self.values) else None
+
+    def bounds(self, key) -> Optional[Tuple[Any, Any]]:
+        try:
+            pos = self.keys.index(key)
+        except ValueError:
+            return None
+        return self.starts[pos], self.ends[pos]
@@ -1,78 +1,204 @@
 """
 Points Manager - Handles all point calculations and awards
 """
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
 from database import DatabaseManager
+from rules_engine import DomainEvent, RulesEngine
+
+class _StoredHistory:
+    """Rules-engine context answered from the domain_events table."""
+    
+    def __init__(self, db: DatabaseManager, cursor):
+        self.db = db
+        self.cursor = cursor
+    
+    def prior_award(self, event: DomainEvent) -> int:
+        return self.db.get_event_award(self.cursor, event.kind, event.subject, event.day)
+    
+    def prior_count(self, event: DomainEvent) -> int:
+        return self.db.count_event_subjects(self.cursor, event.kind, event.day, event.subject)
+    
+    def history(self, event: DomainEvent, first_day: str, last_day: str):
+        return self.db.get_event_history(self.cursor, event.kind, event.subject, first_day, last_day)
+
 
 class PointsManager:
-    """Manages points calculation and awarding for habits and tasks."""
+    """Manages points calculation and awarding for habits and tasks.
+    Per-action point values live in the rules (see rules_engine)."""
     
-    # Point values
-    HABIT_DONE_POINTS = 2
-    HABIT_PARTIAL_POINTS = 1
-    HABIT_MISSED_POINTS = 0
+    RULES_KEY = 'points_rules'
     
-    MISSED_HIGH_PRIORITY_PENALTY = -2
     WEEKLY_CONSISTENCY_BONUS = 10
+    WEEKLY_CONSISTENCY_THRESHOLD = 0.8  # Share of habit-days marked Done
     
     def __init__(self, db: DatabaseManager):
         self.db = db
+        self.engine = RulesEngine.from_json(db.get_setting(self.RULES_KEY))
     
-    def award_habit_points(self, habit_id: int, status: int) -> int:
-        """Award points based on habit status (0=missed, 1=partial, 2=done)"""
-        if status == 2:
-            points = self.HABIT_DONE_POINTS
-        elif status == 1:
-            points = self.HABIT_PARTIAL_POINTS
-        else:
-            points = self.HABIT_MISSED_POINTS
-        
-        if points > 0:
-            self.db.add_points(points)
-        return points
+    def record_event(self, kind: str, subject: str, payload: Optional[Dict[str, Any]] = None,
+                     day: Optional[str] = None, cursor=None) -> Optional[int]:
+        """
+        Evaluate one domain event against the rules, store it and apply its
+        points, in one transaction (the caller's, if a cursor is given).
+        Returns points applied, or None if the balance can't cover it.
+        """
+        event = DomainEvent(kind, subject, day or date.today().isoformat(), payload or {})
+        conn = None
+        if cursor is None:
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+        try:
+            points = self.engine.evaluate(event, _StoredHistory(self.db, cursor))
+            event_id = self.db.insert_domain_event(cursor, event.kind, event.subject, event.day,
+                                                   event.payload, points, self.engine.requires_funds(kind),
+                                                   self.engine.replaces(kind))
+            if conn is not None and event_id is not None:
+                conn.commit()
+            return points if event_id is not None else None
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def set_rules(self, rules: Dict[str, Dict[str, Any]]) -> int:
+        """Adopt new rules and re-evaluate the whole event history under them.
+        Returns the net change to the balance."""
+        self.engine = RulesEngine(rules)
+        self.db.set_setting(self.RULES_KEY, self.engine.to_json())
+        return self.reevaluate()
+    
+    def reevaluate(self) -> int:
+        """Replay every recorded event under the current rules, store the new
+        points and shift the balance by the difference. Returns the shift."""
+        rows = self.db.get_domain_events()
+        old_points = {row[0]: row[5] for row in rows}
+        events = ((event_id, DomainEvent(kind, subject, day, json.loads(payload)))
+                  for event_id, kind, subject, day, payload, _ in rows)
+        changes = [(points, event_id) for event_id, points in self.engine.replay(events)
+                   if points != old_points[event_id]]
+        delta = sum(points - old_points[event_id] for points, event_id in changes)
+        if changes:
+            self.db.rewrite_event_points(changes, delta)
+        return delta
+    
+    def award_habit_points(self, habit_id: int, status: int, day: Optional[str] = None) -> int:
+        """Record a habit status (0=missed, 1=partial, 2=done) for a day.
+        Re-logging a day replaces its earlier award. Returns the points change."""
+        return self.record_event('habit_logged', f"habit:{habit_id}", {'status': status}, day)
     
     def award_task_points(self, task_id: int) -> int:
         """Award points for completing a task. Returns points awarded."""
         points = self.db.complete_task(task_id)
-        if points > 0:
-            self.db.add_points(points)
-        return points
+        return self.record_event('task_completed', f"task:{task_id}", {'points': points})
     
-    def penalize_missed_high_priority(self, task_id: int) -> int:
+    def penalize_missed_high_priority(self, task_id: int, priority: int = 3,
+                                      day: Optional[str] = None, cursor=None) -> int:
         """Apply penalty for missing a high-priority task. Returns penalty applied."""
-        # This should be called when a high-priority task deadline passes
-        penalty = abs(self.MISSED_HIGH_PRIORITY_PENALTY)
-        self.db.deduct_points(penalty)
-        return penalty
+        points = self.record_event('task_missed', f"task:{task_id}", {'priority': priority}, day, cursor)
+        return -(points or 0)
     
-    def check_weekly_bonus(self) -> int:
+    def sweep_overdue_tasks(self, today: Optional[date] = None) -> int:
         """
-        Check if user gets weekly consistency bonus.
-        Criteria: Complete at least 80% of habits for 7 days.
-        Returns bonus awarded (0 if not eligible).
+        Penalize every high-priority task whose deadline passed before today
+        and that hasn't been penalized for that deadline, in one transaction,
+        so days spent away are settled in a single batch. Deadlines from
+        before the sweep was installed are never charged. Returns the total
+        penalty applied.
         """
-        # Simplified: check if all habits have at least 5 "Done" entries in last 7 days
-        habits = self.db.get_habits()
-        if not habits:
+        today = today or date.today()
+        since = self.db.get_setting('overdue_penalties_since', today.isoformat())
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        total = 0
+        try:
+            for task_id, deadline in self.db.get_unpenalized_overdue_tasks(cursor, since, today.isoformat()):
+                penalty = self.penalize_missed_high_priority(task_id, 3, deadline[:10], cursor)
+                self.db.mark_task_penalized(cursor, task_id, deadline, penalty)
+                total += penalty
+            conn.commit()
+        finally:
+            conn.close()
+        return total
+    
+    def award_focus_points(self, session_id: int, minutes: int, day: str, cursor=None) -> int:
+        """Credit a completed focus session (once per session)."""
+        return self.record_event('focus_completed', f"focus:{session_id}", {'minutes': minutes}, day, cursor)
+    
+    def claim_reward(self, reward_id: int) -> bool:
+        """Claim a reward if balance is sufficient. Returns True if successful."""
+        cost = self.db.get_reward_cost(reward_id)
+        if cost is None:
+            return False
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            if self.record_event('reward_claimed', f"reward:{reward_id}", {'cost': cost}, cursor=cursor) is None:
+                return False
+            self.db.log_reward_claim(cursor, reward_id)
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def iso_week_key(week_start: str) -> str:
+        year, week, _ = date.fromisoformat(week_start).isocalendar()
+        return f"{year}-W{week:02d}"
+    
+    def _evaluate_weeks(self, weeks, final: bool):
+        """Turn (week_start, done, possible) rows into weekly_bonus_log rows.
+        Unfinished weeks are only recorded once they qualify, so they can
+        still be re-checked later in the week."""
+        records = []
+        for week_start, done, possible in weeks:
+            qualifies = possible > 0 and done / possible >= self.WEEKLY_CONSISTENCY_THRESHOLD
+            if qualifies or final:
+                bonus = self.WEEKLY_CONSISTENCY_BONUS if qualifies else 0
+                records.append((self.iso_week_key(week_start), week_start, done, possible, bonus))
+        return records
+    
+    def check_weekly_bonus(self, today: Optional[date] = None) -> int:
+        """
+        Award the weekly consistency bonus for the current ISO week once at
+        least 80% of its habit-days are Done. Each week pays out at most once.
+        Returns bonus awarded (0 if not eligible or already awarded).
+        """
+        today = today or date.today()
+        monday = (today - timedelta(days=today.weekday())).isoformat()
+        weeks = self.db.get_weekly_consistency(monday, monday)
+        records = self._evaluate_weeks(weeks, final=False)
+        return self.db.record_weekly_bonuses(records) if records else 0
+    
+    def backfill_weekly_bonuses(self, today: Optional[date] = None) -> int:
+        """
+        Evaluate every finished week since the last one evaluated (or since
+        the first habit was created, but never before the bonus was
+        installed) in one batch. Returns points awarded.
+        """
+        today = today or date.today()
+        this_monday = today - timedelta(days=today.weekday())
+        last_done = self.db.get_last_bonus_week(this_monday.isoformat())
+        if last_done:
+            first = date.fromisoformat(last_done) + timedelta(days=7)
+        else:
+            first_habit = self.db.get_first_habit_date()
+            if not first_habit:
+                return 0
+            since = self.db.get_setting('weekly_bonus_since', today.isoformat())
+            start = max(date.fromisoformat(first_habit[:10]), date.fromisoformat(since))
+            first = start - timedelta(days=start.weekday())
+        last = this_monday - timedelta(days=7)
+        if first > last:
             return 0
         
-        total_possible = len(habits) * 7
-        total_done = 0
-        
-        for habit in habits:
-            week_points = self.db.get_week_habit_points(habit[0])
-            total_done += sum(1 for p in week_points if p == 2)
-        
-        if total_possible > 0 and (total_done / total_possible) >= 0.8:
-            self.db.add_points(self.WEEKLY_CONSISTENCY_BONUS)
-            return self.WEEKLY_CONSISTENCY_BONUS
-        
-        return 0
+        weeks = self.db.get_weekly_consistency(first.isoformat(), last.isoformat())
+        return self.db.record_weekly_bonuses(self._evaluate_weeks(weeks, final=True))
     
     def can_unlock_rewards(self) -> bool:
         """Check if user can unlock rewards (all high-priority tasks completed today)."""
-        stats = self.db.get_todays_stats()
         # Simple check: no pending top3 tasks
-        return stats['top3_pending'] == 0
+        return self.db.get_task_counts()['top3_pending'] == 0
     
     def get_balance(self) -> int:
         """Get current points balance."""
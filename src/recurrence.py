@@ -0,0 +1,85 @@
+"""
+Recurrence - Lazy expansion of recurring calendar events.
+A series is stored once (its first date plus a rule) and only expanded
+for the date windows that are actually displayed.
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def _parse(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value) if value else None
+
+
+def occurrences(start, freq: str, interval: int = 1, until=None,
+                window_start=None, window_end=None) -> Iterator[date]:
+    """Yield the dates of a series that fall within [window_start, window_end].
+
+    Dates may be `date` objects or "YYYY-MM-DD" strings. The first
+    occurrence in the window is computed arithmetically, so a series that
+    started years ago costs nothing to skip. With no window_end and no
+    `until`, the generator is unbounded. Monthly series on the 29th-31st
+    skip months that don't have that day.
+    """
+    start = _parse(start)
+    until = _parse(until)
+    interval = max(1, int(interval or 1))
+    lo = max(start, _parse(window_start) or start)
+    hi = _parse(window_end)
+    if until is not None:
+        hi = until if hi is None else min(hi, until)
+    if hi is not None and lo > hi:
+        return
+
+    if freq in ("daily", "weekly"):
+        step = interval * (7 if freq == "weekly" else 1)
+        k = -(-(lo - start).days // step)  # ceil division
+        current = start + timedelta(days=k * step)
+        while hi is None or current <= hi:
+            yield current
+            current += timedelta(days=step)
+    elif freq == "monthly":
+        first = start.year * 12 + start.month - 1
+        k = -(-(lo.year * 12 + lo.month - 1 - first) // interval)
+        index = first + k * interval
+        while True:
+            year, month = divmod(index, 12)
+            month += 1
+            if hi is not None and (year, month) > (hi.year, hi.month):
+                return
+            if start.day <= calendar.monthrange(year, month)[1]:
+                current = date(year, month, start.day)
+                if current >= lo and (hi is None or current <= hi):
+                    yield current
+            index += interval
+    else:
+        raise ValueError(f"Unknown recurrence frequency: {freq!r}")
+
+
+def month_bounds(year: int, month: int):
+    """First and last date of a month as "YYYY-MM-DD" strings."""
+    last = calendar.monthrange(year, month)[1]
+    return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last:02d}"
+
+
+def months_between(start_date: str, end_date: str) -> Iterator[tuple]:
+    """Yield (year, month) for every month touched by an inclusive date range."""
+    start, end = _parse(start_date), _parse(end_date)
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def describe(freq: Optional[str], interval: int = 1) -> str:
+    """Short human label for a rule ("Weekly", "Every 2 months")."""
+    if not freq:
+        return ""
+    unit = {"daily": "day", "weekly": "week", "monthly": "month"}[freq]
+    return freq.capitalize() if interval <= 1 else f"Every {interval} {unit}s"
@@ -0,0 +1,193 @@
+"""
+Rules Engine - Declarative point rules evaluated over domain events.
+Habit, task, focus and reward actions are recorded as events; the points
+each one is worth come from a rule table that is plain data (JSON), so the
+same history can be replayed under new rules.
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+# One rule per event kind. Supported keys:
+#   points    int, or {"field": f} with optional "map" (value -> points),
+#             "scale" (multiplier), or "every"/"each" (each N units of f)
+#   when      {field: value | {"min": x, "max": y}}; events failing it earn 0
+#   streak    {"when": {...}, "every": d, "step": s, "max": m}: multiply by
+#             1 + s per d consecutive previous days (same subject) meeting "when"
+#   decay     {"after": n, "factor": f}: the (n+k)th subject of the kind on a
+#             day earns f**k of its points
+#   replaces  later events for the same (subject, day) replace earlier awards
+#   require_funds  a negative award is refused if the balance can't cover it
+# A kind without a rule earns nothing.
+#
+# The defaults are the original fixed point values: 2/1/0 per habit status,
+# a task's own points, -2 for a missed high-priority deadline and nothing
+# for focus time.
+DEFAULT_RULES: Dict[str, Dict[str, Any]] = {
+    "habit_logged": {
+        "replaces": True,
+        "points": {"field": "status", "map": {"0": 0, "1": 1, "2": 2}},
+    },
+    "task_completed": {"points": {"field": "points"}},
+    "task_missed": {"when": {"priority": {"min": 3}}, "points": -2},
+    "reward_claimed": {"points": {"field": "cost", "scale": -1}, "require_funds": True},
+}
+
+# An opt-in economy (PointsManager.set_rules(EXAMPLE_RULES)): Done habits
+# earn 1.5x after a week-long streak and 2x after two, and focus sessions of
+# 20+ minutes earn a point per 25 minutes, halving from the 5th session a day.
+EXAMPLE_RULES: Dict[str, Dict[str, Any]] = {
+    **DEFAULT_RULES,
+    "habit_logged": {
+        **DEFAULT_RULES["habit_logged"],
+        "streak": {"when": {"status": 2}, "every": 7, "step": 0.5, "max": 2.0},
+    },
+    "focus_completed": {
+        "replaces": True,
+        "when": {"minutes": {"min": 20}},
+        "points": {"field": "minutes", "every": 25, "each": 1},
+        "decay": {"after": 4, "factor": 0.5},
+    },
+}
+
+
+@dataclass
+class DomainEvent:
+    kind: str
+    subject: str  # What the event is about, e.g. "habit:3" or "task:12"
+    day: str      # YYYY-MM-DD the event counts towards
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+def matches(payload: Dict[str, Any], conditions: Optional[Dict[str, Any]]) -> bool:
+    for name, expected in (conditions or {}).items():
+        value = payload.get(name)
+        if isinstance(expected, dict):
+            if value is None:
+                return False
+            if "min" in expected and value < expected["min"]:
+                return False
+            if "max" in expected and value > expected["max"]:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class ReplayContext:
+    """History seen so far while replaying events in order. Mirrors the
+    queries DatabaseManager answers for a single incremental evaluation."""
+
+    def __init__(self):
+        self.awards = {}   # (kind, subject, day) -> points awarded so far
+        self.subjects = {}  # (kind, day) -> subjects seen
+        self.latest = {}   # (kind, subject) -> {day: payload of the latest event}
+
+    def prior_award(self, event: DomainEvent) -> int:
+        return self.awards.get((event.kind, event.subject, event.day), 0)
+
+    def prior_count(self, event: DomainEvent) -> int:
+        subjects = self.subjects.get((event.kind, event.day), ())
+        return len(subjects) - (event.subject in subjects)
+
+    def history(self, event: DomainEvent, first_day: str, last_day: str) -> Dict[str, Dict[str, Any]]:
+        # Callers only look up days inside the range, so skip copying a slice
+        return self.latest.get((event.kind, event.subject), {})
+
+    def record(self, event: DomainEvent, points: int):
+        key = (event.kind, event.subject, event.day)
+        self.awards[key] = self.awards.get(key, 0) + points
+        self.subjects.setdefault((event.kind, event.day), set()).add(event.subject)
+        self.latest.setdefault((event.kind, event.subject), {})[event.day] = event.payload
+
+
+class RulesEngine:
+    """Evaluates events one at a time against a context (the database for
+    live events, a ReplayContext for batch re-evaluation)."""
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.rules = rules if rules is not None else DEFAULT_RULES
+
+    @classmethod
+    def from_json(cls, text: str) -> "RulesEngine":
+        try:
+            rules = json.loads(text) if text else None
+        except ValueError:
+            rules = None
+        return cls(rules if isinstance(rules, dict) else None)
+
+    def to_json(self) -> str:
+        return json.dumps(self.rules, sort_keys=True)
+
+    def requires_funds(self, kind: str) -> bool:
+        return bool(self.rules.get(kind, {}).get("require_funds"))
+
+    def replaces(self, kind: str) -> bool:
+        return bool(self.rules.get(kind, {}).get("replaces"))
+
+    @staticmethod
+    def base_points(spec, payload: Dict[str, Any]) -> float:
+        if isinstance(spec, (int, float)):
+            return spec
+        if not isinstance(spec, dict):
+            return 0
+        value = payload.get(spec.get("field"), 0) or 0
+        if "map" in spec:
+            value = spec["map"].get(str(value), 0)
+        if "every" in spec:
+            value = (value // spec["every"]) * spec.get("each", 1)
+        return value * spec.get("scale", 1)
+
+    @staticmethod
+    def streak_window(streak: Dict[str, Any]) -> int:
+        """Days of history that can still raise the multiplier."""
+        steps = math.ceil((streak.get("max", 1) - 1) / streak["step"]) if streak.get("step") else 0
+        return streak["every"] * steps
+
+    def streak_multiplier(self, streak: Dict[str, Any], event: DomainEvent, context) -> float:
+        window = self.streak_window(streak)
+        if window <= 0 or not matches(event.payload, streak.get("when")):
+            return 1.0
+        today = date.fromisoformat(event.day)
+        first = (today - timedelta(days=window)).isoformat()
+        last = (today - timedelta(days=1)).isoformat()
+        history = context.history(event, first, last)
+        length = 0
+        for back in range(1, window + 1):
+            payload = history.get((today - timedelta(days=back)).isoformat())
+            if payload is None or not matches(payload, streak.get("when")):
+                break
+            length += 1
+        return min(streak.get("max", 1), 1 + streak["step"] * (length // streak["every"]))
+
+    def evaluate(self, event: DomainEvent, context) -> int:
+        """Points this event is worth given everything before it."""
+        rule = self.rules.get(event.kind)
+        if not rule:
+            return 0
+        value = 0.0
+        if matches(event.payload, rule.get("when")):
+            value = self.base_points(rule.get("points", 0), event.payload)
+            if value and rule.get("streak"):
+                value *= self.streak_multiplier(rule["streak"], event, context)
+            decay = rule.get("decay")
+            if value and decay:
+                extra = context.prior_count(event) - decay.get("after", 0) + 1
+                if extra > 0:
+                    value *= decay.get("factor", 1) ** extra
+        points = int(round(value))
+        if rule.get("replaces"):
+            points -= context.prior_award(event)
+        return points
+
+    def replay(self, events):
+        """Re-evaluate (event_id, DomainEvent) pairs in order.
+        Yields (event_id, points) under the current rules."""
+        context = ReplayContext()
+        for event_id, event in events:
+            points = self.evaluate(event, context)
+            context.record(event, points)
+            yield event_id, points
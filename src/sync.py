@@ -0,0 +1,502 @@
+"""
+Sync - Offline merge of two app databases through row-level change capture.
+Triggers give every synced row a stable global id (gid) and a version: a
+Lamport clock and the device that wrote it. A merge exchanges only rows
+changed since the last merge with that peer; for each row the version with
+the higher (clock, device) wins on both sides, so merges are deterministic
+and can run in any order.
+
+    python src/sync.py merge data/app_data.db /media/usb/app_data.db
+    python src/sync.py sync-dir data/app_data.db ~/Dropbox/study-focus
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Synced tables in dependency order (parents first). Per table:
+#   refs      foreign-key column -> referenced table; exchanged as the parent's gid
+#             (a row whose parent is gone is not exchanged)
+#   links     like refs, but optional: a missing parent just clears the link
+#   key       natural key columns: rows with equal keys on two devices are the
+#             same row (gid derived from the key) instead of duplicates
+#   subjects  for domain_events: subject prefix -> table of the id after it
+#   events    for domain_events: kind -> natural key, for kinds awarded at most
+#             once per subject (and day), so the same award earned on two
+#             devices merges into one row instead of being counted twice
+SYNC_TABLES: Dict[str, Dict[str, Any]] = {
+    'habits': {},
+    'habit_logs': {'refs': {'habit_id': 'habits'}, 'key': ('habit_id', 'date')},
+    'tasks': {},
+    'task_logs': {'refs': {'task_id': 'tasks'}},
+    'task_penalties': {'refs': {'task_id': 'tasks'}, 'key': ('task_id', 'deadline')},
+    'rewards': {},
+    'reward_logs': {'links': {'reward_id': 'rewards'}},  # Claims outlive deleted rewards
+    'reflections': {'key': ('date',)},
+    'events': {},
+    'event_exceptions': {'refs': {'event_id': 'events'}, 'key': ('event_id', 'date')},
+    'focus_sessions': {'links': {'linked_task_id': 'tasks', 'linked_habit_id': 'habits'}},
+    'weekly_bonus_log': {'key': ('iso_week',)},
+    'domain_events': {'subjects': {'habit': 'habits', 'task': 'tasks',
+                                   'focus': 'focus_sessions', 'reward': 'rewards'},
+                      'events': {'habit_logged': ('subject', 'day'), 'task_missed': ('subject', 'day'),
+                                 'task_completed': ('subject',), 'focus_completed': ('subject',)}},
+}
+
+# The points balance is not synced as a value (the two sides earn points
+# independently); it moves by the change in these per-row point amounts
+BALANCE_SOURCES = {'domain_events': 'points', 'weekly_bonus_log': 'bonus'}
+
+
+# ---------------------
+# Change capture
+# ---------------------
+def _subject_gid_expression(subjects: Dict[str, str]) -> str:
+    """SQL for the gid of the row a domain event's subject ('task:12') names."""
+    prefix = "substr(NEW.subject, 1, instr(NEW.subject, ':') - 1)"
+    ref_id = "CAST(substr(NEW.subject, instr(NEW.subject, ':') + 1) AS INTEGER)"
+    cases = ' '.join(f"WHEN '{name}' THEN (SELECT gid FROM sync_rows WHERE tbl = '{ref}' AND row_id = {ref_id})"
+                     for name, ref in subjects.items())
+    return f"CASE {prefix} {cases} END"
+
+
+def _gid_expression(table: str, spec: Dict[str, Any]) -> str:
+    """SQL for the gid of NEW: its existing gid (a tombstone's too, when an
+    undo re-inserts the row), else one derived from its natural key, else
+    '<device>:<clock>' (unique, as the clock only grows)."""
+    options = [f"(SELECT gid FROM sync_rows WHERE tbl = '{table}' AND row_id = NEW.rowid)"]
+    if spec.get('key'):
+        parts = []
+        for column in spec['key']:
+            ref = spec.get('refs', {}).get(column)
+            if ref:
+                parts.append(f"(SELECT gid FROM sync_rows WHERE tbl = '{ref}' AND row_id = NEW.{column})")
+            else:
+                parts.append(f'NEW.{column}')
+        options.append("'k:' || " + " || '|' || ".join(parts))
+    if spec.get('events'):
+        subject = _subject_gid_expression(spec['subjects'])
+        cases = []
+        for kind, key in spec['events'].items():
+            parts = [subject if column == 'subject' else f'NEW.{column}' for column in key]
+            cases.append(f"WHEN '{kind}' THEN 'k:' || NEW.kind || '|' || " + " || '|' || ".join(parts))
+        options.append(f"CASE NEW.kind {' '.join(cases)} END")  # NULL when the subject isn't synced
+    options.append("d.device || ':' || d.clock")
+    return f"COALESCE({', '.join(options)})"
+
+
+def install(cursor):
+    """Create the sync tables and capture triggers if missing (triggers from
+    an older version are replaced). The first time, existing rows get their
+    gids (the no-op UPDATE fires the triggers)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_device (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            device TEXT NOT NULL,
+            clock INTEGER NOT NULL DEFAULT 0,
+            seq INTEGER NOT NULL DEFAULT 0,
+            applying INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Current version of every synced row; seq orders local changes for export
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_rows (
+            tbl TEXT NOT NULL,
+            gid TEXT NOT NULL,
+            row_id INTEGER,
+            clock INTEGER NOT NULL,
+            device TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tbl, gid)
+        )
+    ''')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_rows_local ON sync_rows (tbl, row_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_rows_seq ON sync_rows (seq)')
+    # Highest local seq already sent to a peer (device id, or 'dir:<path>'),
+    # and highest seq of that device already received from a sync directory
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            peer TEXT PRIMARY KEY,
+            sent_seq INTEGER NOT NULL DEFAULT 0,
+            received_seq INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('SELECT 1 FROM sync_device')
+    is_new = cursor.fetchone() is None
+    if is_new:
+        cursor.execute('INSERT INTO sync_device (id, device) VALUES (1, ?)', (uuid.uuid4().hex[:12],))
+    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'sync%'")
+    installed = dict(cursor.fetchall())
+
+    for table, spec in SYNC_TABLES.items():
+        bump = "UPDATE sync_device SET clock = clock + 1, seq = seq + 1 WHERE id = 1;"
+        when = "WHEN (SELECT applying FROM sync_device WHERE id = 1) = 0"
+        upsert = f'''
+            INSERT INTO sync_rows (tbl, gid, row_id, clock, device, seq, deleted)
+            SELECT '{table}', {_gid_expression(table, spec)}, NEW.rowid, d.clock, d.device, d.seq, 0
+            FROM sync_device d WHERE d.id = 1
+            ON CONFLICT (tbl, gid) DO UPDATE SET row_id = excluded.row_id, clock = excluded.clock,
+                device = excluded.device, seq = excluded.seq, deleted = 0;
+        '''
+        # Rowids of keyless tables are never reused (AUTOINCREMENT) except by an
+        # undo putting the same row back, so their tombstones keep the rowid to
+        # hand the gid back; keyed rows get theirs back from the key instead
+        row_id = 'NULL' if spec.get('key') else 'row_id'
+        tombstone = f'''
+            UPDATE sync_rows SET row_id = {row_id}, deleted = 1,
+                clock = (SELECT clock FROM sync_device WHERE id = 1),
+                device = (SELECT device FROM sync_device WHERE id = 1),
+                seq = (SELECT seq FROM sync_device WHERE id = 1)
+            WHERE tbl = '{table}' AND row_id = OLD.rowid;
+        '''
+        for action, body in (('insert', upsert), ('update', upsert), ('delete', tombstone)):
+            name = f'sync_{table}_{action}'
+            sql = f'CREATE TRIGGER {name} AFTER {action.upper()} ON {table} {when} BEGIN {bump} {body} END'
+            if installed.get(name) != sql:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+                cursor.execute(sql)
+        if is_new:
+            cursor.execute(f'UPDATE {table} SET rowid = rowid')
+
+
+# ---------------------
+# Store
+# ---------------------
+class SyncStore:
+    """One database file seen as a set of versioned rows."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.cursor = self.conn.cursor()
+        install(self.cursor)
+        self.conn.commit()
+        self.columns = {}
+        for table in SYNC_TABLES:
+            self.cursor.execute(f'PRAGMA table_info({table})')
+            info = self.cursor.fetchall()
+            # An INTEGER PRIMARY KEY is the local rowid; it never leaves the file
+            keys = [row for row in info if row[5]]
+            rowid_alias = keys[0][1] if len(keys) == 1 and keys[0][2].upper() == 'INTEGER' else None
+            self.columns[table] = [row[1] for row in info if row[1] != rowid_alias]
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def device(self) -> str:
+        self.cursor.execute('SELECT device FROM sync_device WHERE id = 1')
+        return self.cursor.fetchone()[0]
+
+    @property
+    def seq(self) -> int:
+        self.cursor.execute('SELECT seq FROM sync_device WHERE id = 1')
+        return self.cursor.fetchone()[0]
+
+    def get_peer(self, peer: str) -> tuple:
+        self.cursor.execute('SELECT sent_seq, received_seq FROM sync_peers WHERE peer = ?', (peer,))
+        return self.cursor.fetchone() or (0, 0)
+
+    def set_peer(self, peer: str, sent_seq: Optional[int] = None, received_seq: Optional[int] = None):
+        self.cursor.execute('INSERT OR IGNORE INTO sync_peers (peer) VALUES (?)', (peer,))
+        if sent_seq is not None:
+            self.cursor.execute('UPDATE sync_peers SET sent_seq = ? WHERE peer = ?', (sent_seq, peer))
+        if received_seq is not None:
+            self.cursor.execute('UPDATE sync_peers SET received_seq = ? WHERE peer = ?', (received_seq, peer))
+        self.conn.commit()
+
+    # Local ids <-> gids
+    def gid_of(self, table: str, row_id) -> Optional[str]:
+        if row_id is None:
+            return None
+        self.cursor.execute('SELECT gid FROM sync_rows WHERE tbl = ? AND row_id = ?', (table, row_id))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def row_id_of(self, table: str, gid) -> Optional[int]:
+        if gid is None:
+            return None
+        self.cursor.execute('SELECT row_id FROM sync_rows WHERE tbl = ? AND gid = ?', (table, gid))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def translate(self, table: str, row: Dict[str, Any], to_gids: bool) -> Optional[Dict[str, Any]]:
+        """Swap foreign keys (and domain event subjects) between local ids and
+        gids. Returns None when a referenced row doesn't exist locally."""
+        spec = SYNC_TABLES[table]
+        row = dict(row)
+        for column, ref in spec.get('refs', {}).items():
+            value = row.get(column)
+            if value is None:
+                continue
+            row[column] = self.gid_of(ref, value) if to_gids else self.row_id_of(ref, value)
+            if row[column] is None:
+                return None
+        for column, ref in spec.get('links', {}).items():
+            if row.get(column) is not None:
+                row[column] = self.gid_of(ref, row[column]) if to_gids else self.row_id_of(ref, row[column])
+        subject = row.get('subject')
+        if spec.get('subjects') and subject and ':' in subject:
+            prefix, ref_id = subject.split(':', 1)
+            ref = spec['subjects'].get(prefix)
+            if ref:
+                if to_gids:
+                    gid = self.gid_of(ref, int(ref_id)) if ref_id.isdigit() else None
+                    row['subject'] = f'{prefix}:@{gid}' if gid else subject
+                elif ref_id.startswith('@'):
+                    local = self.row_id_of(ref, ref_id[1:])
+                    row['subject'] = f'{prefix}:{local}' if local is not None else subject
+        return row
+
+    # ---------------------
+    # Export / apply
+    # ---------------------
+    def export_changes(self, since_seq: int) -> List[Dict[str, Any]]:
+        """Current version of every row changed after `since_seq`, parents
+        before children."""
+        order = {table: i for i, table in enumerate(SYNC_TABLES)}
+        self.cursor.execute('''
+            SELECT tbl, gid, row_id, clock, device, deleted FROM sync_rows
+            WHERE seq > ? ORDER BY seq
+        ''', (since_seq,))
+        versions = [v for v in self.cursor.fetchall() if v[0] in order]
+        versions.sort(key=lambda v: order[v[0]])  # Stable: seq order within a table
+
+        changes = []
+        for table, gid, row_id, clock, device, deleted in versions:
+            row = None
+            if not deleted:
+                columns = self.columns[table]
+                self.cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE rowid = ?", (row_id,))
+                values = self.cursor.fetchone()
+                if values is None:
+                    continue
+                row = self.translate(table, dict(zip(columns, values)), to_gids=True)
+                if row is None:
+                    continue
+            changes.append({'table': table, 'gid': gid, 'clock': clock, 'device': device,
+                            'deleted': bool(deleted), 'row': row})
+        return changes
+
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Apply another device's changes where they are newer than the local
+        version. Returns counts: applied, stale (local wins), skipped (missing
+        parent or a clashing unique value)."""
+        stats = {'applied': 0, 'stale': 0, 'skipped': 0}
+        touched = set()
+        balance_change = 0
+        cursor = self.cursor
+        cursor.execute('UPDATE sync_device SET applying = 1 WHERE id = 1')
+        try:
+            for change in changes:
+                table, gid = change['table'], change['gid']
+                if table not in SYNC_TABLES:
+                    continue
+                cursor.execute('SELECT row_id, clock, device FROM sync_rows WHERE tbl = ? AND gid = ?',
+                               (table, gid))
+                local = cursor.fetchone()
+                # Lamport clock: later local writes must order after what was seen
+                cursor.execute('UPDATE sync_device SET clock = MAX(clock, ?) WHERE id = 1', (change['clock'],))
+                if local is not None and (local[1], local[2]) >= (change['clock'], change['device']):
+                    stats['stale'] += 1
+                    continue
+                row_id = local[0] if local else None
+
+                counter = BALANCE_SOURCES.get(table)
+                old_amount = 0
+                if counter and row_id is not None:
+                    cursor.execute(f'SELECT {counter} FROM {table} WHERE rowid = ?', (row_id,))
+                    found = cursor.fetchone()
+                    old_amount = (found[0] or 0) if found else 0
+
+                new_amount = 0
+                if change['deleted']:
+                    if row_id is not None:
+                        cursor.execute(f'DELETE FROM {table} WHERE rowid = ?', (row_id,))
+                    row_id = None
+                else:
+                    row = self.translate(table, change['row'], to_gids=False)
+                    if row is None:
+                        stats['skipped'] += 1
+                        continue
+                    columns = [c for c in self.columns[table] if c in row]
+                    values = [row[c] for c in columns]
+                    try:
+                        if row_id is not None:
+                            cursor.execute(f"UPDATE {table} SET {', '.join(c + ' = ?' for c in columns)} "
+                                           f"WHERE rowid = ?", values + [row_id])
+                        else:
+                            cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) "
+                                           f"VALUES ({', '.join('?' * len(columns))})", values)
+                            row_id = cursor.lastrowid
+                    except sqlite3.IntegrityError:
+                        stats['skipped'] += 1
+                        continue
+                    if counter:
+                        new_amount = row.get(counter) or 0
+
+                cursor.execute('UPDATE sync_device SET seq = seq + 1 WHERE id = 1')
+                cursor.execute('''
+                    INSERT INTO sync_rows (tbl, gid, row_id, clock, device, seq, deleted)
+                    SELECT ?, ?, ?, ?, ?, seq, ? FROM sync_device WHERE id = 1
+                    ON CONFLICT (tbl, gid) DO UPDATE SET row_id = excluded.row_id, clock = excluded.clock,
+                        device = excluded.device, seq = excluded.seq, deleted = excluded.deleted
+                ''', (table, gid, row_id, change['clock'], change['device'], int(change['deleted'])))
+                balance_change += new_amount - old_amount
+                touched.add(table)
+                stats['applied'] += 1
+
+            if balance_change:
+                cursor.execute('UPDATE points_balance SET balance = MAX(0, balance + ?) WHERE id = 1',
+                               (balance_change,))
+        finally:
+            cursor.execute('UPDATE sync_device SET applying = 0 WHERE id = 1')
+            self.conn.commit()
+
+        if 'focus_sessions' in touched:
+            from database import DatabaseManager
+            DatabaseManager(self.path).rebuild_focus_rollups()
+        return stats
+
+
+# ---------------------
+# Merges
+# ---------------------
+def merge_databases(path_a: str, path_b: str) -> Dict[str, Dict[str, int]]:
+    """Two-way merge of two database files. Both end up with the same synced
+    rows; each receives only what changed since their last merge."""
+    a, b = SyncStore(path_a), SyncStore(path_b)
+    try:
+        device_a, device_b = a.device, b.device
+        if device_a == device_b:
+            raise ValueError("Both files have the same device id (one is a copy of the other); "
+                             "run 'new-device' on the copy first")
+        # Export both sides before applying, so nothing is sent back where it came from
+        to_b = a.export_changes(a.get_peer(device_b)[0])
+        to_a = b.export_changes(b.get_peer(device_a)[0])
+        stats = {'to_b': b.apply_changes(to_b), 'to_a': a.apply_changes(to_a)}
+        a.set_peer(device_b, sent_seq=a.seq)
+        b.set_peer(device_a, sent_seq=b.seq)
+        return stats
+    finally:
+        a.close()
+        b.close()
+
+
+def sync_directory(path: str, directory: str) -> Dict[str, int]:
+    """Merge through a shared directory (a USB stick, a synced folder). Each
+    device appends batch files of its changes under <directory>/<device>/
+    and applies the batches of every other device it has not seen yet."""
+    store = SyncStore(path)
+    try:
+        device = store.device
+        peer = 'dir:' + os.path.abspath(directory)
+        sent_seq = store.get_peer(peer)[0]
+        outgoing = store.export_changes(sent_seq)
+
+        stats = {'sent': len(outgoing), 'applied': 0, 'stale': 0, 'skipped': 0}
+        for other in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            folder = os.path.join(directory, other)
+            if other == device or not os.path.isdir(folder):
+                continue
+            received = store.get_peer(other)[1]
+            batches = []
+            for name in os.listdir(folder):
+                stem, ext = os.path.splitext(name)
+                first, _, last = stem.partition('-')
+                if ext == '.json' and first.isdigit() and last.isdigit() and int(last) > received:
+                    batches.append((int(first), int(last), name))
+            for _, last, name in sorted(batches):
+                with open(os.path.join(folder, name), encoding='utf-8') as f:
+                    for key, count in store.apply_changes(json.load(f)).items():
+                        stats[key] += count
+                store.set_peer(other, received_seq=last)
+
+        if outgoing:
+            folder = os.path.join(directory, device)
+            os.makedirs(folder, exist_ok=True)
+            target = os.path.join(folder, f'{sent_seq + 1}-{store.seq}.json')
+            with open(target + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(outgoing, f)
+            os.replace(target + '.tmp', target)  # Readers never see a partial batch
+        store.set_peer(peer, sent_seq=store.seq)
+        return stats
+    finally:
+        store.close()
+
+
+def new_device(path: str) -> str:
+    """Give a copied database its own device id. Rows it shares with the
+    original keep their gids, so the two still merge as the same rows."""
+    store = SyncStore(path)
+    try:
+        device = uuid.uuid4().hex[:12]
+        store.cursor.execute('UPDATE sync_device SET device = ? WHERE id = 1', (device,))
+        store.cursor.execute('DELETE FROM sync_peers')
+        store.conn.commit()
+        return device
+    finally:
+        store.close()
+
+
+def status(path: str) -> Dict[str, Any]:
+    """Unsent changes for every peer this file sends to (merged files and
+    sync directories). Devices only heard from through a directory are
+    listed separately under 'seen', with what has been received from them."""
+    store = SyncStore(path)
+    try:
+        store.cursor.execute('SELECT peer, sent_seq, received_seq FROM sync_peers ORDER BY peer')
+        peers, seen = {}, {}
+        for peer, sent, received in store.cursor.fetchall():
+            if sent or peer.startswith('dir:'):
+                peers[peer] = {'sent': sent, 'unsent': len(store.export_changes(sent)), 'received': received}
+            else:
+                seen[peer] = {'received': received}
+        return {'device': store.device, 'seq': store.seq, 'peers': peers, 'seen': seen}
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge Study Focus databases offline.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    merge = commands.add_parser('merge', help="two-way merge of two database files")
+    merge.add_argument('database')
+    merge.add_argument('other')
+    directory = commands.add_parser('sync-dir', help="merge through a shared directory")
+    directory.add_argument('database')
+    directory.add_argument('directory')
+    show = commands.add_parser('status', help="device id, unsent changes per peer and devices seen")
+    show.add_argument('database')
+    fresh = commands.add_parser('new-device', help="give a copied database its own device id")
+    fresh.add_argument('database')
+    args = parser.parse_args(argv)
+
+    for path in [args.database] + ([args.other] if args.command == 'merge' else []):
+        if not os.path.isfile(path):
+            parser.error(f"no such database: {path}")
+    # Bring both files up to the current schema before touching them
+    from database import DatabaseManager
+    DatabaseManager(args.database)
+    if args.command == 'merge':
+        DatabaseManager(args.other)
+        try:
+            result = merge_databases(args.database, args.other)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == 'sync-dir':
+        os.makedirs(args.directory, exist_ok=True)
+        result = sync_directory(args.database, args.directory)
+    elif args.command == 'new-device':
+        result = {'device': new_device(args.database)}
+    else:
+        result = status(args.database)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,36 @@
 import os
-import json
 import calendar
-from datetime import datetime
+from itertools import islice
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QFrame, QGridLayout, QScrollArea,
                                QDialog, QLineEdit, QTextEdit, QTimeEdit, 
-                               QMessageBox, QSizePolicy)
-from PySide6.QtCore import Qt, QDate, Signal
+                               QMessageBox, QSizePolicy, QComboBox, QSpinBox,
+                               QCheckBox, QDateEdit)
+from PySide6.QtCore import Qt, QDate, QTime, Signal
 from PySide6.QtGui import QColor, QFont
+from database import DatabaseManager
+from recurrence import FREQUENCIES, describe
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
+
+
+def format_event_time(start_time):
+    """Format a stored 24h "HH:MM" time for display ("09:30 AM")."""
+    time = QTime.fromString(start_time, "HH:mm")
+    return time.toString("hh:mm AP") if time.isValid() else ''
 
 class EventDialog(QDialog):
-    # Signal to delete event: (date_str, index)
-    delete_requested = Signal(str, int)
+    # Signal to delete event: (event_id, occurrence date or '' for the whole series)
+    delete_requested = Signal(int, str)
 
-    def __init__(self, parent=None, date=None, event_data=None, event_index=None):
+    def __init__(self, parent=None, date=None, event_data=None, occurrence_date=''):
         super().__init__(parent)
         self.edit_mode = event_data is not None
         self.setWindowTitle("Edit Event" if self.edit_mode else "Create Event")
         self.setFixedWidth(400)
         self.date = date or QDate.currentDate()
         self.event_data = event_data
-        self.event_index = event_index
+        self.occurrence_date = occurrence_date
         self.init_ui()
 
     def init_ui(self):
@@ -42,14 +52,8 @@ class EventDialog(QDialog):
         # Time
         layout.addWidget(QLabel("Time"))
         self.time_input = QTimeEdit()
-        if self.edit_mode and 'time' in self.event_data:
-            try:
-                time = datetime.strptime(self.event_data['time'], "%I:%M %p").time()
-                self.time_input.setTime(time)
-            except:
-                self.time_input.setTime(datetime.now().time())
-        else:
-            self.time_input.setTime(datetime.now().time())
+        time = QTime.fromString(self.event_data.get('time', ''), "HH:mm") if self.edit_mode else QTime()
+        self.time_input.setTime(time if time.isValid() else QTime.currentTime())
         layout.addWidget(self.time_input)
 
         # Description
@@ -60,6 +64,37 @@ class EventDialog(QDialog):
             self.desc_input.setPlainText(self.event_data.get('description', ''))
         layout.addWidget(self.desc_input)
 
+        # Repeat
+        layout.addWidget(QLabel("Repeat"))
+        repeat_layout = QHBoxLayout()
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItem("Does not repeat", None)
+        for freq in FREQUENCIES:
+            self.repeat_combo.addItem(freq.capitalize(), freq)
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 99)
+        self.interval_spin.setPrefix("Every ")
+        self.until_check = QCheckBox("Until")
+        self.until_edit = QDateEdit()
+        self.until_edit.setCalendarPopup(True)
+        self.until_edit.setMinimumDate(self.date)
+        self.until_edit.setDate(self.date.addMonths(3))
+        repeat_layout.addWidget(self.repeat_combo)
+        repeat_layout.addWidget(self.interval_spin)
+        repeat_layout.addWidget(self.until_check)
+        repeat_layout.addWidget(self.until_edit)
+        layout.addLayout(repeat_layout)
+
+        if self.edit_mode and self.event_data.get('recur_freq'):
+            self.repeat_combo.setCurrentIndex(self.repeat_combo.findData(self.event_data['recur_freq']))
+            self.interval_spin.setValue(self.event_data.get('recur_interval') or 1)
+            if self.event_data.get('recur_until'):
+                self.until_check.setChecked(True)
+                self.until_edit.setDate(QDate.fromString(self.event_data['recur_until'], "yyyy-MM-dd"))
+        self.repeat_combo.currentIndexChanged.connect(self.update_repeat_controls)
+        self.until_check.toggled.connect(self.update_repeat_controls)
+        self.update_repeat_controls()
+
         # Buttons
         btn_layout = QHBoxLayout()
         
@@ -81,28 +116,56 @@ class EventDialog(QDialog):
         btn_layout.addWidget(save_btn)
         layout.addLayout(btn_layout)
 
+    def update_repeat_controls(self):
+        repeats = self.repeat_combo.currentData() is not None
+        self.interval_spin.setEnabled(repeats)
+        self.until_check.setEnabled(repeats)
+        self.until_edit.setEnabled(repeats and self.until_check.isChecked())
+
     def handle_delete(self):
-        if QMessageBox.question(self, "Confirm Delete", 
+        if self.event_data.get('recur_freq') and self.occurrence_date:
+            box = QMessageBox(QMessageBox.Question, "Delete Recurring Event",
+                              "Delete only this occurrence, or every event in the series?",
+                              parent=self)
+            single_btn = box.addButton("This Occurrence", QMessageBox.AcceptRole)
+            series_btn = box.addButton("Entire Series", QMessageBox.DestructiveRole)
+            box.addButton(QMessageBox.Cancel)
+            box.exec()
+            if box.clickedButton() == single_btn:
+                self.delete_requested.emit(self.event_data['id'], self.occurrence_date)
+            elif box.clickedButton() == series_btn:
+                self.delete_requested.emit(self.event_data['id'], '')
+            else:
+                return
+            self.done(2) # Custom return code for delete
+        elif QMessageBox.question(self, "Confirm Delete", 
                                "Are you sure you want to delete this event?",
                                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-            self.delete_requested.emit(self.date.toString("yyyy-MM-dd"), self.event_index)
+            self.delete_requested.emit(self.event_data['id'], '')
             self.done(2) # Custom return code for delete
 
     def get_data(self):
         """Extract and clean data from inputs for storage"""
-        time_str = self.time_input.time().toString("hh:mm AP")
+        time_str = self.time_input.time().toString("HH:mm")
+        freq = self.repeat_combo.currentData()
+        until = None
+        if freq and self.until_check.isChecked():
+            until = self.until_edit.date().toString("yyyy-MM-dd")
         return {
             "title": self.title_input.text().strip(),
             "time": time_str,
-            "description": self.desc_input.toPlainText().strip()
+            "description": self.desc_input.toPlainText().strip(),
+            "recur_freq": freq,
+            "recur_interval": self.interval_spin.value() if freq else 1,
+            "recur_until": until
         }
 
 class EventLabel(QLabel):
-    clicked = Signal(int) # index of event
+    clicked = Signal(int) # event id
 
-    def __init__(self, text, index, parent=None):
+    def __init__(self, text, event_id, parent=None):
         super().__init__(text, parent)
-        self.index = index
+        self.event_id = event_id
         self.setCursor(Qt.PointingHandCursor)
         self.setStyleSheet("""
             QLabel {
@@ -120,15 +183,14 @@ class EventLabel(QLabel):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self.clicked.emit(self.index)
+            self.clicked.emit(self.event_id)
 
 class EventCard(QFrame):
-    edit_requested = Signal(str, int) # date_str, index
+    edit_requested = Signal(int, str) # event id, occurrence date
 
-    def __init__(self, date_str, index, event_data, parent=None):
+    def __init__(self, event_data, parent=None):
         super().__init__(parent)
-        self.date_str = date_str
-        self.index = index
+        self.date_str = event_data['date']
         self.event_data = event_data
         self.expanded = False
         self.init_ui()
@@ -170,7 +232,10 @@ class EventCard(QFrame):
         title_lbl.setWordWrap(True)
         header_layout.addWidget(title_lbl)
 
-        time_lbl = QLabel(f"🕐 {self.event_data.get('time', 'No time set')}")
+        time_text = format_event_time(self.event_data['time']) or 'No time set'
+        if self.event_data.get('recur_freq'):
+            time_text += f"  ↻ {describe(self.event_data['recur_freq'], self.event_data['recur_interval'])}"
+        time_lbl = QLabel(f"🕐 {time_text}")
         time_lbl.setStyleSheet("font-size: 11px; color: #9A9A9A;")
         header_layout.addWidget(time_lbl)
 
@@ -193,7 +258,7 @@ class EventCard(QFrame):
         desc_title.setStyleSheet("font-size: 11px; font-weight: bold; color: #4A4A4A;")
         detail_layout.addWidget(desc_title)
 
-        desc_lbl = QLabel(self.event_data.get('description', 'No description'))
+        desc_lbl = QLabel(self.event_data['description'] or 'No description')
         desc_lbl.setStyleSheet("font-size: 12px; color: #9A9A9A;")
         desc_lbl.setWordWrap(True)
         detail_layout.addWidget(desc_lbl)
@@ -213,7 +278,7 @@ class EventCard(QFrame):
                 background-color: #3D3D3D;
             }
         """)
-        edit_btn.clicked.connect(lambda: self.edit_requested.emit(self.date_str, self.index))
+        edit_btn.clicked.connect(lambda: self.edit_requested.emit(self.event_data['id'], self.date_str))
         detail_layout.addWidget(edit_btn)
 
         self.main_layout.addWidget(self.detail_frame)
@@ -244,13 +309,25 @@ class EventCard(QFrame):
 
 class DayCell(QFrame):
     clicked = Signal(QDate)
-    event_clicked = Signal(QDate, int) # date, index
+    event_clicked = Signal(int, str) # event id, occurrence date
+
+    MAX_EVENT_LABELS = 3  # Events shown before collapsing into "+N more"
 
-    def __init__(self, date, is_current_month=True, parent=None):
+    # (day label, frame) stylesheets per cell state
+    STYLES = {
+        "other": ("color: #4A4A4A;", "border: 1px solid #1A1A1A;"),
+        "today": ("color: #4A7C59; font-weight: bold;",
+                  "background-color: #1A1A1A; border: 1px solid #4A7C59;"),
+        "current": ("color: #EAEAEA;", "border: 1px solid #2D2D2D;"),
+    }
+
+    def __init__(self, date=None, is_current_month=True, parent=None):
         super().__init__(parent)
-        self.date = date
+        self.date = date if date is not None else QDate.currentDate()
         self.is_current_month = is_current_month
+        self.style_state = None
         self.init_ui()
+        self.bind(self.date, is_current_month)
 
     def init_ui(self):
         self.setFrameShape(QFrame.StyledPanel)
@@ -260,70 +337,97 @@ class DayCell(QFrame):
         self.layout.setSpacing(2)
 
         # Day Number
-        self.day_label = QLabel(str(self.date.day()))
+        self.day_label = QLabel()
         self.day_label.setAlignment(Qt.AlignRight | Qt.AlignTop)
-        
-        if not self.is_current_month:
-            self.day_label.setStyleSheet("color: #4A4A4A;")
-            self.setStyleSheet("border: 1px solid #1A1A1A;")
-        elif self.date == QDate.currentDate():
-            self.day_label.setStyleSheet("color: #4A7C59; font-weight: bold;")
-            self.setStyleSheet("background-color: #1A1A1A; border: 1px solid #4A7C59;")
-        else:
-            self.day_label.setStyleSheet("color: #EAEAEA;")
-            self.setStyleSheet("border: 1px solid #2D2D2D;")
-        
         self.layout.addWidget(self.day_label)
 
-        # Events Container
+        # Events Container (labels are pooled and rebound, never recreated)
         self.events_widget = QWidget()
         self.events_layout = QVBoxLayout(self.events_widget)
         self.events_layout.setContentsMargins(0, 0, 0, 0)
         self.events_layout.setSpacing(2)
+
+        self.event_labels = []
+        for _ in range(self.MAX_EVENT_LABELS):
+            lbl = EventLabel("", None)
+            lbl.clicked.connect(self.on_event_label_clicked)
+            lbl.hide()
+            self.events_layout.addWidget(lbl)
+            self.event_labels.append(lbl)
+
+        self.more_label = QLabel()
+        self.more_label.setStyleSheet("font-size: 9px; color: #4A7C59;")
+        self.more_label.hide()
+        self.events_layout.addWidget(self.more_label)
+
         self.layout.addWidget(self.events_widget)
         self.layout.addStretch()
 
+    def bind(self, date, is_current_month, events=()):
+        """Point this cell at a new date and event list in place."""
+        self.date = date
+        self.is_current_month = is_current_month
+        self.day_label.setText(str(date.day()))
+
+        if not is_current_month:
+            state = "other"
+        elif date == QDate.currentDate():
+            state = "today"
+        else:
+            state = "current"
+
+        # Re-polishing a stylesheet is the expensive part; skip it when unchanged
+        if state != self.style_state:
+            label_style, frame_style = self.STYLES[state]
+            self.day_label.setStyleSheet(label_style)
+            self.setStyleSheet(frame_style)
+            self.style_state = state
+
+        self.set_event_labels(events)
+
     def mousePressEvent(self, event):
         # Prevent triggering date click if clicking on child widgets
         if not self.childAt(event.pos()):
             self.clicked.emit(self.date)
 
-    def add_event_labels(self, events):
-        # Clear existing
-        for i in reversed(range(self.events_layout.count())):
-            self.events_layout.itemAt(i).widget().setParent(None)
-        
-        for i, event in enumerate(events[:3]):
-            lbl = EventLabel(f"• {event['title']}", i)
-            lbl.clicked.connect(lambda idx: self.event_clicked.emit(self.date, idx))
-            self.events_layout.addWidget(lbl)
-        
-        if len(events) > 3:
-            more_lbl = QLabel(f"+{len(events)-3} more")
-            more_lbl.setStyleSheet("font-size: 9px; color: #4A7C59;")
-            self.events_layout.addWidget(more_lbl)
+    def on_event_label_clicked(self, event_id):
+        self.event_clicked.emit(event_id, self.date.toString("yyyy-MM-dd"))
+
+    def set_event_labels(self, events):
+        for i, lbl in enumerate(self.event_labels):
+            if i < len(events):
+                lbl.event_id = events[i]['id']
+                bullet = "↻" if events[i].get('recur_freq') else "•"
+                lbl.setText(f"{bullet} {events[i]['title']}")
+                lbl.show()
+            else:
+                lbl.event_id = None
+                lbl.hide()
+
+        hidden = len(events) - self.MAX_EVENT_LABELS
+        if hidden > 0:
+            self.more_label.setText(f"+{hidden} more")
+            self.more_label.show()
+        else:
+            self.more_label.hide()
 
 class CalendarWidget(QWidget):
+    AGENDA_PAGE_SIZE = 20  # Event cards loaded per scroll window
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_date = QDate.currentDate()
+        self.db = DatabaseManager()
+        # One-time migration of the legacy JSON store into the events table
         self.events_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "events.json")
-        self.events = self.load_events()
+        self.db.import_events_json(self.events_file)
+        self.events = {}  # date_str -> events, for the visible 42-day window only
+        
+        # Agenda paging state
+        self.agenda_events = iter(())  # Lazy time-ordered stream of upcoming events
+        self.agenda_exhausted = True
         self.init_ui()
-
-    def load_events(self):
-        if os.path.exists(self.events_file):
-            try:
-                with open(self.events_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def save_events(self):
-        os.makedirs(os.path.dirname(self.events_file), exist_ok=True)
-        with open(self.events_file, 'w') as f:
-            json.dump(self.events, f, indent=2)
+        ChangeBus.instance().data_restored.connect(self.on_data_restored)
 
     def init_ui(self):
         main_layout = QHBoxLayout(self)
@@ -345,6 +449,22 @@ class CalendarWidget(QWidget):
         self.mini_grid_layout = QGridLayout(self.mini_grid_container)
         self.mini_grid_layout.setSpacing(2)
         self.mini_grid_layout.setContentsMargins(0, 5, 0, 15)
+
+        for i, d in enumerate(["S", "M", "T", "W", "T", "F", "S"]):
+            lbl = QLabel(d)
+            lbl.setAlignment(Qt.AlignCenter)
+            lbl.setStyleSheet("font-size: 9px; color: #4A4A4A; font-weight: bold;")
+            self.mini_grid_layout.addWidget(lbl, 0, i)
+
+        # Pooled day labels; update_mini_calendar() rebinds text and style
+        self.mini_day_labels = []
+        self.mini_day_states = [None] * 42
+        for pos in range(42):
+            lbl = QLabel()
+            lbl.setAlignment(Qt.AlignCenter)
+            lbl.setFixedSize(20, 20)
+            self.mini_grid_layout.addWidget(lbl, pos // 7 + 1, pos % 7)
+            self.mini_day_labels.append(lbl)
         sidebar_layout.addWidget(self.mini_grid_container)
 
         # Upcoming Events Label
@@ -379,6 +499,11 @@ class CalendarWidget(QWidget):
         
         self.scroll_area.setWidget(self.scroll_content)
         sidebar_layout.addWidget(self.scroll_area)
+        
+        # Load further agenda windows as the user nears the bottom
+        agenda_bar = self.scroll_area.verticalScrollBar()
+        agenda_bar.valueChanged.connect(self.maybe_load_more_events)
+        agenda_bar.rangeChanged.connect(self.maybe_load_more_events)
 
         main_layout.addWidget(sidebar)
 
@@ -433,12 +558,21 @@ class CalendarWidget(QWidget):
         # Main Grid
         self.grid_layout = QGridLayout()
         self.grid_layout.setSpacing(1)
+        # Fixed pool of 42 cells (6 weeks); update_calendar() rebinds them
+        self.day_cells = []
+        for pos in range(42):
+            cell = DayCell()
+            cell.clicked.connect(self.handle_date_click)
+            cell.event_clicked.connect(self.handle_event_click)
+            self.grid_layout.addWidget(cell, pos // 7, pos % 7)
+            self.day_cells.append(cell)
         calendar_layout.addLayout(self.grid_layout)
         calendar_layout.addStretch()
 
         main_layout.addWidget(calendar_container)
 
         self.update_calendar()
+        self.update_events_list()
 
     def update_calendar(self):
         # Update labels
@@ -447,154 +581,96 @@ class CalendarWidget(QWidget):
         # Update mini calendar
         self.update_mini_calendar()
 
-        # Clear grid
-        for i in reversed(range(self.grid_layout.count())):
-            item = self.grid_layout.itemAt(i)
-            if item.widget():
-                item.widget().setParent(None)
-
-        # Fill grid
+        # Rebind the cell pool to the visible 6-week window
         year = self.current_date.year()
         month = self.current_date.month()
         first_day = QDate(year, month, 1)
         start_padding = first_day.dayOfWeek() % 7
+        
+        # Load only the visible 42-day window
+        window_start = first_day.addDays(-start_padding)
+        self.events = self.db.get_events_in_range(window_start.toString("yyyy-MM-dd"),
+                                                  window_start.addDays(41).toString("yyyy-MM-dd"))
 
-        # Days from previous month
-        prev_month_last_day = first_day.addDays(-1)
-        for i in range(start_padding):
-            date = prev_month_last_day.addDays(- (start_padding - i - 1))
-            cell = DayCell(date, is_current_month=False)
-            cell.clicked.connect(self.handle_date_click)
-            cell.event_clicked.connect(self.handle_event_click)
-            self.grid_layout.addWidget(cell, 0, i)
-
-        # Days of current month
-        days_in_month = first_day.daysInMonth()
-        for day in range(1, days_in_month + 1):
-            date = QDate(year, month, day)
-            cell = DayCell(date, is_current_month=True)
-            cell.clicked.connect(self.handle_date_click)
-            cell.event_clicked.connect(self.handle_event_click)
-            
-            date_str = date.toString("yyyy-MM-dd")
-            if date_str in self.events:
-                cell.add_event_labels(self.events[date_str])
-            
-            pos = start_padding + day - 1
-            self.grid_layout.addWidget(cell, pos // 7, pos % 7)
-
-        # Days from next month (fill up to 6 rows)
-        current_pos = start_padding + days_in_month
-        next_month_day = 1
-        while current_pos < 42:
-            date = QDate(year, month, days_in_month).addDays(next_month_day)
-            cell = DayCell(date, is_current_month=False)
-            cell.clicked.connect(self.handle_date_click)
-            cell.event_clicked.connect(self.handle_event_click)
-            self.grid_layout.addWidget(cell, current_pos // 7, current_pos % 7)
-            current_pos += 1
-            next_month_day += 1
-
-        self.update_events_list()
+        for pos, cell in enumerate(self.day_cells):
+            date = window_start.addDays(pos)
+            cell.bind(date, date.month() == month,
+                      self.events.get(date.toString("yyyy-MM-dd"), []))
 
     def update_mini_calendar(self):
-        # Clear mini grid
-        for i in reversed(range(self.mini_grid_layout.count())):
-            item = self.mini_grid_layout.itemAt(i)
-            if item.widget():
-                item.widget().setParent(None)
-
         year = self.current_date.year()
         month = self.current_date.month()
         today = QDate.currentDate()
-        
-        # Day headers
-        days = ["S", "M", "T", "W", "T", "F", "S"]
-        for i, d in enumerate(days):
-            lbl = QLabel(d)
-            lbl.setAlignment(Qt.AlignCenter)
-            lbl.setStyleSheet("font-size: 9px; color: #4A4A4A; font-weight: bold;")
-            self.mini_grid_layout.addWidget(lbl, 0, i)
 
         first_day = QDate(year, month, 1)
         start_padding = first_day.dayOfWeek() % 7
-        
-        # Mini cells
-        pos = 7
-        # Padding
-        for i in range(start_padding):
-            lbl = QLabel("")
-            self.mini_grid_layout.addWidget(lbl, pos // 7, pos % 7)
-            pos += 1
-            
-        for day in range(1, first_day.daysInMonth() + 1):
-            date = QDate(year, month, day)
-            lbl = QLabel(str(day))
-            lbl.setAlignment(Qt.AlignCenter)
-            lbl.setFixedSize(20, 20)
-            
-            if date == today:
-                lbl.setStyleSheet("background-color: #4A7C59; color: white; border-radius: 10px; font-size: 10px;")
+        days_in_month = first_day.daysInMonth()
+
+        for pos, lbl in enumerate(self.mini_day_labels):
+            day = pos - start_padding + 1
+            if day < 1:
+                state = "padding"
+            elif day > days_in_month:
+                state = "hidden"
+            elif QDate(year, month, day) == today:
+                state = "today"
             else:
+                state = "day"
+
+            lbl.setText(str(day) if state in ("day", "today") else "")
+            if state == self.mini_day_states[pos]:
+                continue
+
+            if state == "today":
+                lbl.setStyleSheet("background-color: #4A7C59; color: white; border-radius: 10px; font-size: 10px;")
+            elif state == "day":
                 lbl.setStyleSheet("font-size: 10px; color: #9A9A9A;")
-                
-            self.mini_grid_layout.addWidget(lbl, pos // 7, pos % 7)
-            pos += 1
+            else:
+                lbl.setStyleSheet("")
+            # Trailing cells are hidden so the grid keeps only the rows the month needs
+            lbl.setVisible(state != "hidden")
+            self.mini_day_states[pos] = state
 
     def update_events_list(self):
+        """Reset the agenda to its first window of upcoming events.
+        Only needed when events change, not on month navigation."""
         # Clears all widgets and stretches from the layout safely
         while self.cards_layout.count():
             item = self.cards_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
-            elif item.spacerItem():
-                pass # Stretches are removed by takeAt
-
-        today = QDate.currentDate()
-        
-        all_events = []
-        for date_str, events in self.events.items():
-            try:
-                # V5 Robustness: Explicitly validate the date string
-                date = QDate.fromString(date_str, "yyyy-MM-dd")
-                if not date.isValid() or date < today:
-                    continue
-                
-                for idx, event in enumerate(events):
-                    # Ensure event is a dictionary and has a title
-                    if isinstance(event, dict) and event.get('title'):
-                        all_events.append((date, idx, event))
-            except (ValueError, TypeError):
-                # Skip corrupted or invalid meeting entries
-                continue
-
-        # V5 Sorting: Finalized chronological helper
-        def get_sortable_time(event_dict):
-            time_str = event_dict.get('time', '')
-            if not time_str:
-                return "00:00"
-            try:
-                # Handle AM/PM logic more strictly
-                dt = datetime.strptime(time_str.upper(), "%I:%M %p")
-                return dt.strftime("%H:%M")
-            except ValueError:
-                # Handle cases like "10:00AM" (missing space) or invalid strings
-                try:
-                    dt = datetime.strptime(time_str.upper().replace(" ", ""), "%I:%M%p")
-                    return dt.strftime("%H:%M")
-                except:
-                    return "00:00"
-
-        # Sort by actual QDate first, then by the 24h helper string
-        all_events.sort(key=lambda x: (x[0], get_sortable_time(x[2])))
-        
-        for date, idx, event_data in all_events:
-            card = EventCard(date.toString("yyyy-MM-dd"), idx, event_data)
-            card.edit_requested.connect(self.handle_edit_request)
-            self.cards_layout.addWidget(card)
         
         # Add a stretch at the end to keep cards at the top
         self.cards_layout.addStretch()
+        
+        # One-off events and recurring series merged lazily in time order
+        self.agenda_events = self.db.iter_upcoming_events(QDate.currentDate().toString("yyyy-MM-dd"),
+                                                          self.AGENDA_PAGE_SIZE)
+        self.agenda_exhausted = False
+        self.load_more_events()
+
+    def load_more_events(self):
+        """Append the next window of cards, already ordered by date and time."""
+        if self.agenda_exhausted:
+            return
+        events = list(islice(self.agenda_events, self.AGENDA_PAGE_SIZE))
+        if len(events) < self.AGENDA_PAGE_SIZE:
+            self.agenda_exhausted = True
+        if not events:
+            return
+        
+        insert_at = self.cards_layout.count() - 1  # Keep the stretch last
+        for event_data in events:
+            card = EventCard(event_data)
+            card.edit_requested.connect(self.handle_edit_request)
+            self.cards_layout.insertWidget(insert_at, card)
+            insert_at += 1
+
+    def maybe_load_more_events(self, *args):
+        bar = self.scroll_area.verticalScrollBar()
+        # Also fills the list when the loaded cards don't overflow the viewport yet
+        if not self.agenda_exhausted and bar.value() >= bar.maximum() - bar.pageStep() // 2:
+            self.load_more_events()
 
     def handle_date_click(self, date):
         if date < QDate.currentDate():
@@ -602,18 +678,18 @@ class CalendarWidget(QWidget):
             return
         self.open_event_dialog(date)
 
-    def handle_event_click(self, date, index):
-        date_str = date.toString("yyyy-MM-dd")
-        if date_str in self.events and index < len(self.events[date_str]):
-            self.open_event_dialog(date, self.events[date_str][index], index)
+    def handle_event_click(self, event_id, occurrence_date=''):
+        self.handle_edit_request(event_id, occurrence_date)
 
-    def handle_edit_request(self, date_str, index):
-        date = QDate.fromString(date_str, "yyyy-MM-dd")
-        if date_str in self.events and index < len(self.events[date_str]):
-            self.open_event_dialog(date, self.events[date_str][index], index)
+    def handle_edit_request(self, event_id, occurrence_date=''):
+        # Recurring events are edited as a series, anchored at their first date
+        event_data = self.db.get_event(event_id)
+        if event_data:
+            self.open_event_dialog(QDate.fromString(event_data['date'], "yyyy-MM-dd"), event_data,
+                                   occurrence_date)
 
-    def open_event_dialog(self, date, event_data=None, event_index=None):
-        dialog = EventDialog(self, date, event_data, event_index)
+    def open_event_dialog(self, date, event_data=None, occurrence_date=''):
+        dialog = EventDialog(self, date, event_data, occurrence_date)
         dialog.delete_requested.connect(self.delete_event)
         
         result = dialog.exec()
@@ -623,29 +699,37 @@ class CalendarWidget(QWidget):
                 return
             
             date_str = date.toString("yyyy-MM-dd")
-            if date_str not in self.events:
-                self.events[date_str] = []
-                
             if event_data is not None:
                 # Update existing
-                self.events[date_str][event_index] = data
+                with self.db.command("Edit event"):
+                    self.db.update_event(event_data['id'], date_str, data['time'], data['title'], data['description'],
+                                         data['recur_freq'], data['recur_interval'], data['recur_until'])
             else:
                 # Add new
-                self.events[date_str].append(data)
+                with self.db.command("Add event"):
+                    self.db.add_event(date_str, data['time'], data['title'], data['description'],
+                                      data['recur_freq'], data['recur_interval'], data['recur_until'])
             
-            self.save_events()
             self.update_calendar()
+            self.update_events_list()
         elif result == 2: # Delete return code
             # Handled by signal
             pass
 
-    def delete_event(self, date_str, index):
-        if date_str in self.events and index < len(self.events[date_str]):
-            del self.events[date_str][index]
-            if not self.events[date_str]:
-                del self.events[date_str]
-            self.save_events()
-            self.update_calendar()
+    def delete_event(self, event_id, occurrence_date=''):
+        with self.db.command("Delete event"):
+            if occurrence_date:
+                self.db.skip_event_occurrence(event_id, occurrence_date)
+            else:
+                self.db.delete_event(event_id)
+        self.update_calendar()
+        self.update_events_list()
+
+    def on_data_restored(self, tables):
+        if {'events', 'event_exceptions'} & set(tables):
+            scheduler = RefreshScheduler.instance()
+            scheduler.request(self, self.update_calendar)
+            scheduler.request(self, self.update_events_list)
 
     def prev_month(self):
         self.current_date = self.current_date.addMonths(-1)
@@ -658,3 +742,9 @@ class CalendarWidget(QWidget):
     def go_today(self):
         self.current_date = QDate.currentDate()
         self.update_calendar()
+
+    def show_date(self, date_str):
+        date = QDate.fromString(date_str, "yyyy-MM-dd")
+        if date.isValid():
+            self.current_date = date
+            self.update_calendar()
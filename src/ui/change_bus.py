@@ -0,0 +1,28 @@
+"""
+Change Bus - Typed notifications of data changes between pages.
+The page that makes a change publishes what changed; every other page
+subscribes to the signals it displays and patches just that state.
+"""
+
+from PySide6.QtCore import QObject, Signal
+
+
+class ChangeBus(QObject):
+    """Application-wide singleton; use ChangeBus.instance()."""
+    habit_logged = Signal(int, str, int, int)  # habit_id, date, old_status, new_status
+    habits_changed = Signal()                  # A habit was added or deleted
+    task_completed = Signal(int, int)          # task_id, points awarded
+    tasks_changed = Signal()                   # A task was added, deleted, starred or postponed
+    points_changed = Signal(int)               # Net change applied to the balance
+    reward_claimed = Signal(int, int)          # reward_id, cost
+    focus_completed = Signal(str)              # Phase that finished ('focus', 'break', 'timeblock', ...)
+    reflection_saved = Signal(str)             # Date of the saved reflection
+    data_restored = Signal(list)               # Tables an undo or redo rewrote
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
@@ -4,26 +4,25 @@ Displays current time in a calm, minimal format
 """
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from datetime import datetime
 import platform
+from .heartbeat import Heartbeat
 
 
 class ClockWidget(QWidget):
     """
     Minimal clock display for sidebar.
-    Updates once per minute to avoid distraction.
+    Updates on each minute boundary to avoid distraction.
     """
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
         
-        # Update timer - once per minute
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_time)
-        self.update_timer.start(60000)  # 60 seconds
+        # Minute ticks on the boundary, paused while hidden (catches up on show)
+        Heartbeat.instance().subscribe(self, self.update_time, Heartbeat.MINUTE)
         
         # Initial update
         self.update_time()
@@ -82,11 +81,6 @@ class ClockWidget(QWidget):
         
         self.time_label.setText(time_str)
         self.date_label.setText(date_str)
-    
-    def showEvent(self, event):
-        """When widget becomes visible, update immediately"""
-        super().showEvent(event)
-        self.update_time()
 
 
 # Alternative: Compact Clock for Top Bar
@@ -100,10 +94,7 @@ class CompactClockWidget(QWidget):
         super().__init__(parent)
         self.init_ui()
         
-        # Update timer
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_time)
-        self.update_timer.start(60000)
+        Heartbeat.instance().subscribe(self, self.update_time, Heartbeat.MINUTE)
         
         self.update_time()
     
@@ -138,8 +129,3 @@ class CompactClockWidget(QWidget):
             time_str = now.strftime("%-I:%M %p")
             
         self.time_label.setText(time_str)
-    
-    def showEvent(self, event):
-        """When widget becomes visible, update immediately"""
-        super().showEvent(event)
-        self.update_time()
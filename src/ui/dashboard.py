@@ -1,3 +1,4 @@
+from datetime import date, timedelta
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, 
                                QComboBox, QGridLayout, QGraphicsDropShadowEffect)
 from PySide6.QtCore import Qt, Signal
@@ -5,6 +6,9 @@ from PySide6.QtGui import QColor
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from database import DatabaseManager
+from .focus_heatmap import FocusHeatmap
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
 
 class Dashboard(QWidget):
     energy_changed = Signal(str)
@@ -105,15 +109,51 @@ class Dashboard(QWidget):
         self.graph_layout = QVBoxLayout(self.graph_frame)
         self.graph_layout.setContentsMargins(24, 24, 24, 24)
         
-        self.figure = Figure(figsize=(8, 3), dpi=100, facecolor='#161616')
+        self.figure = Figure(figsize=(8, 3), dpi=100, facecolor='#161616', tight_layout=True)
         self.canvas = FigureCanvas(self.figure)
         self.graph_layout.addWidget(self.canvas)
+        self.init_graph()
         
         self.layout.addWidget(self.graph_frame)
+
+        # Focus History
+        focus_header = QLabel("Focus History")
+        focus_header.setStyleSheet("font-size: 18px; font-weight: 500; color: #EAEAEA; margin-top: 24px; margin-bottom: 12px;")
+        self.layout.addWidget(focus_header)
+        
+        focus_frame = QFrame()
+        focus_frame.setStyleSheet("""
+            QFrame { 
+                background-color: #1A1A1A; 
+                border-radius: 14px;
+            }
+        """)
+        focus_layout = QVBoxLayout(focus_frame)
+        focus_layout.setContentsMargins(24, 20, 24, 20)
+        focus_layout.setSpacing(12)
+        
+        self.focus_heatmap = FocusHeatmap()
+        focus_layout.addWidget(self.focus_heatmap)
+        
+        self.focus_summary = QLabel()
+        self.focus_summary.setStyleSheet("color: #6A6A6A; font-size: 11px; background: transparent;")
+        focus_layout.addWidget(self.focus_summary)
+        
+        self.layout.addWidget(focus_frame)
         self.layout.addStretch()
 
+        self.card_values = {}   # card -> text currently shown
+        self.graph_state = None  # What the bars currently show
+        self.focus_day = None    # Day the focus history was last read
         self.refresh_stats()
         self.load_energy_level()
+        
+        bus = ChangeBus.instance()
+        for signal in (bus.points_changed, bus.habit_logged, bus.habits_changed,
+                       bus.task_completed, bus.tasks_changed):
+            signal.connect(self.request_refresh)
+        bus.focus_completed.connect(self.on_focus_completed)
+        bus.data_restored.connect(self.request_refresh)
 
     def add_shadow(self, widget, blur=24, opacity=0.3):
         shadow = QGraphicsDropShadowEffect()
@@ -155,6 +195,9 @@ class Dashboard(QWidget):
         return card
 
     def update_card_value(self, card: QFrame, value: str):
+        if self.card_values.get(card) == value:
+            return
+        self.card_values[card] = value
         label = card.findChild(QLabel, "value_label")
         if label:
             label.setText(value)
@@ -169,43 +212,70 @@ class Dashboard(QWidget):
         self.energy_combo.setCurrentIndex(index)
 
     def refresh_stats(self):
-        stats = self.db.get_todays_stats()
+        """Re-read everything the dashboard shows in one query and update
+        only the cards and bars whose values changed."""
+        today = self.stats_day = date.today()
+        stats = self.db.get_dashboard_stats(today.isoformat())
+        self.week_start = today - timedelta(days=6)
+        self.week_points = stats.pop('week_points')
+        self.stats = stats
         
         self.update_card_value(self.points_card, str(stats['points_balance']))
-        self.update_card_value(self.habits_card, f"{stats['habits_done']}/{stats['total_habits']}")
-        self.update_card_value(self.tasks_card, str(stats['pending_tasks']))
-        self.update_card_value(self.top3_card, str(stats['top3_pending']))
-        
+        self.update_habits_card()
+        self.update_task_cards()
         self.draw_graph()
-
-    def draw_graph(self):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111, facecolor='#161616')
-        
-        habits = self.db.get_habits()
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        
-        if not habits:
-            ax.text(0.5, 0.5, "No habits yet", ha='center', va='center', 
-                   fontsize=14, color='#6A6A6A')
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-            self.canvas.draw()
-            return
         
-        total_points = [0] * 7
-        for habit in habits:
-            week_points = self.db.get_week_habit_points(habit[0])
-            for i, p in enumerate(week_points):
-                total_points[i] += p
+        # New focus time arrives through the change bus; re-read on a new day
+        if self.focus_day != today:
+            self.refresh_focus_history()
+
+    def update_habits_card(self):
+        self.update_card_value(self.habits_card, f"{self.stats['habits_done']}/{self.stats['total_habits']}")
+
+    def update_task_cards(self):
+        self.update_card_value(self.tasks_card, str(self.stats['pending_tasks']))
+        self.update_card_value(self.top3_card, str(self.stats['top3_pending']))
+
+    # ---------------------
+    # Change bus: any change to what the dashboard shows ends in one
+    # coalesced refresh (one query, in-place updates), deferred while hidden
+    # ---------------------
+    def request_refresh(self, *args):
+        RefreshScheduler.instance().request(self, self.refresh_stats)
+
+    def on_focus_completed(self, phase: str):
+        if phase in ('focus', 'timeblock'):
+            RefreshScheduler.instance().request(self, self.refresh_focus_history)
+
+    def refresh_focus_history(self):
+        """Heatmap and best hour/day, read from the focus rollups."""
+        self.focus_day = date.today()
+        start, end = self.focus_heatmap.date_range()
+        daily = self.db.get_focus_daily(start, end)
+        self.focus_heatmap.set_data(daily)
         
-        # Muted bar colors
-        colors = ['#4A7C59' if p > 0 else '#2D2D2D' for p in total_points]
-        bars = ax.bar(days, total_points, color=colors, width=0.5, edgecolor='none')
+        by_hour = self.db.get_focus_by_hour()
+        by_weekday = self.db.get_focus_by_weekday()
+        total = sum(daily.values())
+        if not total:
+            self.focus_summary.setText("No completed focus sessions yet")
+            return
         
+        best_hour = max(range(24), key=lambda h: by_hour[h])
+        best_day = ['Mondays', 'Tuesdays', 'Wednesdays', 'Thursdays',
+                    'Fridays', 'Saturdays', 'Sundays'][max(range(7), key=lambda d: by_weekday[d])]
+        hour_label = f"{best_hour % 12 or 12} {'AM' if best_hour < 12 else 'PM'}"
+        self.focus_summary.setText(
+            f"{total // 60}h {total % 60}m focused in the last {FocusHeatmap.MAX_WEEKS} weeks  ·  "
+            f"Most focused around {hour_label}  ·  Best on {best_day}"
+        )
+
+    def init_graph(self):
+        """Build the axes and bars once; refreshes only change their data."""
+        ax = self.ax = self.figure.add_subplot(111, facecolor='#161616')
+        self.bars = ax.bar(range(7), [0] * 7, color='#2D2D2D', width=0.5, edgecolor='none')
+        ax.set_xticks(range(7))
         ax.set_ylabel("Points", fontsize=11, color='#6A6A6A')
-        ax.set_ylim(0, max(total_points) + 2 if max(total_points) > 0 else 5)
         
         # Dark theme styling
         ax.spines['top'].set_visible(False)
@@ -216,9 +286,39 @@ class Dashboard(QWidget):
         ax.yaxis.grid(True, linestyle='-', alpha=0.15, color='#3D3D3D')
         ax.set_axisbelow(True)
         
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.empty_text = ax.text(0.5, 0.5, "No habits yet", ha='center', va='center',
+                                  fontsize=14, color='#6A6A6A', transform=ax.transAxes, visible=False)
+
+    def draw_graph(self):
+        """Show self.week_points (last 7 days, oldest first) on the bars,
+        redrawing the canvas only if something visible changed."""
+        has_habits = self.stats['total_habits'] > 0
+        state = (has_habits, self.week_start, tuple(self.week_points))
+        if state == self.graph_state:
+            return
+        self.graph_state = state
+        
+        ax = self.ax
+        if has_habits:
+            ax.set_axis_on()
+        else:
+            ax.set_axis_off()
+        self.empty_text.set_visible(not has_habits)
+        
+        # Muted bar colors
+        for bar, points in zip(self.bars, self.week_points):
+            bar.set_visible(has_habits)
+            bar.set_height(points)
+            bar.set_color('#4A7C59' if points > 0 else '#2D2D2D')
+        ax.set_xticklabels([(self.week_start + timedelta(days=i)).strftime('%a') for i in range(7)])
+        top = max(self.week_points)
+        ax.set_ylim(0, top + 2 if top > 0 else 5)
+        
+        self.canvas.draw_idle()
 
     def showEvent(self, event):
-        self.refresh_stats()
+        # Changes made elsewhere were applied on show by the scheduler;
+        # only a new day needs a refresh of its own
+        if self.stats_day != date.today():
+            self.refresh_stats()
         super().showEvent(event)
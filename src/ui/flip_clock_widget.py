@@ -3,41 +3,128 @@ Flip Clock Widget - A retro-style digital clock for the Study Focus app.
 Translated from the tkinter addon to PySide6.
 """
 
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel, QFrame
-from PySide6.QtCore import Qt, QTimer, QDateTime
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel
+from PySide6.QtCore import Qt, QDateTime, QRectF, QVariantAnimation, QEasingCurve
+from PySide6.QtGui import QPainter, QPixmap, QColor, QFont, QPen, QPainterPath
 from datetime import datetime
+from .heartbeat import Heartbeat
 
-class DigitContainer(QFrame):
-    """A single digit container for the flip clock."""
-    def __init__(self, parent=None):
+
+class GlyphAtlas:
+    """
+    Every digit face (card background + glyph) pre-rendered once into a
+    single strip pixmap per device pixel ratio. Digits are then blitted
+    from source rects, so a tick never touches text layout.
+    """
+    GLYPHS = "0123456789 "
+    FACE_WIDTH = 80
+    FACE_HEIGHT = 120
+
+    _atlases = {}
+
+    @classmethod
+    def for_ratio(cls, dpr):
+        atlas = cls._atlases.get(dpr)
+        if atlas is None:
+            atlas = cls._atlases[dpr] = cls(dpr)
+        return atlas
+
+    def __init__(self, dpr):
+        self.dpr = dpr
+        w, h = self.FACE_WIDTH, self.FACE_HEIGHT
+        self.pixmap = QPixmap(int(w * len(self.GLYPHS) * dpr), int(h * dpr))
+        self.pixmap.setDevicePixelRatio(dpr)
+        self.pixmap.fill(Qt.transparent)
+
+        font = QFont("Arial")
+        font.setPixelSize(80)
+        font.setBold(True)
+
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(font)
+        for i, glyph in enumerate(self.GLYPHS):
+            face = QRectF(i * w, 0, w, h)
+            path = QPainterPath()
+            path.addRoundedRect(face.adjusted(1, 1, -1, -1), 8, 8)
+            painter.fillPath(path, QColor("#2A2A2A"))
+            painter.setPen(QPen(QColor("#1A1A1A"), 2))
+            painter.drawPath(path)
+            painter.setPen(Qt.white)
+            painter.drawText(face, Qt.AlignCenter, glyph)
+        painter.end()
+
+    def source(self, glyph, top=0.0, bottom=1.0):
+        """Logical source rect of a glyph face, optionally a horizontal slice."""
+        index = self.GLYPHS.find(glyph)
+        if index < 0:
+            index = len(self.GLYPHS) - 1
+        h = self.FACE_HEIGHT
+        return QRectF(index * self.FACE_WIDTH, top * h, self.FACE_WIDTH, (bottom - top) * h)
+
+
+class DigitContainer(QWidget):
+    """A single digit of the flip clock, painted from the glyph atlas.
+    With `animate`, a change flips the top half down over the new digit."""
+    FLIP_DURATION = 260  # ms
+
+    def __init__(self, parent=None, animate=False):
         super().__init__(parent)
-        self.setFixedSize(80, 120)
-        self.setStyleSheet("""
-            DigitContainer {
-                background-color: #2A2A2A;
-                border: 2px solid #1A1A1A;
-                border-radius: 8px;
-            }
-        """)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.label = QLabel("0")
-        self.label.setAlignment(Qt.AlignCenter)
-        self.label.setStyleSheet("""
-            QLabel {
-                font-family: 'Arial';
-                font-size: 80px;
-                font-weight: bold;
-                color: white;
-                background-color: transparent;
-            }
-        """)
-        layout.addWidget(self.label)
+        self.setFixedSize(GlyphAtlas.FACE_WIDTH, GlyphAtlas.FACE_HEIGHT)
+        self.digit = "0"
+        self.previous = "0"
+        self.progress = 1.0  # Flip progress, 1.0 when at rest
+
+        self.animation = None
+        if animate:
+            self.animation = QVariantAnimation(self)
+            self.animation.setStartValue(0.0)
+            self.animation.setEndValue(1.0)
+            self.animation.setDuration(self.FLIP_DURATION)
+            self.animation.setEasingCurve(QEasingCurve.InOutQuad)
+            self.animation.valueChanged.connect(self.set_progress)
 
     def set_digit(self, digit):
-        self.label.setText(str(digit))
+        digit = str(digit)
+        if digit == self.digit:
+            return  # Unchanged digits are never repainted
+        self.previous, self.digit = self.digit, digit
+        if self.animation is not None and self.isVisible():
+            self.animation.stop()
+            self.progress = 0.0
+            self.animation.start()
+        else:
+            self.progress = 1.0
+        self.update()
+
+    def set_progress(self, value):
+        self.progress = value
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        atlas = GlyphAtlas.for_ratio(self.devicePixelRatioF())
+        w, h = float(self.width()), float(self.height())
+        half = h / 2
+
+        if self.progress >= 1.0:
+            painter.drawPixmap(QRectF(0, 0, w, h), atlas.pixmap, atlas.source(self.digit))
+            return
+
+        # Static halves: new digit's top is revealed, old bottom stays until covered
+        painter.drawPixmap(QRectF(0, 0, w, half), atlas.pixmap, atlas.source(self.digit, 0.0, 0.5))
+        painter.drawPixmap(QRectF(0, half, w, half), atlas.pixmap, atlas.source(self.previous, 0.5, 1.0))
+
+        # The flap: old top half folding down, then new bottom half unfolding
+        if self.progress < 0.5:
+            flap = half * (1.0 - self.progress * 2)
+            painter.drawPixmap(QRectF(0, half - flap, w, flap), atlas.pixmap,
+                               atlas.source(self.previous, 0.0, 0.5))
+        else:
+            flap = half * (self.progress * 2 - 1.0)
+            painter.drawPixmap(QRectF(0, half, w, flap), atlas.pixmap,
+                               atlas.source(self.digit, 0.5, 1.0))
 
 
 class FlipClockWidget(QWidget):
@@ -45,17 +132,17 @@ class FlipClockWidget(QWidget):
     Main Flip Clock widget containing hour, minute, and second units.
     Matches the aesthetic of the original tkinter addon.
     """
-    def __init__(self, parent=None, show_seconds=True, mode="auto"):
+    def __init__(self, parent=None, show_seconds=True, mode="auto", animate=False):
         super().__init__(parent)
         self.show_seconds = show_seconds
         self.mode = mode # "auto" for system clock, "manual" for timer
+        self.animate = animate  # Flip animation on digit changes
         self.init_ui()
         
-        # Timer for updates (only in auto mode)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_clock)
+        # Second ticks from the shared heartbeat (only in auto mode, only while shown)
         if self.mode == "auto":
-            self.timer.start(1000)
+            Heartbeat.instance().subscribe(self, self.update_clock,
+                                           Heartbeat.SECOND if show_seconds else Heartbeat.MINUTE)
             self.update_clock()
 
     def init_ui(self):
@@ -90,8 +177,8 @@ class FlipClockWidget(QWidget):
         unit_layout = QHBoxLayout()
         unit_layout.setSpacing(5)
         
-        d1 = DigitContainer()
-        d2 = DigitContainer()
+        d1 = DigitContainer(animate=self.animate)
+        d2 = DigitContainer(animate=self.animate)
         
         unit_layout.addWidget(d1)
         unit_layout.addWidget(d2)
@@ -137,7 +224,8 @@ class FlipClockWidget(QWidget):
                 self.second_unit[0].set_digit('0')
                 self.second_unit[1].set_digit('0')
 
-        self.am_pm_label.setText(am_pm)
+        if am_pm != self.am_pm_label.text():
+            self.am_pm_label.setText(am_pm)
 
     def update_clock(self):
         if self.mode != "auto":
@@ -0,0 +1,127 @@
+"""
+Focus Heatmap - Calendar heatmap of completed focus minutes per day.
+Painted directly from the focus_daily rollup; one column per week.
+"""
+
+from datetime import date, timedelta
+from PySide6.QtWidgets import QWidget, QToolTip
+from PySide6.QtCore import Qt, QRect, QEvent
+from PySide6.QtGui import QPainter, QColor, QFont
+
+
+class FocusHeatmap(QWidget):
+    """
+    Weeks run left to right (most recent on the right), Monday to Sunday
+    top to bottom. As many weeks as fit the width are shown, up to MAX_WEEKS.
+    """
+    CELL = 12
+    GAP = 3
+    LEFT = 30  # Weekday labels
+    TOP = 18   # Month labels
+    MAX_WEEKS = 104
+
+    # (minimum minutes, color), highest threshold first
+    LEVELS = [
+        (120, QColor("#4A7C59")),
+        (60, QColor("#3C6649")),
+        (30, QColor("#2F5039")),
+        (1, QColor("#243A2B")),
+        (0, QColor("#1E1E1E")),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.minutes = {}
+        self.end_date = date.today()
+        self.label_font = QFont()
+        self.label_font.setPixelSize(10)
+        self.setMouseTracking(True)
+        self.setFixedHeight(self.TOP + 7 * (self.CELL + self.GAP))
+        self.setMinimumWidth(self.LEFT + 12 * (self.CELL + self.GAP))
+
+    def date_range(self):
+        """(start, end) ISO dates of every day the heatmap can show."""
+        start = self.first_monday(self.MAX_WEEKS)
+        return start.isoformat(), self.end_date.isoformat()
+
+    def set_data(self, minutes_by_date, end_date=None):
+        """minutes_by_date: ISO date -> completed focus minutes."""
+        self.minutes = minutes_by_date
+        self.end_date = end_date or date.today()
+        self.update()
+
+    def visible_weeks(self):
+        step = self.CELL + self.GAP
+        return max(1, min(self.MAX_WEEKS, (self.width() - self.LEFT) // step))
+
+    def first_monday(self, weeks):
+        this_monday = self.end_date - timedelta(days=self.end_date.weekday())
+        return this_monday - timedelta(weeks=weeks - 1)
+
+    def cell_rect(self, week, weekday):
+        step = self.CELL + self.GAP
+        return QRect(self.LEFT + week * step, self.TOP + weekday * step, self.CELL, self.CELL)
+
+    def cell_at(self, pos):
+        step = self.CELL + self.GAP
+        week = (pos.x() - self.LEFT) // step
+        weekday = (pos.y() - self.TOP) // step
+        weeks = self.visible_weeks()
+        if pos.x() < self.LEFT or pos.y() < self.TOP or not (0 <= week < weeks and 0 <= weekday < 7):
+            return None
+        if not self.cell_rect(week, weekday).contains(pos):
+            return None  # In the gap between cells
+        day = self.first_monday(weeks) + timedelta(weeks=week, days=weekday)
+        return day if day <= self.end_date else None
+
+    def color_for(self, minutes):
+        for threshold, color in self.LEVELS:
+            if minutes >= threshold:
+                return color
+        return self.LEVELS[-1][1]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self.label_font)
+        weeks = self.visible_weeks()
+        start = self.first_monday(weeks)
+
+        painter.setPen(QColor("#6A6A6A"))
+        for weekday, name in ((0, "Mon"), (2, "Wed"), (4, "Fri")):
+            rect = self.cell_rect(0, weekday)
+            painter.drawText(QRect(0, rect.y() - 2, self.LEFT - 6, self.CELL + 4),
+                             Qt.AlignRight | Qt.AlignVCenter, name)
+
+        painter.setPen(Qt.NoPen)
+        last_month = None
+        label_end = 0  # Right edge of the previous month label, to avoid overlaps
+        for week in range(weeks):
+            monday = start + timedelta(weeks=week)
+            x = self.cell_rect(week, 0).x()
+            if monday.month != last_month and x >= label_end:
+                last_month = monday.month
+                label_end = x + 30
+                painter.setPen(QColor("#6A6A6A"))
+                painter.drawText(QRect(x, 0, 40, self.TOP - 4), Qt.AlignLeft | Qt.AlignBottom,
+                                 monday.strftime("%b"))
+                painter.setPen(Qt.NoPen)
+            for weekday in range(7):
+                day = monday + timedelta(days=weekday)
+                if day > self.end_date:
+                    break
+                painter.setBrush(self.color_for(self.minutes.get(day.isoformat(), 0)))
+                painter.drawRoundedRect(self.cell_rect(week, weekday), 2, 2)
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            day = self.cell_at(event.pos())
+            if day is None:
+                QToolTip.hideText()
+            else:
+                minutes = self.minutes.get(day.isoformat(), 0)
+                QToolTip.showText(event.globalPos(),
+                                  f"{day.strftime('%a, %b %d %Y')}: {minutes // 60}h {minutes % 60}m focused",
+                                  self)
+            return True
+        return super().event(event)
@@ -1,11 +1,14 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                 QPushButton, QComboBox, QTimeEdit, QLineEdit, 
-                                QFrame, QStackedWidget, QSizePolicy, QCheckBox)
-from PySide6.QtCore import Qt, QTimer, Signal, QTime, QDate
-from PySide6.QtGui import QFont
-from datetime import datetime, time
+                                QFrame, QStackedWidget, QSizePolicy, QCheckBox,
+                                QDateEdit)
+from PySide6.QtCore import Qt, QTimer, Signal, QTime, QDate, Slot, SLOT
+from PySide6.QtGui import QFont, QGuiApplication
+from datetime import datetime, time, timedelta
 from focus_manager import FocusManager, FocusMode, PomodoroPhase
 from .flip_clock_widget import FlipClockWidget
+from .heartbeat import Heartbeat
+from .change_bus import ChangeBus
 
 class FocusWidget(QWidget):
     """
@@ -13,20 +16,39 @@ class FocusWidget(QWidget):
     """
     session_completed = Signal(str)  # Emits phase name on completion
     
+    # Longest single wait for a block boundary (QTimer intervals are 32-bit ms)
+    MAX_BLOCK_WAIT_MS = 24 * 60 * 60 * 1000
+    
     def __init__(self, db_manager):
         super().__init__()
         self.mgr = FocusManager(db_manager)
         self.init_ui()
         
-        # Internal timer for focus logic (ticking every second)
-        self.tick_timer = QTimer(self)
-        self.tick_timer.timeout.connect(self.on_tick)
-        self.tick_timer.setInterval(1000)
-        
-        # Timer for checking time block status
-        self.block_check_timer = QTimer(self)
-        self.block_check_timer.timeout.connect(self.check_timeblock_status)
-        self.block_check_timer.setInterval(30000)  # Check every 30 seconds
+        # Display ticks come from the shared heartbeat and pause while hidden;
+        # completion is caught by a single-shot timer at the session end time
+        self.heartbeat = Heartbeat.instance()
+        self.ticking = False
+        self.completion_timer = QTimer(self)
+        self.completion_timer.setSingleShot(True)
+        self.completion_timer.setTimerType(Qt.PreciseTimer)
+        self.completion_timer.timeout.connect(self.on_tick)
+
+        # Time blocks: one single-shot timer armed for the next start/end
+        self.block_timer = QTimer(self)
+        self.block_timer.setSingleShot(True)
+        self.block_timer.setTimerType(Qt.PreciseTimer)
+        self.block_timer.timeout.connect(self.on_block_transition)
+        self.watch_for_resume()
+
+        self.on_block_transition()
+        self.refresh_planner()  # Blocks persisted by earlier runs
+
+        # Resume a session the manager recovered from its journal
+        if self.mgr.is_running:
+            self.mode_selector.setCurrentIndex(0)
+            self.stack.setCurrentIndex(0)
+            self.start_ticking()
+            self.update_pomo_ui()
 
     def init_ui(self):
         self.main_layout = QVBoxLayout(self)
@@ -139,7 +161,7 @@ class FocusWidget(QWidget):
             }
             QPushButton:hover { color: #CC5555; }
         """)
-        self.clear_block_btn.clicked.connect(self.clear_timeblock)
+        self.clear_block_btn.clicked.connect(lambda: self.clear_timeblock())
         block_status_layout.addWidget(self.clear_block_btn, 0, Qt.AlignRight)
         
         block_layout.addWidget(self.block_status_frame)
@@ -151,6 +173,28 @@ class FocusWidget(QWidget):
         form_layout.setContentsMargins(24, 24, 24, 24)
         form_layout.setSpacing(16)
         
+        # Day
+        date_row = QHBoxLayout()
+        date_label = QLabel("Day:")
+        date_label.setStyleSheet("color: #EAEAEA;")
+        date_row.addWidget(date_label)
+        self.date_edit = QDateEdit()
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDate(QDate.currentDate())
+        self.date_edit.setMinimumDate(QDate.currentDate())
+        self.date_edit.setStyleSheet("""
+            QDateEdit {
+                background: #242424; 
+                border: 1px solid #333333; 
+                padding: 6px; 
+                border-radius: 6px;
+                color: #EAEAEA;
+            }
+        """)
+        date_row.addStretch()
+        date_row.addWidget(self.date_edit)
+        form_layout.addLayout(date_row)
+        
         # Start Time
         start_row = QHBoxLayout()
         start_label = QLabel("Start Time:")
@@ -222,6 +266,18 @@ class FocusWidget(QWidget):
         self.block_btn.clicked.connect(self.schedule_block)
         block_layout.addWidget(self.block_btn, 0, Qt.AlignRight)
         
+        # Week planner: every block in the next 7 days
+        planner_title = QLabel("This Week")
+        planner_title.setStyleSheet("color: #6A6A6A; font-size: 13px;")
+        block_layout.addWidget(planner_title)
+        
+        self.planner_frame = QFrame()
+        self.planner_frame.setStyleSheet("background-color: #1A1A1A; border-radius: 12px;")
+        self.planner_layout = QVBoxLayout(self.planner_frame)
+        self.planner_layout.setContentsMargins(16, 12, 16, 12)
+        self.planner_layout.setSpacing(6)
+        block_layout.addWidget(self.planner_frame)
+        
         block_layout.addStretch()
         
         # --- Clock Page ---
@@ -281,20 +337,15 @@ class FocusWidget(QWidget):
     def on_mode_changed(self, index):
         if index == 2: # Clock mode
             self.mgr.stop()
-            self.tick_timer.stop()
-            self.block_check_timer.stop()
+            self.stop_ticking()
             self.stack.setCurrentIndex(2)
             return
 
         mode = FocusMode.POMODORO if index == 0 else FocusMode.TIMEBLOCK
         if self.mgr.set_mode(mode):
             self.stack.setCurrentIndex(index)
-            # Start/stop block checker based on mode
             if mode == FocusMode.TIMEBLOCK:
-                self.block_check_timer.start()
                 self.check_timeblock_status()
-            else:
-                self.block_check_timer.stop()
         else:
             # Revert if switch failed (running)
             self.mode_selector.setCurrentIndex(0 if self.mgr.mode == FocusMode.POMODORO else 1)
@@ -306,13 +357,75 @@ class FocusWidget(QWidget):
             else:
                 self.mgr.start_break()
             
-            self.tick_timer.start()
+            self.start_ticking()
             self.update_pomo_ui()
         else:
             self.mgr.stop()
-            self.tick_timer.stop()
+            self.stop_ticking()
             self.update_pomo_ui()
 
+    def start_ticking(self):
+        if not self.ticking:
+            self.heartbeat.subscribe(self.flip_timer, self.on_tick, Heartbeat.SECOND)
+            self.ticking = True
+        if self.mgr.end_time:
+            remaining_ms = (self.mgr.end_time - datetime.now()).total_seconds() * 1000
+            self.completion_timer.start(max(0, int(remaining_ms)))
+
+    def stop_ticking(self):
+        if self.ticking:
+            self.heartbeat.unsubscribe(self.flip_timer, self.on_tick)
+            self.ticking = False
+        self.completion_timer.stop()
+
+    def watch_for_resume(self):
+        """Re-arm the block timer when the app is re-activated or the system
+        wakes from sleep; monotonic timers don't advance while suspended."""
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.applicationStateChanged.connect(self.on_app_state_changed)
+        try:
+            from PySide6.QtDBus import QDBusConnection
+        except ImportError:
+            return  # No D-Bus (e.g. Windows/macOS): rely on application state changes
+        bus = QDBusConnection.systemBus()
+        if bus.isConnected():
+            bus.connect("org.freedesktop.login1", "/org/freedesktop/login1",
+                        "org.freedesktop.login1.Manager", "PrepareForSleep",
+                        self, SLOT("on_prepare_for_sleep(bool)"))
+
+    @Slot(bool)
+    def on_prepare_for_sleep(self, going_to_sleep):
+        if not going_to_sleep:
+            self.on_block_transition()
+
+    def on_app_state_changed(self, state):
+        if state == Qt.ApplicationActive:
+            self.on_block_transition()
+
+    def arm_block_timer(self):
+        """Arm the single-shot timer for the next block start or end."""
+        boundary = self.mgr.next_block_transition()
+        if boundary is None:
+            self.block_timer.stop()
+            return
+        delay_ms = (boundary - datetime.now()).total_seconds() * 1000
+        self.block_timer.start(min(self.MAX_BLOCK_WAIT_MS, max(0, int(delay_ms) + 1)))
+
+    def on_block_transition(self):
+        """Apply any block starts/ends that are due, then re-arm."""
+        result = self.mgr.process_block_transitions()
+        self.check_timeblock_status()
+        if result['ended']:
+            self.refresh_planner()
+            bus = ChangeBus.instance()
+            for _ in result['ended']:
+                self.session_completed.emit('timeblock')
+                bus.focus_completed.emit('timeblock')
+            if result['points']:
+                bus.points_changed.emit(result['points'])
+        self.arm_block_timer()
+
     def update_pomo_ui(self):
         state = self.mgr._get_state()
         self.flip_timer.set_time(self.mgr.get_display_time())
@@ -362,9 +475,12 @@ class FocusWidget(QWidget):
     def on_tick(self):
         result = self.mgr.tick()
         if result['completed']:
-            self.tick_timer.stop()
+            self.stop_ticking()
             self.update_pomo_ui()
             self.session_completed.emit(result['phase'])
+            ChangeBus.instance().focus_completed.emit(result['phase'])
+            if result['points']:
+                ChangeBus.instance().points_changed.emit(result['points'])
             # Play sound if enabled
             if self.enable_sound_cb.isChecked():
                 self.play_completion_sound()
@@ -381,15 +497,17 @@ class FocusWidget(QWidget):
         st = self.start_edit.time()
         et = self.end_edit.time()
         
-        # Convert QTime to datetime today
-        now = datetime.now()
-        start_dt = datetime.combine(now.date(), time(st.hour(), st.minute()))
-        end_dt = datetime.combine(now.date(), time(et.hour(), et.minute()))
+        # Convert QDate + QTime to datetimes
+        day = self.date_edit.date().toPython()
+        start_dt = datetime.combine(day, time(st.hour(), st.minute()))
+        end_dt = datetime.combine(day, time(et.hour(), et.minute()))
         
         res = self.mgr.schedule_timeblock(start_dt, end_dt, self.task_input.text())
         if res['success']:
             self.task_input.clear()
             self.check_timeblock_status()
+            self.refresh_planner()
+            self.arm_block_timer()
             # Reset times for next block
             self.start_edit.setTime(QTime.currentTime().addSecs(300))
             self.end_edit.setTime(QTime.currentTime().addSecs(3900))
@@ -435,7 +553,50 @@ class FocusWidget(QWidget):
         else:
             self.block_task_label.setVisible(False)
 
-    def clear_timeblock(self):
-        """Clear the current time block"""
-        self.mgr.clear_timeblock()
-        self.block_status_frame.setVisible(False)
+    def clear_timeblock(self, block_id=None):
+        """Cancel a time block (by default the current or next one)"""
+        self.mgr.clear_timeblock(block_id)
+        self.check_timeblock_status()
+        self.refresh_planner()
+        self.arm_block_timer()
+
+    def refresh_planner(self):
+        """List the blocks scheduled from now through the next 7 days"""
+        while self.planner_layout.count():
+            item = self.planner_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        
+        now = datetime.now()
+        blocks = self.mgr.get_blocks_between(now, now + timedelta(days=7))
+        if not blocks:
+            empty = QLabel("No blocks planned")
+            empty.setStyleSheet("color: #4A4A4A; font-size: 12px;")
+            self.planner_layout.addWidget(empty)
+            return
+        
+        for block in blocks:
+            row = QWidget()
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(0, 0, 0, 0)
+            
+            when = QLabel(f"{block['start'].strftime('%a %d')}  "
+                          f"{block['start'].strftime('%I:%M %p')} - {block['end'].strftime('%I:%M %p')}")
+            when.setStyleSheet("color: #9A9A9A; font-size: 12px;")
+            task = QLabel(block['task_name'])
+            task.setStyleSheet("color: #EAEAEA; font-size: 12px;")
+            
+            remove_btn = QPushButton("✕")
+            remove_btn.setFixedSize(22, 22)
+            remove_btn.setCursor(Qt.PointingHandCursor)
+            remove_btn.setToolTip("Cancel block")
+            remove_btn.setStyleSheet("""
+                QPushButton { background: transparent; color: #6A6A6A; border: none; }
+                QPushButton:hover { color: #CC5555; }
+            """)
+            remove_btn.clicked.connect(lambda _, block_id=block['id']: self.clear_timeblock(block_id))
+            
+            row_layout.addWidget(when)
+            row_layout.addWidget(task, 1)
+            row_layout.addWidget(remove_btn)
+            self.planner_layout.addWidget(row)
@@ -1,15 +1,15 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QScrollArea, QFrame, QMessageBox,
                                QGraphicsDropShadowEffect, QGridLayout, QSizePolicy)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor
 from database import DatabaseManager
 from points_manager import PointsManager
 from .dialogs import AddHabitDialog
+from .change_bus import ChangeBus
 from datetime import datetime
 
 class HabitWidget(QWidget):
-    points_updated = Signal()
     
     def __init__(self):
         super().__init__()
@@ -87,7 +87,8 @@ class HabitWidget(QWidget):
         if dialog.exec():
             name = dialog.get_data()
             if name:
-                self.db.add_habit(name)
+                with self.db.command("Add habit"):
+                    self.db.add_habit(name)
                 self.refresh_habits()
 
     def refresh_habits(self):
@@ -97,9 +98,11 @@ class HabitWidget(QWidget):
             if item.widget():
                 item.widget().deleteLater()
 
-        habits = self.db.get_habits()
+        self.summary_day = datetime.now().strftime("%Y-%m-%d")
+        summaries = self.db.get_habit_summaries(self.summary_day)
+        self.summaries = {summary['id']: summary for summary in summaries}
         
-        if not habits:
+        if not summaries:
             empty = QLabel("No habits yet.\nClick 'New Habit' to create your first one.")
             empty.setAlignment(Qt.AlignCenter)
             empty.setStyleSheet("color: #6A6A6A; font-size: 15px; padding: 80px;")
@@ -107,14 +110,14 @@ class HabitWidget(QWidget):
             return
         
         # Grid: 3 columns
-        for idx, habit in enumerate(habits):
-            h_id, h_name, _ = habit
+        for idx, summary in enumerate(summaries):
             row = idx // 3
             col = idx % 3
-            card = self.create_habit_card(h_id, h_name)
+            card = self.create_habit_card(summary)
             self.grid_layout.addWidget(card, row, col)
 
-    def create_habit_card(self, habit_id: int, name: str) -> QFrame:
+    def create_habit_card(self, summary: dict) -> QFrame:
+        habit_id, name = summary['id'], summary['name']
         card = QFrame()
         card.setFixedSize(320, 200)
         card.setStyleSheet("""
@@ -138,7 +141,7 @@ class HabitWidget(QWidget):
         top_row.addWidget(name_label, 1)
         
         # Streak badge
-        streak = self.db.get_habit_streak(habit_id)
+        streak = summary['streak']
         if streak > 0:
             streak_label = QLabel(f"🔥 {streak}")
             streak_label.setStyleSheet("""
@@ -168,7 +171,7 @@ class HabitWidget(QWidget):
         layout.addLayout(top_row)
         
         # Weekly Progress Dots (M T W T F S S)
-        week_points = self.db.get_week_habit_points(habit_id)
+        week_points = summary['week']
         week_row = QHBoxLayout()
         week_row.setSpacing(8)
         days = ['M', 'T', 'W', 'T', 'F', 'S', 'S']
@@ -200,7 +203,7 @@ class HabitWidget(QWidget):
         layout.addStretch()
         
         # Status Buttons - Large, Pressable
-        current_status = self.db.get_todays_habit_status(habit_id)
+        current_status = summary['today_status']
         btn_row = QHBoxLayout()
         btn_row.setSpacing(10)
         
@@ -257,15 +260,18 @@ class HabitWidget(QWidget):
 
     def update_status(self, habit_id: int, status: int):
         today = datetime.now().strftime("%Y-%m-%d")
-        old_status = self.db.get_todays_habit_status(habit_id)
-        self.db.log_habit(habit_id, today, status)
+        if self.summary_day == today and habit_id in self.summaries:
+            old_status = self.summaries[habit_id]['today_status']
+        else:  # The cards were built on an earlier day
+            old_status = self.db.get_todays_habit_status(habit_id)
+        with self.db.command("Log habit"):
+            self.db.log_habit(habit_id, today, status)
+            points = self.points_mgr.award_habit_points(habit_id, status, today)
         
-        if status > old_status:
-            self.db.add_points(status - old_status)
-        elif status < old_status:
-            self.db.deduct_points(old_status - status)
-        
-        self.points_updated.emit()
+        bus = ChangeBus.instance()
+        bus.habit_logged.emit(habit_id, today, old_status, status)
+        if points:
+            bus.points_changed.emit(points)
         self.refresh_habits()
 
     def delete_habit(self, habit_id: int):
@@ -275,5 +281,6 @@ class HabitWidget(QWidget):
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            self.db.delete_habit(habit_id)
+            with self.db.command("Delete habit"):
+                self.db.delete_habit(habit_id)
             self.refresh_habits()
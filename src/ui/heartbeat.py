@@ -0,0 +1,150 @@
+"""
+Heartbeat - One shared, boundary-aligned timer for every clock-like widget.
+Subscribers ask for second, minute or hour ticks; delivery to widgets that
+are hidden (or whose window is minimized) is suspended until they show again.
+"""
+
+import time
+from datetime import datetime
+from PySide6.QtCore import QObject, QTimer, QEvent, Qt
+
+
+class _Subscription:
+    def __init__(self, owner, callback, resolution, require_visible):
+        self.owner = owner
+        self.callback = callback
+        self.resolution = resolution
+        self.require_visible = require_visible
+        self.due = None  # Epoch seconds of the next tick, None while suspended
+
+
+class Heartbeat(QObject):
+    """
+    Single precise single-shot timer armed for the earliest boundary any
+    active subscriber needs. With nothing visible subscribed it is stopped,
+    so an idle app wakes up only for the clocks actually on screen.
+    """
+    SECOND = 1
+    MINUTE = 60
+    HOUR = 3600
+
+    # Fire a little after the boundary so the wall clock has already rolled over
+    LATENCY = 0.002
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.subscriptions = []
+        self.watched = set()  # ids of widgets/windows this filter is installed on
+        self.wakeups = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.beat)
+
+    # ---------------------
+    # Subscription API
+    # ---------------------
+    def subscribe(self, owner, callback, resolution=SECOND, require_visible=True):
+        """Call `callback()` on every `resolution`-second boundary (local time).
+        `owner` is the widget whose visibility gates delivery; the
+        subscription is dropped when the owner is destroyed."""
+        sub = _Subscription(owner, callback, resolution, require_visible)
+        self.subscriptions.append(sub)
+        self.watch(owner)
+        self.reschedule()
+        return sub
+
+    def unsubscribe(self, owner, callback=None):
+        self.subscriptions = [s for s in self.subscriptions
+                              if not (s.owner is owner and (callback is None or s.callback == callback))]
+        self.reschedule()
+
+    def watch(self, widget):
+        if widget is None or id(widget) in self.watched:
+            return
+        self.watched.add(id(widget))
+        widget.installEventFilter(self)
+        widget.destroyed.connect(lambda *_, key=id(widget): self.forget(key))
+
+    def forget(self, key):
+        self.watched.discard(key)
+        self.subscriptions = [s for s in self.subscriptions if id(s.owner) != key]
+        try:
+            self.reschedule()
+        except RuntimeError:
+            pass  # Application teardown: the timer is already gone
+
+    # ---------------------
+    # Scheduling
+    # ---------------------
+    @staticmethod
+    def next_boundary(now, resolution):
+        """Next local-time multiple of `resolution` seconds strictly after now."""
+        offset = datetime.fromtimestamp(now).astimezone().utcoffset().total_seconds()
+        local = now + offset
+        return (int(local // resolution) + 1) * resolution - offset
+
+    def is_active(self, sub):
+        if not sub.require_visible:
+            return True
+        owner = sub.owner
+        return owner.isVisible() and not owner.window().isMinimized()
+
+    def reschedule(self, deliver_resumed=True):
+        """Re-evaluate which subscriptions are live and arm the timer for the
+        earliest due tick. Subscriptions that just resumed are brought up to
+        date immediately."""
+        now = time.time()
+        resumed = []
+        for sub in self.subscriptions:
+            if self.is_active(sub):
+                if sub.due is None:
+                    sub.due = self.next_boundary(now, sub.resolution)
+                    resumed.append(sub)
+            else:
+                sub.due = None
+
+        if deliver_resumed:
+            for sub in resumed:
+                sub.callback()
+
+        pending = [s.due for s in self.subscriptions if s.due is not None]
+        if not pending:
+            self.timer.stop()
+            return
+        delay = max(0.0, min(pending) - time.time() + self.LATENCY)
+        self.timer.start(int(delay * 1000))
+
+    def beat(self):
+        self.wakeups += 1
+        now = time.time()
+        for sub in list(self.subscriptions):
+            if sub.due is None or sub.due > now + self.LATENCY:
+                continue
+            if not self.is_active(sub):
+                sub.due = None
+                continue
+            sub.due = self.next_boundary(now, sub.resolution)
+            sub.callback()
+        self.reschedule(deliver_resumed=False)
+
+    def eventFilter(self, obj, event):
+        etype = event.type()
+        if etype == QEvent.Show:
+            # Track the owner's current top-level window for minimize/restore
+            window = obj.window() if obj.isWidgetType() else None
+            if window is not None and window is not obj:
+                self.watch(window)
+            self.reschedule()
+        elif etype in (QEvent.Hide, QEvent.WindowStateChange):
+            self.reschedule()
+        return False
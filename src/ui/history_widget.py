@@ -0,0 +1,269 @@
+from datetime import datetime
+from itertools import islice
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QPushButton, QFrame, QButtonGroup, QTableView,
+                               QHeaderView, QStyledItemDelegate, QAbstractItemView)
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QRectF
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QFont
+from database import DatabaseManager
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
+
+
+class HistoryModel(QAbstractListModel):
+    """One history, newest first, fetched a page at a time as the view
+    scrolls (canFetchMore/fetchMore). Rows are kept as the four strings the
+    delegate paints, so no per-row widgets exist however deep the scroll."""
+    RowRole = Qt.UserRole + 1
+
+    def __init__(self, page_size: int, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.kind = None
+        self.rows = []         # (title, detail, date text, trailing badge)
+        self.source = iter(())  # Lazy newest-first stream of the current history
+        self.exhausted = True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == self.RowRole:
+            return row
+        if role == Qt.DisplayRole:
+            return row[0]
+        if role == Qt.ToolTipRole:
+            return row[1] or None  # Full detail, as the painted line is elided
+        return None
+
+    def load(self, kind: str, source):
+        """Start over on `source` (an iter_history stream) with its first page."""
+        self.beginResetModel()
+        self.kind = kind
+        self.rows = []
+        self.source = source
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        rows = [self.describe(self.kind, row) for row in islice(self.source, self.page_size)]
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    @staticmethod
+    def describe(kind, row):
+        """(title, detail, date text, trailing badge) for a history row."""
+        if kind == 'completed':
+            return row['name'] or "Deleted task", "", row['date'], f"+{row['points']}"
+        if kind == 'postponed':
+            return row['name'] or "Deleted task", row['reason'], row['date'], ""
+        if kind == 'rewards':
+            return row['name'] or "Deleted reward", "", row['date'], f"-{row['cost']}"
+        if kind == 'focus':
+            start = datetime.fromisoformat(row['start'])
+            title = row['task_name'] or row['mode'].capitalize()
+            return title, row['type'] or "", start.strftime("%Y-%m-%d  %H:%M"), f"{row['minutes']} min"
+        answers = [row['completed'], row['difficult'], row['win']]
+        return "Reflection", "  ·  ".join(a for a in answers if a), row['date'], ""
+
+
+class HistoryRowDelegate(QStyledItemDelegate):
+    """Paints one history row as a card: title over an elided detail line,
+    then the badge and the date on the right."""
+    CARD_HEIGHT = 56
+    CARD_SPACING = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(13)
+        self.title_font.setWeight(QFont.DemiBold)
+        self.detail_font = QFont()
+        self.detail_font.setPixelSize(12)
+        self.badge_font = QFont()
+        self.badge_font.setPixelSize(12)
+        self.badge_font.setWeight(QFont.DemiBold)
+        self.date_font = QFont()
+        self.date_font.setPixelSize(11)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.CARD_SPACING)
+
+    def paint(self, painter, option, index):
+        title, detail, when, badge = index.data(HistoryModel.RowRole)
+        card = QRect(option.rect.left(), option.rect.top(), option.rect.width() - 8, self.CARD_HEIGHT)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), 10, 10)
+        painter.fillPath(path, QColor("#161616"))
+        painter.setPen(QColor("#242424"))
+        painter.drawPath(path)
+
+        # Right-hand side: date, with the badge before it. Text is measured with
+        # the painter's metrics, as the fonts resolve against the view's font
+        right = card.right() - 16
+        painter.setFont(self.date_font)
+        date_width = painter.fontMetrics().horizontalAdvance(when)
+        painter.setPen(QColor("#6A6A6A"))
+        painter.drawText(QRect(right - date_width, card.top(), date_width, card.height()),
+                         Qt.AlignRight | Qt.AlignVCenter, when)
+        right -= date_width + 12
+        if badge:
+            painter.setFont(self.badge_font)
+            badge_width = painter.fontMetrics().horizontalAdvance(badge)
+            painter.setPen(QColor("#7A8BA2"))
+            painter.drawText(QRect(right - badge_width, card.top(), badge_width, card.height()),
+                             Qt.AlignRight | Qt.AlignVCenter, badge)
+            right -= badge_width + 12
+
+        # Title, and the detail line under it when there is one
+        left = card.left() + 16
+        width = max(0, right - left)
+        title_top = card.top() + (10 if detail else (card.height() - 18) // 2)
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("#E5E5E5"))
+        painter.drawText(QRect(left, title_top, width, 18), Qt.AlignLeft | Qt.AlignVCenter,
+                         painter.fontMetrics().elidedText(title, Qt.ElideRight, width))
+        if detail:
+            painter.setFont(self.detail_font)
+            painter.setPen(QColor("#9A9A9A"))
+            painter.drawText(QRect(left, card.top() + 29, width, 17), Qt.AlignLeft | Qt.AlignVCenter,
+                             painter.fontMetrics().elidedText(detail, Qt.ElideRight, width))
+        painter.restore()
+
+
+class HistoryWidget(QWidget):
+    """Infinite-scroll history of completed tasks, postponements, reward
+    claims, focus sessions and reflections, read a page at a time."""
+    PAGE_SIZE = 30  # Rows fetched each time the view nears the bottom
+
+    TABS = [
+        ('completed', "Completed"),
+        ('postponed', "Postponed"),
+        ('focus', "Focus"),
+        ('rewards', "Rewards"),
+        ('reflections', "Reflections"),
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.db = DatabaseManager()
+        self.kind = 'completed'
+        self.setStyleSheet("background-color: #121212;")
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(24)
+        layout.setContentsMargins(48, 48, 48, 48)
+
+        # Header
+        header = QHBoxLayout()
+        title = QLabel("History")
+        title.setStyleSheet("""
+            font-size: 24px;
+            font-weight: 600;
+            color: #EAEAEA;
+            letter-spacing: -0.2px;
+        """)
+        header.addWidget(title)
+        header.addStretch()
+
+        self.tab_group = QButtonGroup(self)
+        for kind, text in self.TABS:
+            btn = QPushButton(text)
+            btn.setCheckable(True)
+            btn.setChecked(kind == self.kind)
+            btn.setCursor(Qt.PointingHandCursor)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #1E1E1E;
+                    color: #6A6A6A;
+                    border: 1px solid #2D2D2D;
+                    border-radius: 8px;
+                    padding: 6px 12px;
+                    font-size: 12px;
+                    font-weight: 600;
+                }
+                QPushButton:hover { color: #9A9A9A; }
+                QPushButton:checked { background-color: #242424; color: #EAEAEA; }
+            """)
+            btn.clicked.connect(lambda _=False, kind=kind: self.show_kind(kind))
+            self.tab_group.addButton(btn)
+            header.addWidget(btn)
+        layout.addLayout(header)
+
+        # List: the view asks the model for further pages as it nears the bottom.
+        # A one-column table with fixed row heights, because QListView lays out
+        # every loaded row again on each insert while a table's cost per page
+        # stays flat however many rows are loaded
+        self.model = HistoryModel(self.PAGE_SIZE, self)
+        self.delegate = HistoryRowDelegate(self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self.delegate)
+        self.view.horizontalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.verticalHeader().hide()
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(
+            HistoryRowDelegate.CARD_HEIGHT + HistoryRowDelegate.CARD_SPACING)
+        self.view.setShowGrid(False)
+        self.view.setFrameShape(QFrame.NoFrame)
+        self.view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.view.setFocusPolicy(Qt.NoFocus)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.view.setStyleSheet("QTableView { background: transparent; border: none; }")
+        layout.addWidget(self.view, 1)
+
+        self.empty_label = QLabel("Nothing here yet.")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("color: #6A6A6A; font-size: 14px; padding: 60px;")
+        layout.addWidget(self.empty_label, 1, Qt.AlignTop)
+
+        # Anything that appends to a history restarts it from the newest row;
+        # while this page is hidden that waits until it is shown
+        bus = ChangeBus.instance()
+        bus.task_completed.connect(lambda *_: self.request_reset('completed'))
+        bus.tasks_changed.connect(lambda: self.request_reset('completed', 'postponed'))
+        bus.focus_completed.connect(lambda *_: self.request_reset('focus'))
+        bus.reward_claimed.connect(lambda *_: self.request_reset('rewards'))
+        bus.reflection_saved.connect(lambda *_: self.request_reset('reflections'))
+        bus.data_restored.connect(self.on_data_restored)
+
+        self.reset()
+
+    def show_kind(self, kind):
+        if kind != self.kind:
+            self.kind = kind
+            self.reset()
+
+    def on_data_restored(self, tables):
+        kinds = {'task_logs': ('completed', 'postponed'), 'reward_logs': ('rewards',),
+                 'reflections': ('reflections',)}
+        self.request_reset(*(kind for table in tables for kind in kinds.get(table, ())))
+
+    def request_reset(self, *kinds):
+        if self.kind in kinds:
+            RefreshScheduler.instance().request(self, self.reset)
+
+    def reset(self):
+        """Drop the loaded rows and start again from the newest."""
+        self.model.load(self.kind, self.db.iter_history(self.kind, self.PAGE_SIZE))
+        self.view.scrollToTop()
+        has_rows = self.model.rowCount() > 0
+        self.view.setVisible(has_rows)
+        self.empty_label.setVisible(not has_rows)
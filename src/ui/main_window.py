@@ -1,9 +1,10 @@
 import sys
+from datetime import datetime, time, timedelta
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QStackedWidget, QLabel, 
                                QFrame, QGraphicsDropShadowEffect, QSpacerItem, QSizePolicy)
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
+from PySide6.QtGui import QColor, QKeySequence, QShortcut
 
 from .styles_loader import load_stylesheet
 from .dashboard import Dashboard
@@ -11,12 +12,16 @@ from .monthly_habit_widget import MonthlyHabitWidget
 from .task_widget import TaskWidget
 from .rewards_widget import RewardsWidget
 from .reflection_dialog import ReflectionDialog
+from .search_dialog import SearchDialog
 from .focus_widget import FocusWidget
 from .clock_widget import ClockWidget
 from .flip_clock_widget import FlipClockWidget
 from .calendar_widget import CalendarWidget
+from .history_widget import HistoryWidget
+from .change_bus import ChangeBus
 
 from database import DatabaseManager
+from points_manager import PointsManager
 from PySide6.QtCore import Qt, QTimer, QDateTime
 
 class MainWindow(QMainWindow):
@@ -33,6 +38,16 @@ class MainWindow(QMainWindow):
         self.db = DatabaseManager()
         self.drag_pos = None
         
+        # Settle weekly bonuses and missed deadlines from while the app was
+        # closed, then again at every midnight
+        self.points_mgr = PointsManager(self.db)
+        self.run_daily_checks()
+        self.day_timer = QTimer(self)
+        self.day_timer.setSingleShot(True)
+        self.day_timer.setTimerType(Qt.PreciseTimer)
+        self.day_timer.timeout.connect(self.on_day_rollover)
+        self.arm_day_timer()
+        
         # Central Widget
         central_widget = QWidget()
         central_widget.setStyleSheet("background-color: #121212;")
@@ -99,6 +114,32 @@ class MainWindow(QMainWindow):
         title_layout.addWidget(app_subtitle)
         
         title_container_layout.addWidget(title_frame)
+        
+        # Search (also Ctrl+F)
+        self.btn_search = QPushButton("🔍  Search")
+        self.btn_search.setCursor(Qt.PointingHandCursor)
+        self.btn_search.setToolTip("Search tasks, habits, events and reflections (Ctrl+F)")
+        self.btn_search.setStyleSheet("""
+            QPushButton {
+                background-color: #161616;
+                color: #6A6A6A;
+                border: 1px solid #242424;
+                border-radius: 8px;
+                padding: 8px 12px;
+                font-size: 13px;
+                text-align: left;
+            }
+            QPushButton:hover {
+                background-color: #1A1A1A;
+                color: #9A9A9A;
+            }
+        """)
+        self.btn_search.clicked.connect(self.open_search)
+        title_container_layout.addWidget(self.btn_search)
+        title_container_layout.addSpacing(16)
+        QShortcut(QKeySequence.Find, self, activated=self.open_search)
+        QShortcut(QKeySequence.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.Redo, self, activated=self.redo)
         sidebar_layout.addWidget(title_container)
 
         # Navigation section
@@ -114,6 +155,7 @@ class MainWindow(QMainWindow):
         self.btn_rewards = self.create_nav_button("🏆  Rewards", "rewards")
         self.btn_calendar = self.create_nav_button("📅  Calendar", "calendar")
         self.btn_clock_section = self.create_nav_button("🕒  Clock", "clock_section")
+        self.btn_history = self.create_nav_button("🕘  History", "history")
         
         nav_layout.addWidget(self.btn_dashboard)
         nav_layout.addWidget(self.btn_habits)
@@ -122,6 +164,7 @@ class MainWindow(QMainWindow):
         nav_layout.addWidget(self.btn_rewards)
         nav_layout.addWidget(self.btn_calendar)
         nav_layout.addWidget(self.btn_clock_section)
+        nav_layout.addWidget(self.btn_history)
         
         sidebar_layout.addWidget(nav_section)
         sidebar_layout.addStretch()
@@ -172,7 +215,8 @@ class MainWindow(QMainWindow):
         self.page_focus = FocusWidget(self.db)
         self.page_rewards = RewardsWidget()
         self.page_calendar = CalendarWidget()
-        self.page_clock_section = FlipClockWidget(mode="auto")
+        self.page_clock_section = FlipClockWidget(mode="auto", animate=True)
+        self.page_history = HistoryWidget()
 
         self.content_area.addWidget(self.page_dashboard)
         self.content_area.addWidget(self.page_habits)
@@ -181,6 +225,7 @@ class MainWindow(QMainWindow):
         self.content_area.addWidget(self.page_rewards)
         self.content_area.addWidget(self.page_calendar)
         self.content_area.addWidget(self.page_clock_section)
+        self.content_area.addWidget(self.page_history)
         
         content_layout.addWidget(self.content_area)
 
@@ -191,11 +236,6 @@ class MainWindow(QMainWindow):
         self.btn_dashboard.setChecked(True)
         self.content_area.setCurrentWidget(self.page_dashboard)
 
-        # Signals
-        self.page_habits.points_updated.connect(self.refresh_all)
-        self.page_tasks.points_updated.connect(self.refresh_all)
-        self.page_rewards.points_updated.connect(self.refresh_all)
-
         self.setStyleSheet(load_stylesheet())
 
     def create_nav_button(self, text, page_name, checked=False):
@@ -273,19 +313,63 @@ class MainWindow(QMainWindow):
             "rewards": self.page_rewards,
             "calendar": self.page_calendar,
             "clock_section": self.page_clock_section,
+            "history": self.page_history,
         }
         if page_name in pages:
-            self.content_area.setCurrentWidget(pages[page_name])
-            if page_name == "dashboard":
-                self.page_dashboard.refresh_stats()
+            self.content_area.setCurrentWidget(pages[page_name])  # Dashboard refreshes on show
 
     def open_reflection(self):
         dialog = ReflectionDialog(self)
         dialog.exec()
 
-    def refresh_all(self):
-        self.page_dashboard.refresh_stats()
-        self.page_rewards.refresh_rewards()
+    def open_search(self):
+        dialog = SearchDialog(self)
+        if dialog.exec() and dialog.result:
+            self.show_search_result(dialog.result)
+
+    def show_search_result(self, result):
+        """Go to the page that shows a search result. Reflections have no
+        page; the result itself shows their text."""
+        kind = result['kind']
+        if kind in ('task', 'postpone'):
+            self.btn_tasks.setChecked(True)
+            self.switch_page("tasks")
+        elif kind == 'habit':
+            self.btn_habits.setChecked(True)
+            self.switch_page("habits")
+        elif kind == 'event':
+            self.btn_calendar.setChecked(True)
+            self.switch_page("calendar")
+            self.page_calendar.show_date(result['day'])
+
+    def undo(self):
+        self.announce_restore(self.db.undo())
+
+    def redo(self):
+        self.announce_restore(self.db.redo())
+
+    def announce_restore(self, result):
+        """Let every page reload what an undo/redo rewrote."""
+        if result is None:
+            return
+        bus = ChangeBus.instance()
+        bus.data_restored.emit(result['tables'])
+        if result['points']:
+            bus.points_changed.emit(result['points'])
 
+    def run_daily_checks(self) -> int:
+        """Weekly bonuses and overdue-task penalties. Returns the net change
+        to the balance."""
+        bonus = self.points_mgr.backfill_weekly_bonuses() + self.points_mgr.check_weekly_bonus()
+        return bonus - self.points_mgr.sweep_overdue_tasks()
 
+    def arm_day_timer(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time())
+        self.day_timer.start(int((midnight - now).total_seconds() * 1000) + 1000)
 
+    def on_day_rollover(self):
+        delta = self.run_daily_checks()
+        if delta:
+            ChangeBus.instance().points_changed.emit(delta)
+        self.arm_day_timer()
@@ -1,20 +1,20 @@
 import calendar
 from datetime import datetime, date
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                                QPushButton, QScrollArea, QFrame, QGridLayout, 
-                                QSizePolicy, QSpacerItem, QProgressBar, QMessageBox)
-from PySide6.QtCore import Qt, Signal, QSize, QPointF
-from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QPainterPath
+                                QPushButton, QFrame, QSizePolicy, QSpacerItem,
+                                QProgressBar, QMessageBox, QAbstractScrollArea, QToolTip)
+from PySide6.QtCore import Qt, Signal, QSize, QPointF, QRect, QEvent
+from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QPainterPath, QFontMetrics, QPixmap
 from database import DatabaseManager
 from points_manager import PointsManager
 from .dialogs import AddHabitDialog
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
 
 # Global reference for today's date (updated at runtime)
 TODAY_DATE = date.today()
 
 class MonthlyHabitWidget(QWidget):
-    points_updated = Signal()
-    
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
@@ -27,6 +27,7 @@ class MonthlyHabitWidget(QWidget):
         
         self.init_ui()
         self.refresh_data()
+        ChangeBus.instance().data_restored.connect(self.on_data_restored)
 
     def init_ui(self):
         self.layout = QVBoxLayout(self)
@@ -199,43 +200,19 @@ class MonthlyHabitWidget(QWidget):
         self.layout.addWidget(self.summary_container)
 
     def setup_matrix_area(self):
-        # We need a scroll area for the table part
         self.matrix_container = QWidget()
         self.matrix_layout = QHBoxLayout(self.matrix_container)
         self.matrix_layout.setContentsMargins(0, 16, 0, 16) # Add vertical breathing room
         self.matrix_layout.setSpacing(0)
         
-        # Sticky Column (Habit Names)
-        self.sticky_column = QWidget()
-        self.sticky_column.setFixedWidth(220) # Wider for more padding
-        self.sticky_column.setStyleSheet("background-color: #121212;")
-        self.sticky_layout = QVBoxLayout(self.sticky_column)
-        self.sticky_layout.setContentsMargins(0, 0, 0, 0)
-        self.sticky_layout.setSpacing(0)
-        
-        # Matrix Scroll Area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setFrameShape(QFrame.NoFrame)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.matrix_content = QWidget()
-        self.matrix_grid = QGridLayout(self.matrix_content)
-        self.matrix_grid.setContentsMargins(0, 0, 0, 0)
-        self.matrix_grid.setSpacing(2) # Increased spacing
-        
-        self.scroll_area.setWidget(self.matrix_content)
-        
-        self.matrix_layout.addWidget(self.sticky_column)
-        self.matrix_layout.addWidget(self.scroll_area)
+        # Single painted view: header, sticky name column, cells and footer
+        self.matrix_view = HabitMatrixView()
+        self.matrix_view.status_changed.connect(self.on_cell_changed)
+        self.matrix_view.delete_requested.connect(self.confirm_delete_habit)
+        self.matrix_layout.addWidget(self.matrix_view)
         
         self.layout.addWidget(self.matrix_container, 1)
 
-    def setup_bottom_summary(self):
-        # Rows are added directly to matrix grid in build_matrix_footer
-        pass
-
     def setup_graph_area(self):
         self.graph_container = QWidget()
         self.graph_container.setFixedHeight(220) # Increased height
@@ -257,7 +234,7 @@ class MonthlyHabitWidget(QWidget):
             self.current_year -= 1
         else:
             self.current_month -= 1
-        self.refresh_data()
+        self.request_refresh()
 
     def next_month(self):
         if self.current_month == 12:
@@ -265,15 +242,23 @@ class MonthlyHabitWidget(QWidget):
             self.current_year += 1
         else:
             self.current_month += 1
-        self.refresh_data()
+        self.request_refresh()
+
+    def request_refresh(self):
+        """Month navigation: show the new month name at once, and reload
+        the data once however many clicks land in the same frame."""
+        self.month_label.setText(f"{calendar.month_name[self.current_month]} {self.current_year}")
+        RefreshScheduler.instance().request(self, self.refresh_data)
 
     def open_add_dialog(self):
         dialog = AddHabitDialog(self)
         if dialog.exec():
             name = dialog.get_data()
             if name:
-                self.db.add_habit(name)
+                with self.db.command("Add habit"):
+                    self.db.add_habit(name)
                 self.refresh_data()
+                ChangeBus.instance().habits_changed.emit()
 
     def refresh_data(self):
         # Update month label
@@ -284,206 +269,27 @@ class MonthlyHabitWidget(QWidget):
         habits_data = self.db.get_all_habits_month_data(self.current_year, self.current_month)
         summary = self.db.get_month_summary(self.current_year, self.current_month)
         
-        # Update summary metrics
-        self.habit_count_val.setText(str(summary['total_habits']))
-        self.completed_val.setText(str(summary['total_done']))
-        self.progress_bar.setValue(int(summary['completion_rate']))
-        self.progress_pct.setText(f"{int(summary['completion_rate'])}%")
+        self.summary = summary
         
-        # Clear Matrix
-        self.clear_layout(self.sticky_layout)
-        self.clear_grid(self.matrix_grid)
+        # Update summary metrics
+        self.update_summary_cards()
         
-        # Rebuild Matrix
-        self.build_matrix(habits_data, summary)
+        # Rebind the matrix (no widgets are created or destroyed)
+        self.matrix_view.set_month(self.current_year, self.current_month, habits_data, summary)
         
         # Update Graph
         self.graph_widget.set_data(summary['daily_data'], summary['days_in_month'], self.current_year, self.current_month)
 
-    def clear_layout(self, layout):
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-    def clear_grid(self, grid):
-        while grid.count():
-            item = grid.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-    def build_matrix(self, habits_data, summary):
-        num_days = summary['days_in_month']
-        
-        # 1. Header Rows (Weeks and Days)
-        self.build_matrix_header(num_days, summary)
-        
-        # 2. Habit Rows
-        for row_idx, habit in enumerate(habits_data):
-            # Habit Name (Sticky Column)
-            self.add_habit_name_row(habit['name'], habit['id'])
-            
-            # Habit Cells
-            for day in range(1, num_days + 1):
-                date_str = f"{self.current_year:04d}-{self.current_month:02d}-{day:02d}"
-                status = habit['logs'].get(date_str, 0) # 0: Missed, 1: Partial, 2: Done
-                
-                # Check date relative to today
-                cell_date = date(self.current_year, self.current_month, day)
-                is_past = cell_date < TODAY_DATE
-                is_future = cell_date > TODAY_DATE
-                is_today = cell_date == TODAY_DATE
-                
-                cell = HabitCell(habit['id'], date_str, status, is_today=is_today, is_past=is_past, is_future=is_future)
-                cell.status_changed.connect(self.on_cell_changed)
-                cell.setFixedHeight(38) # Consistent cell height
-                self.matrix_grid.addWidget(cell, row_idx + 2, day - 1)
-        
-        # 3. Add Summary Rows to Grid
-        self.build_matrix_footer(num_days, summary['daily_data'])
-
-    def build_matrix_header(self, num_days, summary):
-        # Column width for each day cell
-        cell_width = 38 # Slightly wider
-        
-        # Week Row
-        week_num = 1
-        current_week_start = 1
-        
-        # Day Names and Dates Row
-        for day in range(1, num_days + 1):
-            date_obj = datetime(self.current_year, self.current_month, day)
-            day_name = date_obj.strftime('%a')[:2] # Sa, Su, Mo...
-            
-            header_cell = QFrame()
-            header_cell.setFixedSize(cell_width, 45)
-            header_cell.setStyleSheet("background-color: transparent; border: none;")
-            v = QVBoxLayout(header_cell)
-            v.setContentsMargins(0, 5, 0, 5)
-            v.setSpacing(2)
-            
-            lbl_day = QLabel(day_name)
-            lbl_day.setAlignment(Qt.AlignCenter)
-            lbl_day.setStyleSheet("color: #4A4A4A; font-size: 9px; font-weight: 400;") # Muted
-            
-            lbl_date = QLabel(str(day))
-            lbl_date.setAlignment(Qt.AlignCenter)
-            lbl_date.setStyleSheet("color: #8A8A8A; font-size: 11px; font-weight: 500;") # Secondary
-            
-            v.addWidget(lbl_day)
-            v.addWidget(lbl_date)
-            
-            self.matrix_grid.addWidget(header_cell, 1, day - 1)
-            
-            # Week grouping logic (simplified: check if it's Sunday or end of month)
-            if date_obj.weekday() == 6 or day == num_days:
-                span = day - current_week_start + 1
-                week_lbl = QLabel(f"Week {week_num}")
-                week_lbl.setAlignment(Qt.AlignCenter)
-                week_lbl.setFixedHeight(30) # Fixed height for alignment
-                week_lbl.setStyleSheet("""
-                    color: #555555; 
-                    font-size: 10px; 
-                    padding: 8px 4px 4px 4px;
-                    background: transparent;
-                """)
-                self.matrix_grid.addWidget(week_lbl, 0, current_week_start - 1, 1, span)
-                
-                week_num += 1
-                current_week_start = day + 1
-
-        # Spacer in sticky layout for headers
-        header_spacer = QFrame()
-        header_spacer.setFixedHeight(30 + 45) # Week Row (30) + Day Row (45)
-        header_spacer.setStyleSheet("background: transparent;")
-        self.sticky_layout.addWidget(header_spacer)
-
-    def build_matrix_footer(self, num_days, daily_data):
-        # Row for "Habits Done"
-        row_idx = self.matrix_grid.rowCount() 
-        
-        # Add more vertical spacing above summary rows
-        spacer_row = QFrame()
-        spacer_row.setFixedHeight(12)
-        spacer_row.setStyleSheet("background: transparent; border: none;")
-        self.sticky_layout.addWidget(spacer_row)
-        self.matrix_grid.addWidget(spacer_row, row_idx, 0, 1, num_days)
-        row_idx += 1
-
-        # Sticky label for Done Count
-        done_lbl_row = QFrame()
-        done_lbl_row.setFixedHeight(30)
-        done_lbl_layout = QHBoxLayout(done_lbl_row)
-        done_lbl_layout.setContentsMargins(24, 0, 0, 0) # Align with habit names
-        lbl_count = QLabel("Daily Done")
-        lbl_count.setStyleSheet("color: #4A4A4A; font-size: 11px; font-weight: 400;")
-        done_lbl_layout.addWidget(lbl_count)
-        self.sticky_layout.addWidget(done_lbl_row)
-        
-        # Sticky label for Progress %
-        pct_lbl_row = QFrame()
-        pct_lbl_row.setFixedHeight(30)
-        pct_lbl_layout = QHBoxLayout(pct_lbl_row)
-        pct_lbl_layout.setContentsMargins(24, 0, 0, 0)
-        lbl_pct = QLabel("Daily Progress")
-        lbl_pct.setStyleSheet("color: #4A4A4A; font-size: 11px; font-weight: 400;")
-        pct_lbl_layout.addWidget(lbl_pct)
-        self.sticky_layout.addWidget(pct_lbl_row)
-
-        for day in range(1, num_days + 1):
-            date_str = f"{self.current_year:04d}-{self.current_month:02d}-{day:02d}"
-            day_stats = daily_data.get(date_str, {'done': 0, 'percentage': 0})
-            
-            # Done count cell
-            count_cell = QLabel(str(day_stats['done']))
-            count_cell.setAlignment(Qt.AlignCenter)
-            count_cell.setFixedHeight(30)
-            count_cell.setStyleSheet("color: #555555; font-size: 10px; padding: 5px;") # Reduced opacity via color
-            self.matrix_grid.addWidget(count_cell, row_idx, day - 1)
-            
-            # Percentage cell
-            pct_cell = QLabel(f"{int(day_stats['percentage'])}%")
-            pct_cell.setAlignment(Qt.AlignCenter)
-            pct_cell.setFixedHeight(30)
-            pct_cell.setStyleSheet("color: #555555; font-size: 10px; padding: 5px;")
-            self.matrix_grid.addWidget(pct_cell, row_idx + 1, day - 1)
-
-    def add_habit_name_row(self, name, habit_id):
-        row = QFrame()
-        row.setFixedHeight(38) # Match cell height
-        row.setStyleSheet("""
-            QFrame {
-                background-color: transparent;
-            }
-        """)
-        h = QHBoxLayout(row)
-        h.setContentsMargins(24, 0, 10, 0) # More left padding
-        
-        lbl = QLabel(name)
-        lbl.setStyleSheet("color: #EAEAEA; font-size: 13px; font-weight: 600;")
-        h.addWidget(lbl)
-        
-        h.addStretch()
-        
-        # Delete Button
-        del_btn = QPushButton("✕")
-        del_btn.setFixedSize(24, 24)
-        del_btn.setCursor(Qt.PointingHandCursor)
-        del_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                color: #4A4A4A;
-                border: none;
-                font-size: 12px;
-            }
-            QPushButton:hover { color: #AA4A4A; }
-        """)
-        del_btn.clicked.connect(lambda: self.confirm_delete_habit(habit_id, name))
-        h.addWidget(del_btn)
-        
-        self.sticky_layout.addWidget(row)
+    def on_data_restored(self, tables):
+        if {'habits', 'habit_logs'} & set(tables):
+            RefreshScheduler.instance().request(self, self.refresh_data)
+
+    def update_summary_cards(self):
+        summary = self.summary
+        self.habit_count_val.setText(str(summary['total_habits']))
+        self.completed_val.setText(str(summary['total_done']))
+        self.progress_bar.setValue(int(summary['completion_rate']))
+        self.progress_pct.setText(f"{int(summary['completion_rate'])}%")
 
     def confirm_delete_habit(self, habit_id, habit_name):
         msg = QMessageBox(self)
@@ -514,107 +320,419 @@ class MonthlyHabitWidget(QWidget):
         """)
         
         if msg.exec() == QMessageBox.Yes:
-            self.db.delete_habit(habit_id)
+            with self.db.command("Delete habit"):
+                self.db.delete_habit(habit_id)
             self.refresh_data()
-            self.points_updated.emit()
+            ChangeBus.instance().habits_changed.emit()
+
+    def on_cell_changed(self, habit_id, date_str, old_status, new_status):
+        with self.db.command("Log habit"):
+            self.db.log_habit(habit_id, date_str, new_status)
+            points = self.points_mgr.award_habit_points(habit_id, new_status, date_str)
+            if new_status == 2:
+                points += self.points_mgr.check_weekly_bonus()
+        self.apply_cell_delta(date_str, old_status, new_status)
+        bus = ChangeBus.instance()
+        bus.habit_logged.emit(habit_id, date_str, old_status, new_status)
+        if points:
+            bus.points_changed.emit(points)
+
+    def apply_cell_delta(self, date_str, old_status, new_status):
+        """Patch the footer, summary cards and graph for one changed cell.
+        The cell itself is already repainted by the matrix view."""
+        done_delta = (new_status == 2) - (old_status == 2)
+        if not done_delta:
+            return
+        
+        summary = self.summary
+        total_habits = summary['total_habits']
+        day_stats = summary['daily_data'].setdefault(date_str, {'logged': 0, 'done': 0, 'percentage': 0})
+        day_stats['done'] += done_delta
+        day_stats['percentage'] = (day_stats['done'] / total_habits * 100) if total_habits > 0 else 0
+        
+        summary['total_done'] += done_delta
+        total_possible = summary['total_possible']
+        summary['completion_rate'] = (summary['total_done'] / total_possible * 100) if total_possible > 0 else 0
+        
+        day_idx = int(date_str[-2:]) - 1
+        self.matrix_view.set_day_totals(day_idx, day_stats['done'], day_stats['percentage'])
+        self.update_summary_cards()
+        self.graph_widget.update_point(date_str, day_stats['percentage'])
+
+class HabitMatrixView(QAbstractScrollArea):
+    """Painted habit x day matrix.
+
+    Draws only the cells that intersect the viewport and does its own
+    hit-testing, so switching months rebinds a few lists instead of
+    building a widget per cell. The header rows, the habit name column and
+    the footer rows stay pinned while the cell area scrolls.
+    """
+    status_changed = Signal(int, str, int, int)  # habit_id, date_str, old_status, new_status
+    delete_requested = Signal(int, str)     # habit_id, habit_name
+
+    NAME_WIDTH = 220
+    CELL_SIZE = 38
+    CELL_SPACING = 2
+    WEEK_ROW_HEIGHT = 30
+    DAY_ROW_HEIGHT = 45
+    FOOTER_GAP = 12
+    FOOTER_ROW_HEIGHT = 30
+    NAME_PADDING = 24
+    DELETE_SIZE = 24
+
+    # (background, border) per status
+    TODAY_COLORS = {2: ("#3A5C44", "#4A6C54"), 1: ("#9A7B1C", "#AA8B2C"), 0: ("#1E1E1E", "#282828")}
+    PAST_COLORS = {2: ("#2A4230", "#3A5040"), 1: ("#6A5A1C", "#7A6A24"), 0: ("#161616", "#1E1E1E")}
+    FUTURE_COLORS = ("#121212", "#1A1A1A")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.viewport().setMouseTracking(True)
+        self.setMinimumHeight(self.header_height() + self.footer_height() + 2 * self.pitch())
+
+        # Bound month data
+        self.year = TODAY_DATE.year
+        self.month = TODAY_DATE.month
+        self.num_days = 0
+        self.habits = []       # [(habit_id, name)]
+        self.statuses = []     # one list per habit, indexed by day - 1
+        self.daily_done = []   # indexed by day - 1
+        self.daily_pct = []
+        self.day_names = []
+        self.week_spans = []   # (first_idx, last_idx, label)
+        self.today_idx = -1    # day index of today, -1 if not in this month
+        self.future_from = 0   # first day index that lies in the future
+
+        self.hover_delete_row = -1
+
+        # Paint resources are built once and reused on every paint
+        self.bg_color = QColor("#121212")
+        self.cell_styles = {}
+        for key, colors in (("today", self.TODAY_COLORS), ("past", self.PAST_COLORS)):
+            for status, (bg, border) in colors.items():
+                self.cell_styles[(key, status)] = (QBrush(QColor(bg)), QPen(QColor(border), 1))
+        bg, border = self.FUTURE_COLORS
+        self.future_style = (QBrush(QColor(bg)), QPen(QColor(border), 1))
+
+        self.name_font = self._font(13, QFont.DemiBold)
+        self.label_font = self._font(11)
+        self.footer_font = self._font(10)
+        self.week_font = self._font(10)
+        self.day_name_font = self._font(9)
+        self.day_num_font = self._font(11, QFont.Medium)
+        self.check_font = self._font(14, QFont.Bold)
+        self.partial_font = self._font(14)
+
+    @staticmethod
+    def _font(pixel_size, weight=QFont.Normal):
+        font = QFont()
+        font.setPixelSize(pixel_size)
+        font.setWeight(weight)
+        return font
+
+    # ---- geometry ----
+
+    def pitch(self):
+        return self.CELL_SIZE + self.CELL_SPACING
+
+    def header_height(self):
+        return self.WEEK_ROW_HEIGHT + self.DAY_ROW_HEIGHT
+
+    def footer_height(self):
+        return self.FOOTER_GAP + 2 * self.FOOTER_ROW_HEIGHT
+
+    def body_rect(self):
+        vp = self.viewport().rect()
+        return QRect(self.NAME_WIDTH, self.header_height(),
+                     max(0, vp.width() - self.NAME_WIDTH),
+                     max(0, vp.height() - self.header_height() - self.footer_height()))
+
+    def column_x(self, day_idx):
+        return self.NAME_WIDTH + day_idx * self.pitch() - self.horizontalScrollBar().value()
+
+    def row_y(self, row):
+        return self.header_height() + row * self.pitch() - self.verticalScrollBar().value()
+
+    def visible_columns(self):
+        body = self.body_rect()
+        scroll = self.horizontalScrollBar().value()
+        first = scroll // self.pitch()
+        last = min(self.num_days - 1, (scroll + body.width()) // self.pitch())
+        return range(first, last + 1)
+
+    def visible_rows(self):
+        body = self.body_rect()
+        scroll = self.verticalScrollBar().value()
+        first = scroll // self.pitch()
+        last = min(len(self.habits) - 1, (scroll + body.height()) // self.pitch())
+        return range(first, last + 1)
+
+    def cell_rect(self, row, day_idx):
+        return QRect(self.column_x(day_idx) + 2, self.row_y(row) + 2,
+                     self.CELL_SIZE - 4, self.CELL_SIZE - 4)
+
+    def delete_rect(self, row):
+        x = self.NAME_WIDTH - 10 - self.DELETE_SIZE
+        y = self.row_y(row) + (self.CELL_SIZE - self.DELETE_SIZE) // 2
+        return QRect(x, y, self.DELETE_SIZE, self.DELETE_SIZE)
+
+    # ---- data binding ----
+
+    def set_month(self, year, month, habits_data, summary):
+        """Bind a month of data. Only plain lists are rebuilt here."""
+        self.year = year
+        self.month = month
+        self.num_days = summary['days_in_month']
+        prefix = f"{year:04d}-{month:02d}-"
+        date_keys = [f"{prefix}{day:02d}" for day in range(1, self.num_days + 1)]
 
-    def on_cell_changed(self, habit_id, date_str, new_status):
-        self.db.log_habit(habit_id, date_str, new_status)
-        self.points_updated.emit()
-        self.refresh_data()
+        self.habits = [(habit['id'], habit['name']) for habit in habits_data]
+        self.statuses = [[habit['logs'].get(key, 0) for key in date_keys] for habit in habits_data]
 
-class HabitCell(QFrame):
-    status_changed = Signal(int, str, int)
-    
-    def __init__(self, habit_id, date_str, status, is_today=False, is_past=False, is_future=False):
-        super().__init__()
-        self.habit_id = habit_id
-        self.date_str = date_str
-        self.status = status
-        self.is_today = is_today
-        self.is_past = is_past
-        self.is_future = is_future
-        
-        self.setFixedSize(36, 36)  # Uniform cell size
-        self.update_style()
-        
-        if self.is_today:
-            self.setCursor(Qt.PointingHandCursor)
+        daily_data = summary['daily_data']
+        empty = {'done': 0, 'percentage': 0}
+        self.daily_done = [daily_data.get(key, empty)['done'] for key in date_keys]
+        self.daily_pct = [int(daily_data.get(key, empty)['percentage']) for key in date_keys]
+
+        self.day_names = []
+        self.week_spans = []
+        week_num = 1
+        week_start = 0
+        for day in range(1, self.num_days + 1):
+            weekday = calendar.weekday(year, month, day)
+            self.day_names.append(calendar.day_abbr[weekday][:2])
+            if weekday == 6 or day == self.num_days:
+                self.week_spans.append((week_start, day - 1, f"Week {week_num}"))
+                week_num += 1
+                week_start = day
+
+        month_start = date(year, month, 1)
+        if (year, month) == (TODAY_DATE.year, TODAY_DATE.month):
+            self.today_idx = TODAY_DATE.day - 1
+            self.future_from = TODAY_DATE.day
         else:
-            self.setCursor(Qt.ForbiddenCursor)
-
-    def update_style(self):
-        if self.is_future:
-            # Future dates - very muted and locked appearance
-            bg = "#121212"
-            border = "#1A1A1A"
-        elif self.is_past:
-            # Past dates - muted and disabled appearance
-            if self.status == 2:  # Done in past
-                bg = "#2A4230"  # Muted green (faded)
-                border = "#3A5040"
-            elif self.status == 1:  # Partial in past
-                bg = "#6A5A1C"  # Muted amber (faded)
-                border = "#7A6A24"
-            else:  # Missed in past
-                bg = "#161616"  # Very muted
-                border = "#1E1E1E"
-        elif self.status == 2:  # Done (today)
-            bg = "#3A5C44"  # Soft green
-            border = "#4A6C54"
-        elif self.status == 1:  # Partial (today)
-            bg = "#9A7B1C"  # Warm amber
-            border = "#AA8B2C"
-        else:  # Not done (today)
-            bg = "#1E1E1E"  # Neutral dark
-            border = "#282828"
-            
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: {bg};
-                border: 1px solid {border};
-                border-radius: 6px;
-                margin: 1px;
-            }}
-        """)
-        
-        # Add Checkmark if Done
-        if self.layout():
-            # Clear existing
-            for i in reversed(range(self.layout().count())): 
-                self.layout().itemAt(i).widget().deleteLater()
+            self.today_idx = -1
+            self.future_from = 0 if month_start > TODAY_DATE else self.num_days
+
+        self.hover_delete_row = -1
+        self.update_scrollbars()
+        self.viewport().update()
+
+    def date_str(self, day_idx):
+        return f"{self.year:04d}-{self.month:02d}-{day_idx + 1:02d}"
+
+    def set_day_totals(self, day_idx, done, percentage):
+        """Update one day's footer values and repaint only that column."""
+        self.daily_done[day_idx] = done
+        self.daily_pct[day_idx] = int(percentage)
+        footer_top = self.viewport().height() - self.footer_height() + self.FOOTER_GAP
+        self.viewport().update(QRect(self.column_x(day_idx), footer_top,
+                                     self.CELL_SIZE, 2 * self.FOOTER_ROW_HEIGHT))
+
+    def update_scrollbars(self):
+        body = self.body_rect()
+        content_w = self.num_days * self.pitch()
+        content_h = len(self.habits) * self.pitch()
+
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, content_w - body.width()))
+        hbar.setPageStep(body.width())
+        hbar.setSingleStep(self.pitch())
+
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, content_h - body.height()))
+        vbar.setPageStep(body.height())
+        vbar.setSingleStep(self.pitch())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    # ---- painting ----
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.bg_color)
+        if not self.num_days:
+            return
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        vp = self.viewport().rect()
+        body = self.body_rect()
+        columns = self.visible_columns()
+        rows = self.visible_rows()
+
+        # Cells
+        painter.setClipRect(body.intersected(event.rect()))
+        for row in rows:
+            row_statuses = self.statuses[row]
+            for day_idx in columns:
+                self.paint_cell(painter, self.cell_rect(row, day_idx), day_idx, row_statuses[day_idx])
+
+        # Header (pinned vertically, scrolls horizontally)
+        painter.setClipRect(QRect(self.NAME_WIDTH, 0, body.width(), self.header_height()))
+        painter.setPen(QColor("#555555"))
+        painter.setFont(self.week_font)
+        for first_idx, last_idx, label in self.week_spans:
+            if last_idx < columns.start or first_idx >= columns.stop:
+                continue
+            x = self.column_x(first_idx)
+            w = (last_idx - first_idx + 1) * self.pitch() - self.CELL_SPACING
+            painter.drawText(QRect(x, 8, w, self.WEEK_ROW_HEIGHT - 8), Qt.AlignCenter, label)
+
+        day_top = self.WEEK_ROW_HEIGHT
+        for day_idx in columns:
+            x = self.column_x(day_idx)
+            painter.setFont(self.day_name_font)
+            painter.setPen(QColor("#4A4A4A"))
+            painter.drawText(QRect(x, day_top + 5, self.CELL_SIZE, 16), Qt.AlignCenter, self.day_names[day_idx])
+            painter.setFont(self.day_num_font)
+            painter.setPen(QColor("#8A8A8A"))
+            painter.drawText(QRect(x, day_top + 21, self.CELL_SIZE, 18), Qt.AlignCenter, str(day_idx + 1))
+
+        # Footer (pinned to the bottom, scrolls horizontally)
+        footer_top = vp.height() - self.footer_height() + self.FOOTER_GAP
+        painter.setClipRect(QRect(self.NAME_WIDTH, footer_top, body.width(), 2 * self.FOOTER_ROW_HEIGHT))
+        painter.setFont(self.footer_font)
+        painter.setPen(QColor("#555555"))
+        for day_idx in columns:
+            x = self.column_x(day_idx)
+            painter.drawText(QRect(x, footer_top, self.CELL_SIZE, self.FOOTER_ROW_HEIGHT),
+                             Qt.AlignCenter, str(self.daily_done[day_idx]))
+            painter.drawText(QRect(x, footer_top + self.FOOTER_ROW_HEIGHT, self.CELL_SIZE, self.FOOTER_ROW_HEIGHT),
+                             Qt.AlignCenter, f"{self.daily_pct[day_idx]}%")
+
+        # Sticky name column (pinned horizontally, scrolls vertically)
+        painter.setClipRect(QRect(0, body.top(), self.NAME_WIDTH, body.height()))
+        name_width = self.NAME_WIDTH - self.NAME_PADDING - self.DELETE_SIZE - 18
+        metrics = QFontMetrics(self.name_font)
+        for row in rows:
+            habit_id, name = self.habits[row]
+            y = self.row_y(row)
+            painter.setFont(self.name_font)
+            painter.setPen(QColor("#EAEAEA"))
+            painter.drawText(QRect(self.NAME_PADDING, y, name_width, self.CELL_SIZE),
+                             Qt.AlignLeft | Qt.AlignVCenter,
+                             metrics.elidedText(name, Qt.ElideRight, name_width))
+            painter.setFont(self.label_font)
+            painter.setPen(QColor("#AA4A4A" if row == self.hover_delete_row else "#4A4A4A"))
+            painter.drawText(self.delete_rect(row), Qt.AlignCenter, "✕")
+
+        painter.setClipRect(QRect(0, footer_top, self.NAME_WIDTH, 2 * self.FOOTER_ROW_HEIGHT))
+        painter.setFont(self.label_font)
+        painter.setPen(QColor("#4A4A4A"))
+        painter.drawText(QRect(self.NAME_PADDING, footer_top, self.NAME_WIDTH, self.FOOTER_ROW_HEIGHT),
+                         Qt.AlignLeft | Qt.AlignVCenter, "Daily Done")
+        painter.drawText(QRect(self.NAME_PADDING, footer_top + self.FOOTER_ROW_HEIGHT, self.NAME_WIDTH, self.FOOTER_ROW_HEIGHT),
+                         Qt.AlignLeft | Qt.AlignVCenter, "Daily Progress")
+
+    def paint_cell(self, painter, rect, day_idx, status):
+        if day_idx >= self.future_from:
+            brush, pen = self.future_style
+        elif day_idx == self.today_idx:
+            brush, pen = self.cell_styles[("today", status)]
         else:
-            self.setLayout(QVBoxLayout())
-            self.layout().setContentsMargins(0, 0, 0, 0)
-            self.layout().setAlignment(Qt.AlignCenter)
-            
-        if self.status == 2:
-            check_lbl = QLabel("✓")
-            check_lbl.setStyleSheet("color: white; font-size: 14px; font-weight: bold;")
-            self.layout().addWidget(check_lbl)
-        elif self.status == 1:
-            check_lbl = QLabel("◐")
-            check_lbl.setStyleSheet("color: #E2A04A; font-size: 14px;")
-            self.layout().addWidget(check_lbl)
+            brush, pen = self.cell_styles[("past", status)]
+        painter.setBrush(brush)
+        painter.setPen(pen)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        if day_idx >= self.future_from:
+            return
+        if status == 2:
+            painter.setFont(self.check_font)
+            painter.setPen(Qt.white)
+            painter.drawText(rect, Qt.AlignCenter, "✓")
+        elif status == 1:
+            painter.setFont(self.partial_font)
+            painter.setPen(QColor("#E2A04A"))
+            painter.drawText(rect, Qt.AlignCenter, "◐")
+
+    # ---- hit-testing ----
+
+    def cell_at(self, pos):
+        """Return (row, day_idx) under a viewport position, or None."""
+        if not self.body_rect().contains(pos):
+            return None
+        col = (pos.x() - self.NAME_WIDTH + self.horizontalScrollBar().value()) // self.pitch()
+        row = (pos.y() - self.header_height() + self.verticalScrollBar().value()) // self.pitch()
+        if 0 <= row < len(self.habits) and 0 <= col < self.num_days:
+            return row, col
+        return None
+
+    def delete_row_at(self, pos):
+        """Return the row whose delete button is under pos, or -1."""
+        body = self.body_rect()
+        if pos.x() >= self.NAME_WIDTH or not (body.top() <= pos.y() < body.bottom()):
+            return -1
+        row = (pos.y() - self.header_height() + self.verticalScrollBar().value()) // self.pitch()
+        if 0 <= row < len(self.habits) and self.delete_rect(row).contains(pos):
+            return row
+        return -1
 
     def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        pos = event.position().toPoint()
+
+        row = self.delete_row_at(pos)
+        if row >= 0:
+            habit_id, name = self.habits[row]
+            self.delete_requested.emit(habit_id, name)
+            return
+
+        hit = self.cell_at(pos)
         # Only allow interaction for today
-        if not self.is_today:
+        if hit is None or hit[1] != self.today_idx:
             return
-            
-        if event.button() == Qt.LeftButton:
-            # Cycle: 0 -> 2 -> 1 -> 0
-            if self.status == 0:
-                self.status = 2
-            elif self.status == 2:
-                self.status = 1
-            else:
-                self.status = 0
-                
-            self.update_style()
-            self.status_changed.emit(self.habit_id, self.date_str, self.status)
+        row, day_idx = hit
+        # Cycle: 0 -> 2 -> 1 -> 0
+        old_status = self.statuses[row][day_idx]
+        new_status = {0: 2, 2: 1}.get(old_status, 0)
+        self.statuses[row][day_idx] = new_status
+        self.viewport().update(self.cell_rect(row, day_idx))
+        self.status_changed.emit(self.habits[row][0], self.date_str(day_idx), old_status, new_status)
+
+    def mouseMoveEvent(self, event):
+        pos = event.position().toPoint()
+        row = self.delete_row_at(pos)
+        if row != self.hover_delete_row:
+            previous = self.hover_delete_row
+            self.hover_delete_row = row
+            for r in (previous, row):
+                if r >= 0:
+                    self.viewport().update(self.delete_rect(r))
+
+        hit = self.cell_at(pos)
+        if row >= 0 or (hit is not None and hit[1] == self.today_idx):
+            self.viewport().setCursor(Qt.PointingHandCursor)
+        elif hit is not None:
+            self.viewport().setCursor(Qt.ForbiddenCursor)
+        else:
+            self.viewport().unsetCursor()
+
+    def leaveEvent(self, event):
+        if self.hover_delete_row >= 0:
+            self.viewport().update(self.delete_rect(self.hover_delete_row))
+            self.hover_delete_row = -1
+        super().leaveEvent(event)
 
 class PerformanceGraph(QWidget):
+    """
+    Smoothed daily completion curve for a month. The curve is rendered once
+    into a device-pixel-ratio-aware pixmap and only re-rendered when the
+    data or the widget size changes; plain repaints just blit it.
+    """
+    MARGIN_X = 60
+    MARGIN_Y = 50
+    HOVER_RADIUS = 12  # Pixels from a day's point that still show its tooltip
+    
     def __init__(self):
         super().__init__()
         self.data = {}
@@ -623,88 +741,143 @@ class PerformanceGraph(QWidget):
         self.month = 1
         self.setMinimumHeight(120)
         
+        self.cache = None   # Rendered QPixmap, None when stale
+        self.points = []    # Point of each day (index 0 = day 1), in widget coordinates
+        self.step = 0.0     # Horizontal distance between days
+        
+        self.accent_color = QColor("#4A7C59")
+        self.frame_pen = QPen(QColor("#1A1A1A"), 1)
+        self.frame_brush = QBrush(QColor("#161616"))
+        fill_color = QColor(self.accent_color)
+        fill_color.setAlpha(20) # Even more subtle
+        self.fill_brush = QBrush(fill_color)
+        self.line_pen = QPen(self.accent_color, 1.5, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        dot_color = QColor(self.accent_color)
+        dot_color.setAlpha(80)
+        self.dot_brush = QBrush(dot_color)
+        self.label_pen = QPen(QColor("#444444"))
+        self.label_font = QFont("Inter", 8)
+        
     def set_data(self, data, days, year, month):
         self.data = data
         self.days = days
         self.year = year
         self.month = month
+        self.invalidate()
+
+    def update_point(self, date_str, percentage):
+        """Update a single day's value in place."""
+        self.data.setdefault(date_str, {})['percentage'] = percentage
+        self.invalidate()
+
+    def invalidate(self):
+        self.cache = None
         self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def resizeEvent(self, event):
+        self.cache = None
+        super().resizeEvent(event)
+
+    def date_str(self, day):
+        return f"{self.year:04d}-{self.month:02d}-{day:02d}"
+
+    def layout_points(self):
+        w, h = self.width(), self.height()
+        graph_w = w - (self.MARGIN_X * 2)
+        graph_h = h - (self.MARGIN_Y * 1.5)
+        self.step = graph_w / (self.days - 1) if self.days > 1 else 0.0
+        self.points = []
+        for day in range(1, self.days + 1):
+            val = self.data.get(self.date_str(day), {}).get('percentage', 0)
+            x = self.MARGIN_X + (day - 1) * self.step
+            y = h - self.MARGIN_Y - (val / 100 * graph_h)
+            self.points.append(QPointF(x, y))
+
+    def render_cache(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, round(self.width() * ratio)), max(1, round(self.height() * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-        
-        w = self.width()
-        h = self.height()
+        w, h = self.width(), self.height()
         
         # Draw background frame - lower contrast
-        painter.setPen(QPen(QColor("#1A1A1A"), 1))
-        painter.setBrush(QBrush(QColor("#161616")))
+        painter.setPen(self.frame_pen)
+        painter.setBrush(self.frame_brush)
         painter.drawRoundedRect(0, 0, w, h, 14, 14)
         
-        if not self.data:
-            return
+        self.layout_points()
+        points = self.points
+        if self.data and points:
+            # Smooth curve through the points
+            path = QPainterPath()
+            path.moveTo(points[0])
+            for p1, p2 in zip(points, points[1:]):
+                mid_x = p1.x() + (p2.x() - p1.x()) / 2
+                path.cubicTo(QPointF(mid_x, p1.y()), QPointF(mid_x, p2.y()), p2)
             
-        # Graph coordinates - increase padding
-        margin_x = 60
-        margin_y = 50
-        graph_w = w - (margin_x * 2)
-        graph_h = h - (margin_y * 1.5)
-        
-        points = []
-        for day in range(1, self.days + 1):
-            date_str = f"{self.year:04d}-{self.month:02d}-{day:02d}"
-            val = self.data.get(date_str, {}).get('percentage', 0)
+            # Draw area fill
+            fill_path = QPainterPath(path)
+            fill_path.lineTo(points[-1].x(), h - self.MARGIN_Y)
+            fill_path.lineTo(points[0].x(), h - self.MARGIN_Y)
+            fill_path.closeSubpath()
+            painter.setBrush(self.fill_brush)
+            painter.setPen(Qt.NoPen)
+            painter.drawPath(fill_path)
             
-            x = margin_x + (day - 1) * (graph_w / (self.days - 1))
-            y = h - margin_y - (val / 100 * graph_h)
-            points.append(QPointF(x, y))
+            # Draw line
+            painter.setPen(self.line_pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(path)
             
-        if not points:
-            return
-
-        # Prepare path for smooth curve
-        path = QPainterPath()
-        path.moveTo(points[0])
-        
-        for i in range(len(points) - 1):
-            p1 = points[i]
-            p2 = points[i+1]
-            c1 = QPointF(p1.x() + (p2.x() - p1.x()) / 2, p1.y())
-            c2 = QPointF(p1.x() + (p2.x() - p1.x()) / 2, p2.y())
-            path.cubicTo(c1, c2, p2)
-
-        # Draw area fill
-        fill_path = QPainterPath(path)
-        fill_path.lineTo(points[-1].x(), h - margin_y)
-        fill_path.lineTo(points[0].x(), h - margin_y)
-        fill_path.closeSubpath()
-        
-        accent_color = QColor("#4A7C59")
-        fill_color = QColor(accent_color)
-        fill_color.setAlpha(20) # Even more subtle
-        painter.setBrush(QBrush(fill_color))
-        painter.setPen(Qt.NoPen)
-        painter.drawPath(fill_path)
-        
-        # Draw line
-        painter.setPen(QPen(accent_color, 1.5, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-        painter.drawPath(path)
-            
-        # Draw dots - reduced visibility
-        painter.setBrush(QBrush(accent_color))
-        painter.setPen(Qt.NoPen)
-        for i, p in enumerate(points):
-            if i % 3 == 0 or i == len(points)-1: # Only every 3rd point or last
-                alpha = 80
-                c = QColor(accent_color)
-                c.setAlpha(alpha)
-                painter.setBrush(QBrush(c))
-                painter.drawEllipse(p, 2, 2)
+            # Draw dots - reduced visibility, every 3rd point and the last
+            painter.setBrush(self.dot_brush)
+            painter.setPen(Qt.NoPen)
+            for i, p in enumerate(points):
+                if i % 3 == 0 or i == len(points) - 1:
+                    painter.drawEllipse(p, 2, 2)
             
-        # Draw X-axis labels (whisper thin)
-        painter.setPen(QPen(QColor("#444444")))
-        painter.setFont(QFont("Inter", 8))
-        for i in [1, 10, 20, self.days]:
-            x = margin_x + (i - 1) * (graph_w / (self.days - 1))
-            painter.drawText(int(x - 15), h - 25, 30, 20, Qt.AlignCenter, str(i))
+            # Draw X-axis labels (whisper thin)
+            painter.setPen(self.label_pen)
+            painter.setFont(self.label_font)
+            for i in [1, 10, 20, self.days]:
+                x = self.MARGIN_X + (i - 1) * self.step
+                painter.drawText(int(x - 15), h - 25, 30, 20, Qt.AlignCenter, str(i))
+        painter.end()
+        self.cache = pixmap
+
+    def paintEvent(self, event):
+        if self.cache is None or self.cache.devicePixelRatio() != self.devicePixelRatioF():
+            self.render_cache()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.cache)
+
+    def day_at(self, pos):
+        """Day whose point is within HOVER_RADIUS of pos. Days are evenly
+        spaced, so the candidate is found arithmetically from x."""
+        if not self.points or not self.data:
+            return None
+        index = round((pos.x() - self.MARGIN_X) / self.step) if self.step else 0
+        if not 0 <= index < len(self.points):
+            return None
+        point = self.points[index]
+        if abs(point.x() - pos.x()) > self.HOVER_RADIUS or abs(point.y() - pos.y()) > self.HOVER_RADIUS:
+            return None
+        return index + 1
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            if self.cache is None:
+                self.layout_points()  # Not painted since the last change
+            day = self.day_at(event.pos())
+            if day is None:
+                QToolTip.hideText()
+            else:
+                stats = self.data.get(self.date_str(day), {})
+                label = date(self.year, self.month, day).strftime('%b %d')
+                QToolTip.showText(event.globalPos(),
+                                  f"{label}: {int(stats.get('percentage', 0))}% done", self)
+            return True
+        return super().event(event)
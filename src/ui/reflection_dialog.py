@@ -1,7 +1,9 @@
+from datetime import datetime
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QFrame)
 from PySide6.QtCore import Qt
 from database import DatabaseManager
+from .change_bus import ChangeBus
 
 class ReflectionDialog(QDialog):
     def __init__(self, parent=None):
@@ -128,9 +130,11 @@ class ReflectionDialog(QDialog):
         self.win_answer = answer
 
     def save_and_close(self):
-        self.db.save_reflection(
-            self.completed_answer or "",
-            self.difficult_answer or "",
-            self.win_answer or ""
-        )
+        with self.db.command("Save reflection"):
+            self.db.save_reflection(
+                self.completed_answer or "",
+                self.difficult_answer or "",
+                self.win_answer or ""
+            )
+        ChangeBus.instance().reflection_saved.emit(datetime.now().strftime("%Y-%m-%d"))
         self.accept()
@@ -0,0 +1,100 @@
+"""
+Refresh Scheduler - Coalesces page refreshes.
+Requests for the same refresh within one frame run once; requests for a
+hidden page wait until the page is shown and then run once.
+"""
+
+from PySide6.QtCore import QObject, QTimer, QEvent
+
+
+class RefreshScheduler(QObject):
+    """
+    Application-wide singleton; use RefreshScheduler.instance().
+    A refresh is identified by (page, callback), so a page can have several
+    independent ones (e.g. stats and focus history).
+    """
+    FRAME_MS = 16
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = {}   # id(page) -> {callback: None}, in request order
+        self.pages = {}     # id(page) -> page
+        self.requested = 0
+        self.executed = 0
+        self.per_page = {}  # page class name -> [requested, executed]
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    # ---------------------
+    # Requests
+    # ---------------------
+    def request(self, page, callback):
+        """Run `callback()` once for `page`: at the end of the current frame
+        if the page is visible, otherwise when it is next shown."""
+        self.requested += 1
+        self.count(page, 0)
+        key = id(page)
+        if key not in self.pages:
+            self.pages[key] = page
+            page.installEventFilter(self)
+            page.destroyed.connect(lambda *_, key=key: self.forget(key))
+        self.pending.setdefault(key, {})[callback] = None
+        if page.isVisible() and not self.timer.isActive():
+            self.timer.start(self.FRAME_MS)
+
+    def forget(self, key):
+        self.pending.pop(key, None)
+        self.pages.pop(key, None)
+
+    def count(self, page, column):
+        self.per_page.setdefault(type(page).__name__, [0, 0])[column] += 1
+
+    # ---------------------
+    # Execution
+    # ---------------------
+    def run(self, key):
+        callbacks = self.pending.pop(key, {})
+        page = self.pages.get(key)
+        for callback in callbacks:
+            self.executed += 1
+            self.count(page, 1)
+            callback()
+
+    def flush(self):
+        """Run every pending refresh of a visible page; hidden pages keep
+        theirs until shown."""
+        for key in list(self.pending):
+            page = self.pages.get(key)
+            if page is not None and page.isVisible():
+                self.run(key)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Show and id(obj) in self.pending:
+            self.run(id(obj))  # Before the first paint, so no stale frame shows
+        return False
+
+    # ---------------------
+    # Metrics
+    # ---------------------
+    @property
+    def coalescing_ratio(self) -> float:
+        """Refresh requests per refresh actually run (1.0 = nothing saved)."""
+        return self.requested / self.executed if self.executed else 1.0
+
+    def metrics(self):
+        return {
+            'requested': self.requested,
+            'executed': self.executed,
+            'coalescing_ratio': round(self.coalescing_ratio, 2),
+            'pages': {name: {'requested': r, 'executed': e} for name, (r, e) in self.per_page.items()},
+        }
@@ -2,10 +2,12 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QPushButton, QScrollArea, QFrame, QDialog,
                                QLineEdit, QSpinBox, QFormLayout, QMessageBox,
                                QDialogButtonBox, QGraphicsDropShadowEffect)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor
 from database import DatabaseManager
 from points_manager import PointsManager
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
 
 class AddRewardDialog(QDialog):
     def __init__(self, parent=None):
@@ -36,12 +38,13 @@ class AddRewardDialog(QDialog):
         return {'name': self.name_input.text(), 'cost': self.cost_input.value()}
 
 class RewardsWidget(QWidget):
-    points_updated = Signal()
-    
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
         self.points_mgr = PointsManager(self.db)
+        self.reward_cards = {}  # reward_id -> (card, claim button, cost)
+        self.claimable = {}     # reward_id -> claimable state last styled
+        self.unlocked = None    # Unlock state last styled in the header
         self.setStyleSheet("background-color: #121212;")
         
         self.layout = QVBoxLayout(self)
@@ -116,6 +119,11 @@ class RewardsWidget(QWidget):
         self.layout.addWidget(self.scroll)
 
         self.refresh_rewards()
+        
+        bus = ChangeBus.instance()
+        for signal in (bus.points_changed, bus.task_completed, bus.tasks_changed):
+            signal.connect(self.request_claimability)
+        bus.data_restored.connect(self.on_data_restored)
 
     def add_shadow(self, widget):
         shadow = QGraphicsDropShadowEffect()
@@ -129,14 +137,57 @@ class RewardsWidget(QWidget):
         if dialog.exec():
             data = dialog.get_data()
             if data["name"]:
-                self.db.add_reward(data["name"], data["cost"])
+                with self.db.command("Add reward"):
+                    self.db.add_reward(data["name"], data["cost"])
                 self.refresh_rewards()
 
     def refresh_rewards(self):
+        """Rebuild the reward cards. Only adding or deleting a reward needs
+        this; balance and unlock changes go through update_claimability()."""
         balance = self.db.get_points_balance()
-        self.balance_label.setText(f" {balance}")
+        can_unlock = self.points_mgr.can_unlock_rewards()
+        self.update_header(balance, can_unlock)
         
+        for i in reversed(range(self.container_layout.count())): 
+            widget = self.container_layout.itemAt(i).widget()
+            if widget:
+                widget.setParent(None)
+        self.reward_cards.clear()
+        self.claimable.clear()
+
+        rewards = self.db.get_rewards()
+        
+        if not rewards:
+            empty = QLabel("No rewards yet.\nAdd some to motivate yourself!")
+            empty.setAlignment(Qt.AlignCenter)
+            empty.setStyleSheet("color: #6A6A6A; font-size: 15px; padding: 60px;")
+            self.container_layout.addWidget(empty)
+            return
+        
+        for reward in rewards:
+            self.add_reward_card(reward, balance, can_unlock)
+
+    def on_data_restored(self, tables):
+        if 'rewards' in tables:
+            RefreshScheduler.instance().request(self, self.refresh_rewards)
+
+    def request_claimability(self, *args):
+        RefreshScheduler.instance().request(self, self.update_claimability)
+
+    def update_claimability(self):
+        """Re-read the balance and unlock state; restyle only the cards whose
+        claimable state flipped."""
+        balance = self.db.get_points_balance()
         can_unlock = self.points_mgr.can_unlock_rewards()
+        self.update_header(balance, can_unlock)
+        for r_id, (card, claim_btn, cost) in self.reward_cards.items():
+            self.style_reward_card(r_id, card, claim_btn, can_unlock and balance >= cost)
+
+    def update_header(self, balance: int, can_unlock: bool):
+        self.balance_label.setText(f" {balance}")
+        if can_unlock == self.unlocked:
+            return
+        self.unlocked = can_unlock
         if can_unlock:
             self.unlock_frame.setStyleSheet("""
                 QFrame { 
@@ -157,47 +208,11 @@ class RewardsWidget(QWidget):
             """)
             self.unlock_label.setText("  Complete Top 3 to unlock rewards")
             self.unlock_label.setStyleSheet("color: #8C4646; font-weight: 600; font-size: 12px;")
-        
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        rewards = self.db.get_rewards()
-        
-        if not rewards:
-            empty = QLabel("No rewards yet.\nAdd some to motivate yourself!")
-            empty.setAlignment(Qt.AlignCenter)
-            empty.setStyleSheet("color: #6A6A6A; font-size: 15px; padding: 60px;")
-            self.container_layout.addWidget(empty)
-            return
-        
-        for reward in rewards:
-            self.add_reward_card(reward, balance, can_unlock)
 
     def add_reward_card(self, reward, balance: int, can_unlock: bool):
         r_id, name, cost = reward
-        can_afford = balance >= cost
-        is_claimable = can_unlock and can_afford
         
         card = QFrame()
-        if is_claimable:
-            card.setStyleSheet("""
-                QFrame { 
-                    background-color: #1A181C; 
-                    border-radius: 12px;
-                    border: 1px solid #3E3445;
-                    border-right: 4px solid #5D5470;
-                }
-            """)
-        else:
-            card.setStyleSheet("""
-                QFrame { 
-                    background-color: #161616; 
-                    border-radius: 12px;
-                    border: 1px solid #242424;
-                }
-            """)
         self.add_shadow(card)
         
         layout = QHBoxLayout(card)
@@ -224,7 +239,41 @@ class RewardsWidget(QWidget):
         
         # Claim
         claim_btn = QPushButton("Claim")
+        claim_btn.clicked.connect(lambda: self.claim_reward(r_id, name))
+        layout.addWidget(claim_btn)
+        
+        # Delete
+        del_btn = QPushButton("")
+        del_btn.setFixedSize(34, 34)
+        del_btn.setCursor(Qt.PointingHandCursor)
+        del_btn.setStyleSheet("""
+            QPushButton {
+                background: #2D1E1E; color: #E25C5C; border: none; 
+                border-radius: 10px; font-size: 14px;
+            }
+            QPushButton:hover { background: #E25C5C; color: #1E1E1E; }
+        """)
+        del_btn.clicked.connect(lambda: self.delete_reward(r_id))
+        layout.addWidget(del_btn)
+        
+        self.reward_cards[r_id] = (card, claim_btn, cost)
+        self.style_reward_card(r_id, card, claim_btn, can_unlock and balance >= cost)
+        self.container_layout.addWidget(card)
+
+    def style_reward_card(self, r_id: int, card: QFrame, claim_btn: QPushButton, is_claimable: bool):
+        if self.claimable.get(r_id) == is_claimable:
+            return
+        self.claimable[r_id] = is_claimable
+        claim_btn.setEnabled(is_claimable)
         if is_claimable:
+            card.setStyleSheet("""
+                QFrame { 
+                    background-color: #1A181C; 
+                    border-radius: 12px;
+                    border: 1px solid #3E3445;
+                    border-right: 4px solid #5D5470;
+                }
+            """)
             claim_btn.setStyleSheet("""
                 QPushButton {
                     background: #5D5470; color: #EAEAEA;
@@ -234,9 +283,14 @@ class RewardsWidget(QWidget):
                 QPushButton:hover { background: #6D6480; }
             """)
             claim_btn.setCursor(Qt.PointingHandCursor)
-            claim_btn.clicked.connect(lambda: self.claim_reward(r_id, name))
         else:
-            claim_btn.setEnabled(False)
+            card.setStyleSheet("""
+                QFrame { 
+                    background-color: #161616; 
+                    border-radius: 12px;
+                    border: 1px solid #242424;
+                }
+            """)
             claim_btn.setStyleSheet("""
                 QPushButton {
                     background: #242424; color: #4A4A4A;
@@ -244,34 +298,19 @@ class RewardsWidget(QWidget):
                     font-size: 12px;
                 }
             """)
-        layout.addWidget(claim_btn)
-        
-        # Delete
-        del_btn = QPushButton("")
-        del_btn.setFixedSize(34, 34)
-        del_btn.setCursor(Qt.PointingHandCursor)
-        del_btn.setStyleSheet("""
-            QPushButton {
-                background: #2D1E1E; color: #E25C5C; border: none; 
-                border-radius: 10px; font-size: 14px;
-            }
-            QPushButton:hover { background: #E25C5C; color: #1E1E1E; }
-        """)
-        del_btn.clicked.connect(lambda: self.delete_reward(r_id))
-        layout.addWidget(del_btn)
-        
-        self.container_layout.addWidget(card)
+            claim_btn.unsetCursor()
 
     def claim_reward(self, reward_id: int, name: str):
-        if self.db.claim_reward(reward_id):
+        with self.db.command("Claim reward"):
+            claimed = self.points_mgr.claim_reward(reward_id)
+        if claimed:
+            cost = self.reward_cards[reward_id][2]
+            bus = ChangeBus.instance()
+            bus.reward_claimed.emit(reward_id, cost)
+            bus.points_changed.emit(-cost)  # Restyles the cards via request_claimability
             QMessageBox.information(self, "Claimed!", f"Enjoy: {name}")
-            self.points_updated.emit()
-            self.refresh_rewards()
 
     def delete_reward(self, reward_id: int):
-        self.db.delete_reward(reward_id)
-        self.refresh_rewards()
-
-    def showEvent(self, event):
+        with self.db.command("Delete reward"):
+            self.db.delete_reward(reward_id)
         self.refresh_rewards()
-        super().showEvent(event)
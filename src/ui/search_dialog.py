@@ -0,0 +1,126 @@
+import html
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QLineEdit,
+                               QListWidget, QListWidgetItem)
+from PySide6.QtCore import Qt, QTimer, QSize
+from database import DatabaseManager
+
+# Control characters can't occur in typed text, so they delimit matches safely
+# until the text is HTML-escaped
+MARK = ('\x02', '\x03')
+KIND_LABELS = {
+    'task': 'Task',
+    'postpone': 'Postponed',
+    'reflection': 'Reflection',
+    'habit': 'Habit',
+    'event': 'Event',
+}
+
+
+def marked_html(text: str) -> str:
+    return (html.escape(text or '')
+            .replace(MARK[0], '<span style="color: #E2A04A; font-weight: 600;">')
+            .replace(MARK[1], '</span>'))
+
+
+class SearchDialog(QDialog):
+    """Search-as-you-type over tasks, postpone reasons, reflections, habits
+    and events. The chosen result is left in `self.result`."""
+    DEBOUNCE_MS = 120
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = DatabaseManager()
+        self.result = None
+        self.results = []
+        self.setWindowTitle("Search")
+        self.resize(560, 480)
+        self.setStyleSheet("background-color: #161616;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(12)
+
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Search tasks, habits, events, reflections...")
+        self.query_input.setFixedHeight(38)
+        self.query_input.setStyleSheet("""
+            QLineEdit {
+                background-color: #1E1E1E; color: #EAEAEA;
+                border: 1px solid #2D2D2D; border-radius: 8px;
+                padding: 0 12px; font-size: 14px;
+            }
+            QLineEdit:focus { border: 1px solid #4A7C59; }
+        """)
+        layout.addWidget(self.query_input)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #6A6A6A; font-size: 11px;")
+        layout.addWidget(self.status_label)
+
+        self.results_list = QListWidget()
+        self.results_list.setStyleSheet("""
+            QListWidget { background: transparent; border: none; outline: none; }
+            QListWidget::item { border-radius: 8px; }
+            QListWidget::item:selected { background-color: #242424; }
+            QListWidget::item:hover { background-color: #1E1E1E; }
+        """)
+        self.results_list.itemActivated.connect(self.choose)
+        self.results_list.itemClicked.connect(self.choose)
+        layout.addWidget(self.results_list, 1)
+
+        # Query once typing pauses rather than on every keystroke
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(self.DEBOUNCE_MS)
+        self.debounce.timeout.connect(self.run_search)
+        self.query_input.textChanged.connect(self.debounce.start)
+        self.query_input.returnPressed.connect(self.choose_first)
+
+    def keyPressEvent(self, event):
+        # Arrow keys move through the results while typing continues in the box
+        if event.key() in (Qt.Key_Down, Qt.Key_Up) and self.results_list.count():
+            row = self.results_list.currentRow() + (1 if event.key() == Qt.Key_Down else -1)
+            self.results_list.setCurrentRow(max(0, min(row, self.results_list.count() - 1)))
+            return
+        super().keyPressEvent(event)
+
+    def run_search(self):
+        self.results = self.db.search(self.query_input.text(), mark=MARK)
+        self.results_list.clear()
+        for result in self.results:
+            item = QListWidgetItem()
+            label = self.create_result_label(result)
+            item.setSizeHint(QSize(0, label.sizeHint().height() + 8))
+            self.results_list.addItem(item)
+            self.results_list.setItemWidget(item, label)
+        if self.results:
+            self.results_list.setCurrentRow(0)
+        text = self.query_input.text().strip()
+        self.status_label.setText(f"{len(self.results)} results" if text else "")
+
+    def create_result_label(self, result) -> QLabel:
+        meta = KIND_LABELS.get(result['kind'], result['kind'])
+        if result['day']:
+            meta += f"  ·  {result['day']}"
+        lines = [f'<span style="color: #6A6A6A; font-size: 10px;">{html.escape(meta)}</span>',
+                 f'<span style="color: #E5E5E5; font-size: 13px;">{marked_html(result["title"])}</span>']
+        if result['snippet']:
+            lines.append(f'<span style="color: #9A9A9A; font-size: 12px;">{marked_html(result["snippet"])}</span>')
+        label = QLabel('<br>'.join(lines))
+        label.setTextFormat(Qt.RichText)
+        label.setWordWrap(True)
+        label.setStyleSheet("background: transparent; padding: 6px 10px;")
+        label.setAttribute(Qt.WA_TransparentForMouseEvents)
+        return label
+
+    def choose_first(self):
+        if self.debounce.isActive():
+            self.debounce.stop()
+            self.run_search()
+        item = self.results_list.currentItem() or self.results_list.item(0)
+        if item is not None:
+            self.choose(item)
+
+    def choose(self, item):
+        self.result = self.results[self.results_list.row(item)]
+        self.accept()
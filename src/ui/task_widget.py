@@ -1,12 +1,15 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QPushButton, QScrollArea, QFrame, QCheckBox,
-                               QMessageBox, QDialog, QComboBox, QDateEdit,
-                               QFormLayout, QDialogButtonBox, QGraphicsDropShadowEffect)
-from PySide6.QtCore import Qt, Signal, QDate
-from PySide6.QtGui import QColor
+                               QPushButton, QFrame, QMessageBox, QDialog, QComboBox,
+                               QDateEdit, QFormLayout, QDialogButtonBox,
+                               QListView, QStyledItemDelegate, QToolTip, QAbstractItemView)
+from PySide6.QtCore import (Qt, Signal, QDate, QAbstractListModel, QModelIndex,
+                            QSortFilterProxyModel, QSize, QRect, QRectF, QEvent)
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QFont, QFontMetrics
 from database import DatabaseManager
 from points_manager import PointsManager
 from .dialogs import AddTaskDialog
+from .change_bus import ChangeBus
+from .refresh_scheduler import RefreshScheduler
 
 class PostponeDialog(QDialog):
     def __init__(self, parent=None):
@@ -41,9 +44,334 @@ class PostponeDialog(QDialog):
             'new_deadline': self.new_date.date().toString("yyyy-MM-dd")
         }
 
+class TaskListModel(QAbstractListModel):
+    """One in-memory snapshot of open tasks.
+
+    Rows are plain dicts; filtering and sorting happen in TaskFilterProxy,
+    and mutations touch only the affected rows.
+    """
+    TaskRole = Qt.UserRole + 1
+    TOP3_LIMIT = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks = []
+        self.top3_count = 0
+
+    @staticmethod
+    def task_from_row(row) -> dict:
+        # Handle both old (8 columns) and new (9 columns with duration) task tuples
+        t_id, name, deadline, priority, points, is_completed, energy, is_top3 = row[:8]
+        return {
+            'id': t_id,
+            'name': name,
+            'deadline': deadline,
+            'priority': priority,
+            'points': points,
+            'energy_level': energy,
+            'is_top3': bool(is_top3),
+            'duration_hours': row[8] if len(row) >= 9 else 0,
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self.tasks[index.row()]
+        if role == self.TaskRole:
+            return task
+        if role == Qt.DisplayRole:
+            return task['name']
+        return None
+
+    def task_at(self, row: int) -> dict:
+        return self.tasks[row]
+
+    def row_of(self, task_id: int) -> int:
+        for row, task in enumerate(self.tasks):
+            if task['id'] == task_id:
+                return row
+        return -1
+
+    def can_add_top3(self) -> bool:
+        return self.top3_count < self.TOP3_LIMIT
+
+    def load(self, rows):
+        self.beginResetModel()
+        self.tasks = [self.task_from_row(row) for row in rows]
+        self.top3_count = sum(1 for task in self.tasks if task['is_top3'])
+        self.endResetModel()
+
+    def add_task(self, task: dict):
+        row = len(self.tasks)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.tasks.append(task)
+        self.endInsertRows()
+
+    def remove_task(self, task_id: int):
+        row = self.row_of(task_id)
+        if row < 0:
+            return
+        was_available = self.can_add_top3()
+        self.beginRemoveRows(QModelIndex(), row, row)
+        task = self.tasks.pop(row)
+        if task['is_top3']:
+            self.top3_count -= 1
+        self.endRemoveRows()
+        self._top3_availability_changed(was_available)
+
+    def update_task(self, task_id: int, **changes):
+        row = self.row_of(task_id)
+        if row < 0:
+            return
+        self.tasks[row].update(changes)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def set_top3(self, task_id: int, is_top3: bool):
+        row = self.row_of(task_id)
+        if row < 0 or self.tasks[row]['is_top3'] == is_top3:
+            return
+        was_available = self.can_add_top3()
+        self.top3_count += 1 if is_top3 else -1
+        self.update_task(task_id, is_top3=is_top3)
+        self._top3_availability_changed(was_available)
+
+    def _top3_availability_changed(self, was_available: bool):
+        # The "add to Top 3" button appears on every card, so repaint all rows
+        # only when the limit is crossed.
+        if was_available != self.can_add_top3() and self.tasks:
+            self.dataChanged.emit(self.index(0), self.index(len(self.tasks) - 1))
+
+
+class TaskFilterProxy(QSortFilterProxyModel):
+    """Energy filter plus priority/deadline ordering, applied in memory."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.energy_level = None
+        self.setDynamicSortFilter(True)
+
+    def set_energy_level(self, energy_level):
+        self.energy_level = energy_level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.energy_level is None:
+            return True
+        return self.sourceModel().task_at(source_row)['energy_level'] == self.energy_level
+
+    def lessThan(self, left, right):
+        # Same order as get_tasks(): priority DESC, deadline ASC (no deadline first)
+        a = self.sourceModel().task_at(left.row())
+        b = self.sourceModel().task_at(right.row())
+        key_a = (-(a['priority'] or 0), a['deadline'] is not None, a['deadline'] or '', a['id'])
+        key_b = (-(b['priority'] or 0), b['deadline'] is not None, b['deadline'] or '', b['id'])
+        return key_a < key_b
+
+
+class TaskCardDelegate(QStyledItemDelegate):
+    """Paints a task card and hit-tests its checkbox and action buttons."""
+    complete_requested = Signal(int)
+    top3_requested = Signal(int, bool)
+    postpone_requested = Signal(int)
+    delete_requested = Signal(int)
+
+    CARD_HEIGHT = 74
+    CARD_SPACING = 14
+    BUTTON_SIZE = 34
+    BUTTON_SPACING = 8
+    CHECK_SIZE = 20
+
+    PRIORITY_COLORS = {3: "#8C4646", 2: "#9A7B1C", 1: "#3A5C44"}
+    PRIORITY_NAMES = {3: "High", 2: "Medium", 1: "Low"}
+    # action -> (icon, background, foreground)
+    BUTTONS = {
+        'star': ("☆", "#2D2A1E", "#E2A04A"),
+        'unstar': ("★", "#E2A04A", "#1E1E1E"),
+        'postpone': ("🕒", "#2D2D2D", "#8A8A8A"),
+        'delete': ("✕", "#2D1E1E", "#E25C5C"),
+    }
+    TOOLTIPS = {'star': "Add to Top 3", 'unstar': "Remove from Top 3",
+                'postpone': "Postpone", 'delete': "Delete", 'check': "Complete"}
+
+    def __init__(self, model: TaskListModel, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.hover = None  # (task_id, action)
+
+        self.name_font = QFont()
+        self.name_font.setPixelSize(14)
+        self.name_font.setWeight(QFont.DemiBold)
+        self.details_font = QFont()
+        self.details_font.setPixelSize(12)
+        self.icon_font = QFont()
+        self.icon_font.setPixelSize(14)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.CARD_HEIGHT + self.CARD_SPACING)
+
+    def card_rect(self, option_rect):
+        return QRect(option_rect.left(), option_rect.top(), option_rect.width(), self.CARD_HEIGHT)
+
+    def action_rects(self, card: QRect, task: dict):
+        """Return [(action, rect)] for the card, including the checkbox."""
+        rects = []
+        check_y = card.top() + (card.height() - self.CHECK_SIZE) // 2
+        rects.append(('check', QRect(card.left() + 20, check_y, self.CHECK_SIZE, self.CHECK_SIZE)))
+
+        actions = []
+        if task['is_top3']:
+            actions.append('unstar')
+        elif self.model.can_add_top3():
+            actions.append('star')
+        actions += ['postpone', 'delete']
+
+        y = card.top() + (card.height() - self.BUTTON_SIZE) // 2
+        x = card.right() - 16 - len(actions) * self.BUTTON_SIZE - (len(actions) - 1) * self.BUTTON_SPACING + 1
+        for action in actions:
+            rects.append((action, QRect(x, y, self.BUTTON_SIZE, self.BUTTON_SIZE)))
+            x += self.BUTTON_SIZE + self.BUTTON_SPACING
+        return rects
+
+    def action_at(self, option_rect, task, pos):
+        for action, rect in self.action_rects(self.card_rect(option_rect), task):
+            if rect.contains(pos):
+                return action
+        return None
+
+    @classmethod
+    def format_details(cls, task: dict) -> str:
+        deadline = task['deadline'] or 'No deadline'
+        priority = cls.PRIORITY_NAMES.get(task['priority'], '')
+        duration_hours = task['duration_hours']
+        # Format duration display
+        if duration_hours and duration_hours > 0:
+            if duration_hours >= 1:
+                duration_str = f"{duration_hours:.1f}h".rstrip('0').rstrip('.')
+            else:
+                duration_str = f"{int(duration_hours * 60)}m"
+            return f"{deadline} · {duration_str} · {priority} · {task['points']} pts"
+        return f"{deadline} · {priority} · {task['points']} pts · {task['energy_level']}"
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskListModel.TaskRole)
+        card = self.card_rect(option.rect)
+        hover_action = self.hover[1] if self.hover and self.hover[0] == task['id'] else None
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Soft shadow, then the card with its priority (or Top 3) accent strip
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 50))
+        painter.drawRoundedRect(QRectF(card).translated(0, 3), 12, 12)
+
+        card_path = QPainterPath()
+        card_path.addRoundedRect(QRectF(card), 12, 12)
+        painter.fillPath(card_path, QColor("#1C1C1C" if task['is_top3'] else "#181818"))
+        accent = "#9A7B1C" if task['is_top3'] else self.PRIORITY_COLORS.get(task['priority'], "#242424")
+        painter.save()
+        painter.setClipPath(card_path)
+        painter.fillRect(QRect(card.left(), card.top(), 3, card.height()), QColor(accent))
+        painter.restore()
+
+        rects = dict(self.action_rects(card, task))
+
+        # Checkbox
+        check = QRectF(rects['check']).adjusted(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(QPen(QColor("#4A7C59" if hover_action == 'check' else "#3D3D3D"), 1))
+        painter.setBrush(QColor("#1A1A1A"))
+        painter.drawEllipse(check)
+
+        # Name (+ star) and details
+        text_left = rects['check'].right() + 14
+        first_button = min(r.left() for action, r in rects.items() if action != 'check')
+        text_width = max(0, first_button - 12 - text_left)
+
+        name_metrics = QFontMetrics(self.name_font)
+        star_width = name_metrics.horizontalAdvance(" ★") if task['is_top3'] else 0
+        name = name_metrics.elidedText(task['name'], Qt.ElideRight, max(0, text_width - star_width))
+        painter.setFont(self.name_font)
+        painter.setPen(QColor("#EAEAEA"))
+        name_rect = QRect(text_left, card.top() + 16, text_width, 20)
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+        if task['is_top3']:
+            painter.setPen(QColor("#E2A04A"))
+            star_x = text_left + name_metrics.horizontalAdvance(name)
+            painter.drawText(QRect(star_x, name_rect.top(), star_width, 20), Qt.AlignLeft | Qt.AlignVCenter, " ★")
+
+        painter.setFont(self.details_font)
+        painter.setPen(QColor("#6A6A6A"))
+        details = QFontMetrics(self.details_font).elidedText(self.format_details(task), Qt.ElideRight, text_width)
+        painter.drawText(QRect(text_left, card.top() + 40, text_width, 18), Qt.AlignLeft | Qt.AlignVCenter, details)
+
+        # Action buttons
+        painter.setFont(self.icon_font)
+        for action, rect in rects.items():
+            if action == 'check':
+                continue
+            icon, bg, fg = self.BUTTONS[action]
+            if hover_action == action:
+                bg, fg = fg, bg
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(bg))
+            painter.drawRoundedRect(QRectF(rect), 10, 10)
+            painter.setPen(QColor(fg))
+            painter.drawText(rect, Qt.AlignCenter, icon)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseMove, QEvent.MouseButtonRelease):
+            return False
+        task = index.data(TaskListModel.TaskRole)
+        pos = event.position().toPoint()
+        action = self.action_at(option.rect, task, pos)
+
+        if event.type() == QEvent.MouseMove:
+            self.set_hover((task['id'], action) if action else None, option.widget)
+            return False
+
+        if event.button() != Qt.LeftButton or action is None:
+            return False
+        self.set_hover(None, option.widget)
+        if action == 'check':
+            self.complete_requested.emit(task['id'])
+        elif action in ('star', 'unstar'):
+            self.top3_requested.emit(task['id'], action == 'star')
+        elif action == 'postpone':
+            self.postpone_requested.emit(task['id'])
+        elif action == 'delete':
+            self.delete_requested.emit(task['id'])
+        return True
+
+    def set_hover(self, hover, view):
+        if hover == self.hover:
+            return
+        self.hover = hover
+        if view is not None:
+            view.viewport().setCursor(Qt.PointingHandCursor if hover else Qt.ArrowCursor)
+            view.viewport().update()
+
+    def eventFilter(self, obj, event):
+        # Installed on the view's viewport to drop hover state on leave
+        if event.type() == QEvent.Leave:
+            self.set_hover(None, obj.parent())
+        return False
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            action = self.action_at(option.rect, index.data(TaskListModel.TaskRole), event.pos())
+            if action:
+                QToolTip.showText(event.globalPos(), self.TOOLTIPS[action], view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+
 class TaskWidget(QWidget):
-    points_updated = Signal()
-    
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
@@ -109,212 +437,117 @@ class TaskWidget(QWidget):
         
         self.layout.addWidget(self.top3_frame)
 
-        # Scroll
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setFrameShape(QFrame.NoFrame)
-        self.scroll.setStyleSheet("QScrollArea { background: transparent; border: none; }")
+        # Task list (model/view over one in-memory snapshot)
+        self.model = TaskListModel(self)
+        self.proxy = TaskFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.sort(0)
+        
+        self.delegate = TaskCardDelegate(self.model, self)
+        self.delegate.complete_requested.connect(self.complete_task)
+        self.delegate.top3_requested.connect(self.toggle_top3)
+        self.delegate.postpone_requested.connect(self.postpone_task)
+        self.delegate.delete_requested.connect(self.delete_task)
+        
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setFrameShape(QFrame.NoFrame)
+        self.list_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list_view.setFocusPolicy(Qt.NoFocus)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.viewport().installEventFilter(self.delegate)
+        self.list_view.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.layout.addWidget(self.list_view)
         
-        self.container = QWidget()
-        self.container.setStyleSheet("background: transparent;")
-        self.container_layout = QVBoxLayout(self.container)
-        self.container_layout.setAlignment(Qt.AlignTop)
-        self.container_layout.setSpacing(14)
+        self.empty_label = QLabel("No tasks yet.\nClick 'New Task' to get started.")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("color: #6A6A6A; font-size: 15px; padding: 60px;")
+        self.layout.addWidget(self.empty_label)
         
-        self.scroll.setWidget(self.container)
-        self.layout.addWidget(self.scroll)
+        for signal in (self.proxy.rowsInserted, self.proxy.rowsRemoved,
+                       self.proxy.modelReset, self.proxy.layoutChanged):
+            signal.connect(self.update_list_state)
 
         self.refresh_tasks()
-
-    def add_shadow(self, widget):
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 70))
-        shadow.setOffset(0, 6)
-        widget.setGraphicsEffect(shadow)
+        ChangeBus.instance().data_restored.connect(self.on_data_restored)
 
     def on_filter_changed(self, text: str):
         self.filter_energy = None if text == "All" else text
-        self.refresh_tasks()
+        self.proxy.set_energy_level(self.filter_energy)
 
     def open_add_dialog(self):
         dialog = AddTaskDialog(self)
         if dialog.exec():
             data = dialog.get_data()
             if data["name"]:
-                self.db.add_task(data["name"], data["deadline"], data["priority"], 
-                                data["points"], data["energy_level"], data["duration_hours"])
-                self.refresh_tasks()
+                with self.db.command("Add task"):
+                    task_id = self.db.add_task(data["name"], data["deadline"], data["priority"], 
+                                               data["points"], data["energy_level"], data["duration_hours"])
+                self.model.add_task({
+                    'id': task_id,
+                    'name': data["name"],
+                    'deadline': data["deadline"],
+                    'priority': data["priority"],
+                    'points': data["points"],
+                    'energy_level': data["energy_level"],
+                    'is_top3': False,
+                    'duration_hours': data["duration_hours"],
+                })
+                ChangeBus.instance().tasks_changed.emit()
 
     def refresh_tasks(self):
-        for i in reversed(range(self.container_layout.count())): 
-            widget = self.container_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        tasks = self.db.get_tasks(include_completed=False, energy_level=self.filter_energy)
-        top3_count = self.db.get_top3_count()
-        
-        self.top3_label.setText(f"★  Top 3: {top3_count}/3 selected")
-        
-        if not tasks:
-            empty = QLabel("No tasks yet.\nClick 'New Task' to get started.")
-            empty.setAlignment(Qt.AlignCenter)
-            empty.setStyleSheet("color: #6A6A6A; font-size: 15px; padding: 60px;")
-            self.container_layout.addWidget(empty)
-            return
-        
-        for task in tasks:
-            self.add_task_card(task)
-
-    def add_task_card(self, task):
-        # Handle both old (8 columns) and new (9 columns with duration) task tuples
-        if len(task) >= 9:
-            t_id, name, deadline, priority, points, is_completed, energy, is_top3, duration_hours = task[:9]
-        else:
-            t_id, name, deadline, priority, points, is_completed, energy, is_top3 = task[:8]
-            duration_hours = 0
-        
-        card = QFrame()
-        priority_colors = {3: "#8C4646", 2: "#9A7B1C", 1: "#3A5C44"}
-        border_color = priority_colors.get(priority, "#242424")
-        
-        # Highlight Top 3 with subtle glow
-        if is_top3:
-            card.setStyleSheet(f"""
-                QFrame {{ 
-                    background-color: #1C1C1C; 
-                    border-radius: 12px;
-                    border-left: 3px solid #9A7B1C;
-                }}
-            """)
-        else:
-            card.setStyleSheet(f"""
-                QFrame {{ 
-                    background-color: #181818; 
-                    border-radius: 12px;
-                    border-left: 3px solid {border_color};
-                }}
-            """)
-        self.add_shadow(card)
-        
-        layout = QHBoxLayout(card)
-        layout.setContentsMargins(20, 16, 16, 16)
-
-        # Checkbox
-        chk = QCheckBox()
-        chk.setStyleSheet("""
-            QCheckBox::indicator { 
-                width: 20px; height: 20px; 
-                border: 1px solid #3D3D3D;
-                border-radius: 10px;
-                background: #1A1A1A;
-            }
-            QCheckBox::indicator:hover { border-color: #4A7C59; }
-            QCheckBox::indicator:checked {
-                background: #3A5C44;
-                border-color: #446B4F;
-            }
-        """)
-        chk.setCursor(Qt.PointingHandCursor)
-        chk.clicked.connect(lambda: self.complete_task(t_id))
-        layout.addWidget(chk)
+        """Reload the snapshot of open tasks from the database."""
+        self.model.load(self.db.get_tasks(include_completed=False))
+        self.update_list_state()
 
-        # Info
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(4)
-        
-        name_row = QHBoxLayout()
-        name_lbl = QLabel(name)
-        name_lbl.setStyleSheet("font-size: 14px; font-weight: 600; color: #EAEAEA;")
-        name_row.addWidget(name_lbl)
-        
-        if is_top3:
-            star = QLabel("★")
-            star.setStyleSheet("color: #E2A04A; font-size: 14px;")
-            name_row.addWidget(star)
-        name_row.addStretch()
-        info_layout.addLayout(name_row)
-        
-        priority_names = {3: "High", 2: "Medium", 1: "Low"}
-        
-        # Format duration display
-        if duration_hours and duration_hours > 0:
-            if duration_hours >= 1:
-                duration_str = f"{duration_hours:.1f}h".rstrip('0').rstrip('.')
-            else:
-                duration_str = f"{int(duration_hours * 60)}m"
-            details = f"{deadline or 'No deadline'} · {duration_str} · {priority_names.get(priority, '')} · {points} pts"
-        else:
-            details = f"{deadline or 'No deadline'} · {priority_names.get(priority, '')} · {points} pts · {energy}"
-        
-        details_lbl = QLabel(details)
-        details_lbl.setStyleSheet("color: #6A6A6A; font-size: 12px;")
-        info_layout.addWidget(details_lbl)
-        
-        layout.addLayout(info_layout, 1)
+    def on_data_restored(self, tables):
+        if 'tasks' in tables:
+            RefreshScheduler.instance().request(self, self.refresh_tasks)
 
-        # Actions
-        actions = QHBoxLayout()
-        actions.setSpacing(8)
-        
-        if not is_top3 and self.db.get_top3_count() < 3:
-            star_btn = self.create_icon_btn("☆", "#2D2A1E", "#E2A04A")
-            star_btn.setToolTip("Add to Top 3")
-            star_btn.clicked.connect(lambda: self.toggle_top3(t_id, True))
-            actions.addWidget(star_btn)
-        elif is_top3:
-            unstar_btn = self.create_icon_btn("★", "#E2A04A", "#1E1E1E")
-            unstar_btn.setToolTip("Remove from Top 3")
-            unstar_btn.clicked.connect(lambda: self.toggle_top3(t_id, False))
-            actions.addWidget(unstar_btn)
-        
-        postpone_btn = self.create_icon_btn("🕒", "#2D2D2D", "#8A8A8A")
-        postpone_btn.setToolTip("Postpone")
-        postpone_btn.clicked.connect(lambda: self.postpone_task(t_id))
-        actions.addWidget(postpone_btn)
-        
-        del_btn = self.create_icon_btn("✕", "#2D1E1E", "#E25C5C")
-        del_btn.setToolTip("Delete")
-        del_btn.clicked.connect(lambda: self.delete_task(t_id))
-        actions.addWidget(del_btn)
-        
-        layout.addLayout(actions)
-        self.container_layout.addWidget(card)
-
-    def create_icon_btn(self, icon: str, bg: str, fg: str) -> QPushButton:
-        btn = QPushButton(icon)
-        btn.setFixedSize(34, 34)
-        btn.setCursor(Qt.PointingHandCursor)
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background: {bg}; color: {fg}; border: none; 
-                border-radius: 10px; font-size: 14px;
-            }}
-            QPushButton:hover {{ background: {fg}; color: {bg}; }}
-        """)
-        return btn
+    def update_list_state(self):
+        self.top3_label.setText(f"★  Top 3: {self.model.top3_count}/3 selected")
+        has_rows = self.proxy.rowCount() > 0
+        self.list_view.setVisible(has_rows)
+        self.empty_label.setVisible(not has_rows)
 
     def toggle_top3(self, task_id: int, add: bool):
-        self.db.set_task_top3(task_id, add)
-        self.refresh_tasks()
+        if add and not self.model.can_add_top3():
+            return
+        with self.db.command("Star task" if add else "Unstar task"):
+            self.db.set_task_top3(task_id, add)
+        self.model.set_top3(task_id, add)
+        self.update_list_state()
+        ChangeBus.instance().tasks_changed.emit()
 
     def complete_task(self, task_id: int):
-        points = self.points_mgr.award_task_points(task_id)
+        with self.db.command("Complete task"):
+            points = self.points_mgr.award_task_points(task_id)
+        self.model.remove_task(task_id)
+        self.update_list_state()
+        bus = ChangeBus.instance()
+        bus.task_completed.emit(task_id, points)
+        if points:
+            bus.points_changed.emit(points)
         QMessageBox.information(self, "Done!", f"Earned {points} points!")
-        self.points_updated.emit()
-        self.refresh_tasks()
 
     def postpone_task(self, task_id: int):
         dialog = PostponeDialog(self)
         if dialog.exec():
             data = dialog.get_data()
-            self.db.postpone_task(task_id, data['reason'], data['new_deadline'])
-            self.refresh_tasks()
+            with self.db.command("Postpone task"):
+                self.db.postpone_task(task_id, data['reason'], data['new_deadline'])
+            self.model.update_task(task_id, deadline=data['new_deadline'])
+            ChangeBus.instance().tasks_changed.emit()
 
     def delete_task(self, task_id: int):
         reply = QMessageBox.question(self, "Delete", "Delete this task?",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.db.delete_task(task_id)
-            self.refresh_tasks()
+            with self.db.command("Delete task"):
+                self.db.delete_task(task_id)
+            self.model.remove_task(task_id)
+            self.update_list_state()
+            ChangeBus.instance().tasks_changed.emit()